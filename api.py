@@ -0,0 +1,258 @@
+"""
+JSON API for tasks (/api/v1/tasks)
+
+List responses carry a strong ETag built from the user's task_versions
+counter, so a client revalidating an unchanged board gets a 304 after a
+single primary-key lookup, without reading any task rows. Single tasks are
+tagged by their revision.
+"""
+import hashlib
+import io
+import logging
+
+from flask import Blueprint, request, jsonify, session, url_for, current_app
+
+import database
+import task_service
+from task_service import TaskValidationError
+
+logger = logging.getLogger(__name__)
+
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Filters whose result changes with the clock, so the task version alone cannot tag them
+_TIME_DEPENDENT_FILTERS = ('overdue', 'today')
+
+
+def _error(message, status):
+    return jsonify({'error': message}), status
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def task_to_json(task):
+    """Public representation of a normalized task (no clock-dependent flags)."""
+    data = {
+        'id': task['id'],
+        'title': task['title'],
+        'description': task['description'],
+        'status': task['status'],
+        'completed': task['completed'],
+        'priority': task['priority'],
+        'category': task['category'],
+        'due_date': _iso(task['due_date']),
+        'created_at': _iso(task['created_at']),
+        'revision': task.get('revision'),
+    }
+    # Search results carry HTML-escaped title/description with <mark> around matches
+    if 'highlights' in task:
+        data['highlights'] = {field: str(html) for field, html in task['highlights'].items()}
+    return data
+
+
+def _not_modified(etag):
+    """Build a 304 if the client already holds this representation."""
+    if etag and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+
+@api_bp.before_request
+def require_login():
+    if not session.get('user_id'):
+        return _error('Authentication required', 401)
+
+
+def _list_params():
+    search = request.args.get('q', '').strip().lower()
+    # Searches are ranked by relevance unless a sort is asked for
+    sort = request.args.get('sort') or ('relevance' if search else database.DEFAULT_TASK_SORT)
+    if sort not in database.TASK_SORTS:
+        raise TaskValidationError('Invalid sort')
+    sort = database.resolve_task_sort(sort, search)
+    status_filter = request.args.get('status', 'all')
+    if status_filter not in database.TASK_STATUS_FILTERS:
+        raise TaskValidationError('Invalid status filter')
+
+    limit = request.args.get('limit', type=int) or current_app.config['TASKS_PAGE_SIZE']
+    limit = max(1, min(limit, current_app.config['TASKS_MAX_PAGE_SIZE']))
+
+    after = None
+    after_param = request.args.get('after', '').strip()
+    if after_param:
+        try:
+            after = database.decode_task_cursor(after_param, sort)
+        except ValueError:
+            raise TaskValidationError('Invalid cursor')
+
+    return {
+        'search': search,
+        'status_filter': status_filter,
+        'category': request.args.get('category', '').strip(),
+        'sort': sort,
+        'after': after,
+        'after_param': after_param,
+        'limit': limit,
+    }
+
+
+def _list_etag(user_id, params):
+    if params['status_filter'] in _TIME_DEPENDENT_FILTERS:
+        return None
+    version = database.get_task_version(user_id)
+    key = '|'.join(str(part) for part in (
+        database.database_generation(), user_id, version, params['search'], params['status_filter'],
+        params['category'], params['sort'], params['after_param'], params['limit'],
+    ))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+@api_bp.route('/tasks', methods=['GET'])
+def list_tasks():
+    """List the user's tasks with the same filters and cursor pagination as /home."""
+    user_id = session['user_id']
+    try:
+        params = _list_params()
+    except TaskValidationError as exc:
+        return _error(str(exc), 400)
+
+    etag = _list_etag(user_id, params)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+
+    tasks, next_cursor, _ = task_service.load_board(
+        user_id, search=params['search'], status_filter=params['status_filter'], category=params['category'],
+        sort=params['sort'], after=params['after'], limit=params['limit'], with_stats=False
+    )
+    response = jsonify({'tasks': [task_to_json(task) for task in tasks], 'next_cursor': next_cursor})
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+def _task_etag(task):
+    return f"{database.database_generation()}-{task['id']}-{task.get('revision')}"
+
+
+@api_bp.route('/tasks/batch', methods=['POST'])
+def batch_tasks():
+    """
+    Apply many create/update/move/toggle/delete operations in one transaction
+
+    Body: {"operations": [{"op": "move", "id": 3, "status": "done"}, ...]}
+    Responds with one result per operation, in order.
+    """
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list):
+        return _error('Expected {"operations": [...]}', 400)
+    max_operations = current_app.config['API_BATCH_MAX_OPERATIONS']
+    if len(operations) > max_operations:
+        return _error(f'At most {max_operations} operations per batch', 400)
+
+    results = task_service.apply_batch(session['user_id'], operations)
+    for result in results:
+        if 'task' in result:
+            result['task'] = task_to_json(result['task'])
+    logger.info("Applied task batch of %d operations", len(operations))
+    return jsonify({'results': results})
+
+
+@api_bp.route('/tasks/import', methods=['POST'])
+def import_tasks():
+    """
+    Bulk import tasks from CSV or NDJSON
+
+    Accepts a multipart upload in the 'file' field or the raw request body.
+    The format comes from ?format=, else the file extension, else CSV.
+    """
+    upload = request.files.get('file')
+    fmt = request.args.get('format', '').lower()
+    if not fmt and upload is not None and upload.filename:
+        fmt = upload.filename.rsplit('.', 1)[-1].lower()
+    fmt = fmt or 'csv'
+
+    raw = upload.stream if upload is not None else request.stream
+    stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+    try:
+        summary = task_service.import_tasks(session['user_id'], stream, fmt)
+    except TaskValidationError as exc:
+        return _error(str(exc), 400)
+    finally:
+        stream.detach()
+
+    logger.info("Imported %d tasks (%d rejected)", summary['imported'], summary['failed'])
+    return jsonify(summary)
+
+
+@api_bp.route('/tasks/<int:task_id>', methods=['GET'])
+def get_task(task_id):
+    task = task_service.get_task(session['user_id'], task_id)
+    if task is None:
+        return _error('Task not found', 404)
+
+    etag = _task_etag(task)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = jsonify(task_to_json(task))
+    response.set_etag(etag)
+    return response
+
+
+@api_bp.route('/tasks', methods=['POST'])
+def create_task():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _error('Expected a JSON object', 400)
+    try:
+        fields = task_service.validate_task_fields(data, strict=True)
+    except TaskValidationError as exc:
+        return _error(str(exc), 400)
+
+    task = task_service.create_task(session['user_id'], **fields)
+    logger.info("Task created via API: %s", task['id'])
+    response = jsonify(task_to_json(task))
+    response.status_code = 201
+    response.headers['Location'] = url_for('api.get_task', task_id=task['id'])
+    response.set_etag(_task_etag(task))
+    return response
+
+
+@api_bp.route('/tasks/<int:task_id>', methods=['PATCH'])
+def patch_task(task_id):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _error('Expected a JSON object', 400)
+
+    user_id = session['user_id']
+    current = task_service.get_task(user_id, task_id)
+    if current is None:
+        return _error('Task not found', 404)
+
+    merged = task_service.editable_fields(current)
+    merged.update({key: value for key, value in data.items() if key in merged})
+    try:
+        fields = task_service.validate_task_fields(merged, strict=True)
+    except TaskValidationError as exc:
+        return _error(str(exc), 400)
+
+    task = task_service.update_task(user_id, task_id, **fields)
+    if task is None:
+        return _error('Task not found', 404)
+    response = jsonify(task_to_json(task))
+    response.set_etag(_task_etag(task))
+    return response
+
+
+@api_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
+def delete_task(task_id):
+    if not task_service.delete_task(session['user_id'], task_id):
+        return _error('Task not found', 404)
+    return '', 204
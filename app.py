@@ -1,12 +1,27 @@
 import logging
-import sys
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 from functools import wraps
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, session, current_app
+from flask import (
+    Flask, render_template, request, redirect, url_for, flash, jsonify, Response, session, current_app, g,
+    stream_with_context
+)
+from markupsafe import Markup
 
 from config import config, Config
-from database import get_db_connection, create_user, verify_user, get_user_by_id, get_user_by_username, get_user_by_email
+from fragment_cache import FragmentCache
+from db_pool import add_listener as add_pool_listener
+from database import (
+    database_generation, db_connection, create_user, verify_user, get_user_by_id, lookup_logins, forget_logins,
+    decode_task_cursor, get_task_stats, resolve_task_sort, release_request_connection, DEFAULT_TASK_SORT,
+    TASK_STATUS_FILTERS, VALID_TASK_STATUSES
+)
+import hashing
+import task_service
+import tracing
+from api import api_bp
+from logging_setup import configure_logging, add_handler as add_log_handler, dropped_records, queue_depth
+from task_service import local_now, TaskValidationError
 
 # Application Insights (optional)
 try:
@@ -18,23 +33,38 @@ except ImportError:
 
 # Prometheus metrics (optional)
 try:
-    from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
     PROMETHEUS_AVAILABLE = True
     REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
     REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency', ['method', 'endpoint'])
     TASK_OPERATIONS = Counter('task_operations_total', 'Total task operations', ['operation'])
+    DB_POOL_CHECKOUTS = Counter('db_pool_checkouts_total', 'Database pool checkouts', ['result'])
+    DB_CONNECTIONS_PER_REQUEST = Histogram('db_connections_per_request',
+                                           'Pooled database connections borrowed by one request',
+                                           buckets=(0, 1, 2, 3, 5, 10))
+    DB_POOL_WAIT = Histogram('db_pool_wait_seconds', 'Time spent waiting for a pooled database connection',
+                             buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30))
+    TASK_CACHE_LOOKUPS = Counter('task_cache_lookups_total', 'Task snapshot cache lookups', ['result'])
+    TASK_CARD_RENDERS = Counter('task_card_renders_total', 'Task card renders by fragment cache result', ['result'])
+    PASSWORD_HASH_SECONDS = Histogram('password_hash_seconds', 'Password hash/verify latency, including pool wait',
+                                      ['operation'], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+    PASSWORD_HASH_REJECTED = Counter('password_hash_rejected_total',
+                                     'Password hashes refused because the hashing pool was saturated',
+                                     ['operation', 'reason'])
+    LOG_RECORDS_DROPPED = Gauge('log_records_dropped', 'Log records dropped because the log queue was full')
+    LOG_QUEUE_DEPTH = Gauge('log_queue_depth', 'Log records waiting to be written')
+    LOG_RECORDS_DROPPED.set_function(dropped_records)
+    LOG_QUEUE_DEPTH.set_function(queue_depth)
 except ImportError:
     PROMETHEUS_AVAILABLE = False
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('app.log')
-    ]
+# Configure logging: handlers write from a background thread, see logging_setup.py
+configure_logging(
+    log_file=Config.LOG_FILE or None,
+    queue_size=Config.LOG_QUEUE_SIZE,
+    max_bytes=Config.LOG_MAX_BYTES,
+    backup_count=Config.LOG_BACKUP_COUNT,
 )
 logger = logging.getLogger(__name__)
 
@@ -46,11 +76,33 @@ env = Config.ENVIRONMENT
 app.config.from_object(config.get(env, config['default']))
 app.secret_key = app.config['SECRET_KEY']
 
+app.register_blueprint(api_bp)
+
+if PROMETHEUS_AVAILABLE:
+    def _record_pool_checkout(result, wait_seconds):
+        DB_POOL_CHECKOUTS.labels(result=result).inc()
+        DB_POOL_WAIT.observe(wait_seconds)
+
+    add_pool_listener(_record_pool_checkout)
+
+    def _record_cache_lookup(result):
+        TASK_CACHE_LOOKUPS.labels(result=result).inc()
+
+    task_service.add_listener(_record_cache_lookup)
+
+    def _record_password_hash(operation, outcome, seconds):
+        if outcome == 'ok':
+            PASSWORD_HASH_SECONDS.labels(operation=operation).observe(seconds)
+        else:
+            PASSWORD_HASH_REJECTED.labels(operation=operation, reason=outcome).inc()
+
+    hashing.add_listener(_record_password_hash)
+
 # Configure Application Insights if available
 if APPINSIGHTS_AVAILABLE and Config.APPINSIGHTS_INSTRUMENTATION_KEY:
     try:
-        # Add Azure Log Handler for logging
-        logger.addHandler(AzureLogHandler(
+        # Add Azure Log Handler to the background log listener
+        add_log_handler(AzureLogHandler(
             connection_string=f"InstrumentationKey={Config.APPINSIGHTS_INSTRUMENTATION_KEY}"
         ))
         # Add Flask middleware for request tracking
@@ -62,81 +114,38 @@ if APPINSIGHTS_AVAILABLE and Config.APPINSIGHTS_INSTRUMENTATION_KEY:
         logger.warning(f"Failed to configure Application Insights: {e}")
 
 
-def ensure_schema_columns():
-    """Ensure optional columns exist (supports older DBs)."""
-    columns_needed = [
-        ('due_date', "ALTER TABLE tasks ADD due_date DATETIME"),
-        ('priority', "ALTER TABLE tasks ADD priority VARCHAR(10) NOT NULL DEFAULT 'Medium'"),
-        ('category', "ALTER TABLE tasks ADD category VARCHAR(100) DEFAULT 'General'"),
-        ('status', "ALTER TABLE tasks ADD status VARCHAR(20) DEFAULT 'todo'")
-    ]
-
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        if app.config['DB_TYPE'] == 'azure_sql':
-            azure_alters = {
-                'due_date': "ALTER TABLE tasks ADD due_date DATETIME",
-                'priority': "ALTER TABLE tasks ADD priority NVARCHAR(10) NOT NULL DEFAULT 'Medium'",
-                'category': "ALTER TABLE tasks ADD category NVARCHAR(100) DEFAULT 'General'",
-                'status': "ALTER TABLE tasks ADD status NVARCHAR(20) DEFAULT 'todo'",
-            }
-            for name, alter_stmt in azure_alters.items():
-                cursor.execute(
-                    "SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME='tasks' AND COLUMN_NAME=?",
-                    (name,)
-                )
-                exists = cursor.fetchone()
-                if not exists:
-                    cursor.execute(alter_stmt)
-                    conn.commit()
-                    logger.info("Added %s column to Azure SQL tasks table", name)
-        else:
-            cursor.execute("PRAGMA table_info(tasks)")
-            existing = []
-            for row in cursor.fetchall():
-                try:
-                    existing.append(row['name'])
-                except Exception:
-                    existing.append(row[1] if len(row) > 1 else row[0])
-
-            for name, alter_stmt in columns_needed:
-                if name not in existing:
-                    cursor.execute(alter_stmt)
-                    conn.commit()
-                    logger.info("Added %s column to SQLite tasks table", name)
-    except Exception as exc:
-        logger.warning("Could not ensure schema columns exist: %s", exc)
-    finally:
-        try:
-            cursor.close()
-            conn.close()
-        except Exception:
-            pass
-
-
 @app.context_processor
 def inject_config():
     """Make config available to all templates."""
     return {'config': app.config}
 
 
-def parse_datetime_value(value):
-    """Return datetime from DB value or None."""
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        return value
-    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S"):
-        try:
-            return datetime.strptime(str(value), fmt)
-        except ValueError:
-            continue
-    try:
-        return datetime.fromisoformat(str(value))
-    except Exception:
-        return None
+card_cache = FragmentCache(max_entries=Config.TASK_CARD_CACHE_SIZE)
+
+
+@app.template_global()
+def render_task_card(task):
+    """Render task_card.html, reusing the markup while the task is unchanged."""
+    revision = task.get('revision')
+    # Search results are highlighted for one query only, so they are not cached
+    if revision is None or 'highlights' in task or not app.config['TASK_CARD_CACHE_SIZE']:
+        return Markup(app.jinja_env.get_template('task_card.html').render(task=task))
+
+    # Resolved once per request rather than once per card
+    if 'card_key_prefix' not in g:
+        g.card_key_prefix = (database_generation(), local_now().date())
+    # The flags depend on the time of day, so they are part of the key
+    key = g.card_key_prefix + (task['id'], revision, task['is_overdue'], task['is_due_today'])
+    html = card_cache.get(key)
+    if html is None:
+        html = Markup(app.jinja_env.get_template('task_card.html').render(task=task))
+        card_cache.put(key, html)
+        result = 'miss'
+    else:
+        result = 'hit'
+    if PROMETHEUS_AVAILABLE:
+        TASK_CARD_RENDERS.labels(result=result).inc()
+    return html
 
 
 # Authentication decorator
@@ -162,94 +171,34 @@ def row_to_dict(row, columns):
         return {col: row[idx] for idx, col in enumerate(columns)}
 
 
-def fetch_tasks():
-    """Fetch tasks and annotate with derived flags."""
-    ensure_schema_columns()
-    
-    # Get current user's ID from session
-    user_id = session.get('user_id')
-    if not user_id:
-        return []
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Try to fetch tasks with the appropriate schema
-    # Azure SQL uses 'status' column, SQLite might use 'completed' column
-    try:
-        # Try Azure SQL schema first (with status column)
-        cursor.execute(
-            "SELECT id, title, description, created_at, due_date, priority, category, status FROM tasks WHERE user_id = ? ORDER BY created_at DESC",
-            (user_id,)
-        )
-    except Exception:
-        try:
-            # Try SQLite schema with completed column
-            cursor.execute(
-                "SELECT id, title, description, completed, created_at, due_date, priority, category FROM tasks WHERE user_id = ? ORDER BY created_at DESC",
-                (user_id,)
-            )
-        except Exception:
-            # Fallback without user_id filtering
-            try:
-                cursor.execute(
-                    "SELECT id, title, description, created_at, due_date, priority, category, status FROM tasks ORDER BY created_at DESC"
-                )
-            except Exception:
-                cursor.execute(
-                    "SELECT id, title, description, completed, created_at, due_date, priority, category FROM tasks ORDER BY created_at DESC"
-                )
-    
-    rows = cursor.fetchall()
-    column_names = [col[0] for col in cursor.description] if cursor.description else []
-
-    tasks = []
-    priority_order = {'High': 3, 'Medium': 2, 'Low': 1}
-    # Use UTC+1 timezone (Western Europe Time) to match user's local time
-    now = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
-    for row in rows:
-        raw = row_to_dict(row, column_names)
-        created_at = parse_datetime_value(raw.get('created_at'))
-        due_date = parse_datetime_value(raw.get('due_date'))
-
-        # Handle both schema types: Azure SQL (status) and SQLite (completed)
-        if 'status' in raw:
-            status = raw.get('status', 'todo')
-            completed = status == 'done'
-        else:
-            completed = bool(raw.get('completed', 0))
-            status = 'done' if completed else 'todo'
-        
-        task = {
-            'id': raw.get('id'),
-            'title': raw.get('title', ''),
-            'description': raw.get('description', ''),
-            'completed': completed,
-            'created_at': created_at,
-            'due_date': due_date,
-            'priority': raw.get('priority', 'Medium'),
-            'category': raw.get('category', 'General'),
-            'status': status
-        }
-        task['is_overdue'] = not completed and task['due_date'] is not None and task['due_date'] < now
-        
-        # Debug logging for overdue detection
-        if task['due_date'] is not None:
-            logger.info(
-                f"Task '{task['title']}' - completed={completed}, due_date={task['due_date']}, "
-                f"now={now}, is_overdue={task['is_overdue']}, comparison={task['due_date'] < now}"
-            )
-        task['is_due_today'] = (
-            task['due_date'] is not None
-            and task['due_date'].date() == now.date()
-            and not task['is_overdue']
-        )
-        task['priority_rank'] = priority_order.get(task['priority'], 2)
-        tasks.append(task)
+EMPTY_STATS = {'overdue': 0, 'due_today': 0, 'due_week': 0, 'total': 0}
+
+
+@app.before_request
+def start_trace():
+    tracing.start_request(session.get('user_id'), request.headers.get(tracing.TRACE_HEADER))
+
+
+@app.before_request
+def count_db_connections():
+    g.db_connections_opened = 0
 
-    cursor.close()
-    conn.close()
-    return tasks
+
+@app.teardown_appcontext
+def release_db_connection(exc):
+    """Return the request's shared database connection to the pool."""
+    is_request = 'db_connections_opened' in g
+    opened = release_request_connection()
+    if PROMETHEUS_AVAILABLE and is_request:
+        DB_CONNECTIONS_PER_REQUEST.observe(opened)
+
+
+@app.after_request
+def add_trace_header(response):
+    trace_id = tracing.current_trace_id()
+    if trace_id:
+        response.headers[tracing.TRACE_ID_HEADER] = trace_id
+    return response
 
 
 # Middleware to track metrics (if installed)
@@ -308,12 +257,13 @@ def signup():
             flash('Passwords do not match', 'error')
             return render_template('signup.html')
         
-        # Check if user already exists
-        if get_user_by_username(username):
+        # Check if user already exists (one query, or none while cached)
+        existing = lookup_logins(username, email)
+        if existing[username]:
             flash('Username already exists', 'error')
             return render_template('signup.html')
         
-        if get_user_by_email(email):
+        if existing[email]:
             flash('Email already registered', 'error')
             return render_template('signup.html')
         
@@ -391,36 +341,33 @@ def change_username():
         user_id = session.get('user_id')
         
         # Verify current password
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Get password hash from row
-        columns = [col[0] for col in cursor.description]
-        user_data = row_to_dict(row, columns)
-        stored_password_hash = user_data.get('password_hash')
-        
-        # Check if current password is correct
-        from werkzeug.security import check_password_hash
-        if not check_password_hash(stored_password_hash, current_password):
-            conn.close()
-            return jsonify({'error': 'Current password is incorrect'}), 401
-        
-        # Check if new username already exists
-        cursor.execute("SELECT id FROM users WHERE username = ? AND id != ?", (new_username, user_id))
-        if cursor.fetchone():
-            conn.close()
-            return jsonify({'error': 'Username already taken'}), 409
-        
-        # Update username
-        cursor.execute("UPDATE users SET username = ? WHERE id = ?", (new_username, user_id))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return jsonify({'error': 'User not found'}), 404
+            
+            # Get password hash from row
+            columns = [col[0] for col in cursor.description]
+            user_data = row_to_dict(row, columns)
+            stored_password_hash = user_data.get('password_hash')
+            
+            # Check if current password is correct
+            valid, _ = hashing.verify_password(stored_password_hash, current_password)
+            if not valid:
+                return jsonify({'error': 'Current password is incorrect'}), 401
+            
+            # Check if new username already exists
+            cursor.execute("SELECT id FROM users WHERE username = ? AND id != ?", (new_username, user_id))
+            if cursor.fetchone():
+                return jsonify({'error': 'Username already taken'}), 409
+            
+            # Update username
+            cursor.execute("UPDATE users SET username = ? WHERE id = ?", (new_username, user_id))
+            conn.commit()
+        forget_logins(session.get('username'), session.get('email'), new_username)
         
         # Update session
         session['username'] = new_username
@@ -428,6 +375,8 @@ def change_username():
         
         return jsonify({'message': 'Username updated successfully!'}), 200
         
+    except hashing.HashingBusy:
+        raise
     except Exception as e:
         logger.error(f"Error changing username: {str(e)}")
         return jsonify({'error': 'An error occurred while changing username'}), 500
@@ -452,36 +401,35 @@ def change_password():
         user_id = session.get('user_id')
         
         # Verify current password
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-        
-        if not row:
-            conn.close()
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Get password hash from row
-        columns = [col[0] for col in cursor.description]
-        user_data = row_to_dict(row, columns)
-        stored_password_hash = user_data.get('password_hash')
-        
-        # Check if current password is correct
-        from werkzeug.security import check_password_hash, generate_password_hash
-        if not check_password_hash(stored_password_hash, current_password):
-            conn.close()
-            return jsonify({'error': 'Current password is incorrect'}), 401
-        
-        # Update password
-        hashed_password = generate_password_hash(new_password)
-        cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", (hashed_password, user_id))
-        conn.commit()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT password_hash FROM users WHERE id = ?", (user_id,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return jsonify({'error': 'User not found'}), 404
+            
+            # Get password hash from row
+            columns = [col[0] for col in cursor.description]
+            user_data = row_to_dict(row, columns)
+            stored_password_hash = user_data.get('password_hash')
+            
+            # Check if current password is correct
+            valid, _ = hashing.verify_password(stored_password_hash, current_password)
+            if not valid:
+                return jsonify({'error': 'Current password is incorrect'}), 401
+            
+            # Update password
+            hashed_password = hashing.hash_password(new_password)
+            cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", (hashed_password, user_id))
+            conn.commit()
         
         logger.info(f"User {user_id} changed password successfully")
         
         return jsonify({'message': 'Password updated successfully!'}), 200
         
+    except hashing.HashingBusy:
+        raise
     except Exception as e:
         logger.error(f"Error changing password: {str(e)}")
         return jsonify({'error': 'An error occurred while changing password'}), 500
@@ -491,47 +439,47 @@ def change_password():
 @app.route('/tasks')
 @login_required
 def home():
-    """Display all tasks with filtering, search, and sorting."""
+    """Display one page of tasks with filtering, search, and sorting done in SQL."""
     try:
-        tasks = fetch_tasks()
-
         search_term = request.args.get('q', '').strip().lower()
         status_filter = request.args.get('status', 'all')
         category_filter = request.args.get('category', 'all').strip()
-        sort_option = request.args.get('sort', 'priority_desc')
+        # Searches are ranked by relevance unless a sort is asked for
+        sort_option = request.args.get('sort') or ('relevance' if search_term else DEFAULT_TASK_SORT)
+        sort_option = resolve_task_sort(sort_option, search_term)
+        if status_filter not in TASK_STATUS_FILTERS:
+            status_filter = 'all'
+
+        page_size = app.config['TASKS_PAGE_SIZE']
+        limit = request.args.get('limit', type=int) or page_size
+        limit = max(1, min(limit, app.config['TASKS_MAX_PAGE_SIZE']))
+
+        after = None
+        after_param = request.args.get('after', '').strip()
+        if after_param:
+            try:
+                after = decode_task_cursor(after_param, sort_option)
+            except ValueError:
+                logger.warning("Ignoring invalid task cursor: %s", after_param)
 
         filtered = []
-        for task in tasks:
-            description_text = (task.get('description') or '').lower()
-            title_text = (task.get('title') or '').lower()
-            if search_term and search_term not in title_text and search_term not in description_text:
-                continue
-            if category_filter not in ('', 'all') and task['category'].lower() != category_filter.lower():
-                continue
-
-            if status_filter == 'completed' and not task['completed']:
-                continue
-            if status_filter == 'pending' and task['completed']:
-                continue
-            if status_filter == 'overdue' and not task['is_overdue']:
-                continue
-            if status_filter == 'today':
-                if not task['due_date'] or task['due_date'].date() != datetime.now().date():
-                    continue
-
-            filtered.append(task)
-
-        if sort_option.startswith('priority'):
-            reverse = sort_option == 'priority_desc'
-            filtered.sort(key=lambda t: t.get('priority_rank', 2), reverse=reverse)
-        else:
-            reverse = True if sort_option == 'created_desc' else False
-            filtered.sort(key=lambda t: t['created_at'] or datetime.min, reverse=reverse)
+        next_cursor = None
+        # Stats cover the user's whole board, not just this page
+        stats = dict(EMPTY_STATS)
+        user_id = session.get('user_id')
+        if user_id:
+            filtered, next_cursor, stats = task_service.load_board(
+                user_id, search=search_term, status_filter=status_filter, category=category_filter,
+                sort=sort_option, after=after, limit=limit, now=local_now()
+            )
 
-        grouped_tasks = {}
-        for task in filtered:
-            category = task.get('category', 'General') or 'General'
-            grouped_tasks.setdefault(category, []).append(task)
+        # Each "show more" click adds the column to ?expand= once more
+        expanded = [s for s in request.args.getlist('expand') if s in VALID_TASK_STATUSES]
+        column_limit = app.config['TASKS_COLUMN_LIMIT']
+        column_limits = {}
+        if column_limit > 0:
+            column_limits = {s: column_limit * (1 + expanded.count(s)) for s in VALID_TASK_STATUSES}
+        columns = task_service.bucket_by_status(filtered, column_limits)
 
         filters = {
             'q': search_term,
@@ -540,89 +488,68 @@ def home():
             'category': category_filter
         }
 
-        # Calculate statistics
-        now = datetime.now()
-        today_end = datetime.combine(now.date(), datetime.max.time())
-        week_end = now + timedelta(days=7)
-        
-        stats = {
-            'overdue': sum(1 for t in tasks if t.get('is_overdue', False) and not t.get('completed', False)),
-            'due_today': sum(1 for t in tasks if t.get('is_due_today', False) and not t.get('is_overdue', False) and not t.get('completed', False)),
-            'due_week': sum(1 for t in tasks if t.get('due_date') and now <= t['due_date'] <= week_end and not t.get('completed', False)),
-            'total': len([t for t in tasks if not t.get('completed', False)])
-        }
-
         logger.info("Rendering %d tasks after filters", len(filtered))
-        return render_template('index.html', tasks=filtered, grouped_tasks=grouped_tasks, filters=filters, stats=stats)
+        return render_template('index.html', tasks=filtered, columns=columns, filters=filters, stats=stats,
+                               next_cursor=next_cursor, limit=limit, expanded=expanded, column_limit=column_limit)
     except Exception as exc:
         logger.error("Error fetching tasks: %s", exc)
         flash('Error loading tasks', 'error')
-        return render_template('index.html', tasks=[], grouped_tasks={}, filters={}, stats={'overdue': 0, 'due_today': 0, 'due_week': 0, 'total': 0})
+        return render_template('index.html', tasks=[], columns={}, filters={}, stats=dict(EMPTY_STATS))
 
 
-@app.route('/task/add', methods=['POST'])
+@app.route('/tasks/stats')
 @login_required
-def add_task():
-    """Create a new task."""
+def task_stats():
+    """Dashboard counters as JSON."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify(EMPTY_STATS), 200
     try:
-        title = request.form.get('title', '').strip()
-        description = request.form.get('description', '').strip()
-        priority = request.form.get('priority', 'Medium').title()
-        category = request.form.get('category', 'General').strip() or 'General'
-        due_date_str = request.form.get('due_date', '').strip()
-        status = request.form.get('status', 'todo').strip()
-        user_id = session.get('user_id')
+        return jsonify(get_task_stats(user_id, local_now())), 200
+    except Exception as exc:
+        logger.error("Error computing task stats: %s", exc)
+        return jsonify({'error': 'Could not compute task stats'}), 500
 
-        if not title:
-            logger.warning("Task creation attempted without title")
-            flash('Task title is required', 'error')
-            return redirect(url_for('home'))
 
-        if len(title) > 255:
-            logger.warning("Task title too long: %d characters", len(title))
-            flash('Task title too long (max 255 characters)', 'error')
-            return redirect(url_for('home'))
+@app.route('/export')
+@login_required
+def export_tasks():
+    """Download all of the user's tasks as CSV (default) or NDJSON, streamed."""
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in task_service.EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 400
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'Authentication required'}), 401
 
-        due_date = None
-        if due_date_str:
-            try:
-                due_date = datetime.strptime(due_date_str, "%Y-%m-%dT%H:%M")
-            except ValueError:
-                flash('Invalid due date format', 'error')
-                return redirect(url_for('home'))
+    mimetype, extension = task_service.EXPORT_FORMATS[fmt]
+    filename = f"tasks-{local_now():%Y%m%d}.{extension}"
+    logger.info("Exporting tasks for user %s as %s", user_id, fmt)
+    return Response(
+        stream_with_context(task_service.iter_export(user_id, fmt)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
 
-        if priority not in ('High', 'Medium', 'Low'):
-            priority = 'Medium'
-        
-        if status not in ('todo', 'in_progress', 'in_review', 'done'):
-            status = 'todo'
-        
-        if status not in ('todo', 'in_progress', 'in_review', 'done'):
-            status = 'todo'
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Try to insert with user_id, fallback to without for old schema
+@app.route('/task/add', methods=['POST'])
+@login_required
+def add_task():
+    """Create a new task."""
+    try:
         try:
-            cursor.execute(
-                'INSERT INTO tasks (title, description, due_date, priority, category, status, user_id) VALUES (?, ?, ?, ?, ?, ?, ?)',
-                (title, description, due_date.isoformat() if due_date else None, priority, category, status, user_id)
-            )
-        except Exception:
-            cursor.execute(
-                'INSERT INTO tasks (title, description, due_date, priority, category, status) VALUES (?, ?, ?, ?, ?, ?)',
-                (title, description, due_date.isoformat() if due_date else None, priority, category, status)
-            )
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+            fields = task_service.validate_task_fields(request.form)
+        except TaskValidationError as exc:
+            logger.warning("Task creation rejected: %s", exc)
+            flash(str(exc), 'error')
+            return redirect(url_for('home'))
+
+        task_service.create_task(session.get('user_id'), **fields)
 
         if PROMETHEUS_AVAILABLE:
             TASK_OPERATIONS.labels(operation='create').inc()
 
-        logger.info("Task created: %s", title)
+        logger.info("Task created: %s", fields['title'])
         flash('Task created successfully', 'success')
         return redirect(url_for('home'))
     except Exception as exc:
@@ -636,50 +563,15 @@ def add_task():
 def toggle_task(task_id):
     """Toggle task completion status."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get task - try to detect which columns exist
-        cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-        row = cursor.fetchone()
-
-        if not row:
+        task = task_service.toggle_task(session.get('user_id'), task_id)
+        if task is None:
             flash('Task not found', 'error')
-            cursor.close()
-            conn.close()
             return redirect(url_for('home'))
 
-        columns = [col[0] for col in cursor.description]
-        task = row_to_dict(row, columns)
-        
-        has_status = 'status' in columns
-        has_completed = 'completed' in columns
-        
-        # Determine new values based on what exists
-        if has_status:
-            current_status = task.get('status', 'todo')
-            new_status = 'todo' if current_status == 'done' else 'done'
-        
-        if has_completed:
-            current_completed = task.get('completed', 0)
-            new_completed = 0 if current_completed else 1
-        
-        # Update both columns if they exist (for test compatibility)
-        if has_status and has_completed:
-            cursor.execute('UPDATE tasks SET status = ?, completed = ? WHERE id = ?', 
-                         (new_status, new_completed, task_id))
-        elif has_status:
-            cursor.execute('UPDATE tasks SET status = ? WHERE id = ?', (new_status, task_id))
-        elif has_completed:
-            cursor.execute('UPDATE tasks SET completed = ? WHERE id = ?', (new_completed, task_id))
-        conn.commit()
-        cursor.close()
-        conn.close()
-
         if PROMETHEUS_AVAILABLE:
             TASK_OPERATIONS.labels(operation='toggle').inc()
 
-        logger.info("Task %s status toggled to %s", task_id, new_status)
+        logger.info("Task %s status toggled to %s", task_id, task['status'])
         flash('Task status updated', 'success')
         return redirect(url_for('home'))
     except Exception as exc:
@@ -693,12 +585,9 @@ def toggle_task(task_id):
 def delete_task(task_id):
     """Delete a task."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-        conn.commit()
+        deleted = task_service.delete_task(session.get('user_id'), task_id)
 
-        if cursor.rowcount > 0:
+        if deleted:
             if PROMETHEUS_AVAILABLE:
                 TASK_OPERATIONS.labels(operation='delete').inc()
 
@@ -708,8 +597,6 @@ def delete_task(task_id):
             logger.warning("Task %s not found for deletion", task_id)
             flash('Task not found', 'error')
 
-        cursor.close()
-        conn.close()
         return redirect(url_for('home'))
     except Exception as exc:
         logger.error("Error deleting task %s: %s", task_id, exc)
@@ -722,46 +609,17 @@ def delete_task(task_id):
 def edit_task(task_id):
     """Edit an existing task."""
     try:
-        title = request.form.get('title', '').strip()
-        description = request.form.get('description', '').strip()
-        priority = request.form.get('priority', 'Medium').title()
-        category = request.form.get('category', 'General').strip() or 'General'
-        due_date_str = request.form.get('due_date', '').strip()
-        status = request.form.get('status', 'todo').strip()
-
-        if not title:
-            flash('Task title is required', 'error')
+        try:
+            fields = task_service.validate_task_fields(request.form)
+        except TaskValidationError as exc:
+            flash(str(exc), 'error')
             return redirect(url_for('home'))
 
-        if len(title) > 255:
-            flash('Task title too long (max 255 characters)', 'error')
+        task = task_service.update_task(session.get('user_id'), task_id, **fields)
+        if task is None:
+            flash('Task not found', 'error')
             return redirect(url_for('home'))
 
-        if priority not in ('High', 'Medium', 'Low'):
-            priority = 'Medium'
-
-        due_date = None
-        if due_date_str:
-            try:
-                due_date = datetime.strptime(due_date_str, "%Y-%m-%dT%H:%M")
-            except ValueError:
-                flash('Invalid due date format', 'error')
-                return redirect(url_for('home'))
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            UPDATE tasks 
-            SET title = ?, description = ?, priority = ?, category = ?, due_date = ?, status = ?
-            WHERE id = ?
-            """,
-            (title, description, priority, category, due_date.isoformat() if due_date else None, status, task_id)
-        )
-        conn.commit()
-        cursor.close()
-        conn.close()
-
         flash('Task updated successfully', 'success')
         return redirect(url_for('home'))
     except Exception as exc:
@@ -783,23 +641,19 @@ def move_task(task_id):
             status = request.form.get('status', '').strip()
         
         # Validate status
-        valid_statuses = ['todo', 'in_progress', 'in_review', 'done']
-        if status not in valid_statuses:
+        if status not in VALID_TASK_STATUSES:
             if request.is_json:
                 return jsonify({'error': 'Invalid status'}), 400
             flash('Invalid status', 'error')
             return redirect(url_for('home'))
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE tasks SET status = ? WHERE id = ?",
-            (status, task_id)
-        )
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
+        task = task_service.move_task(session.get('user_id'), task_id, status)
+        if task is None:
+            if request.is_json:
+                return jsonify({'error': 'Task not found'}), 404
+            flash('Task not found', 'error')
+            return redirect(url_for('home'))
+
         if request.is_json:
             return jsonify({'message': 'Task moved', 'status': status}), 200
 
@@ -815,12 +669,11 @@ def move_task(task_id):
 def health():
     """Health check endpoint."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM tasks')
-        count = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM tasks')
+            count = cursor.fetchone()[0]
+            cursor.close()
 
         response = {
             'status': 'healthy',
@@ -856,6 +709,20 @@ def internal_error(error):
     return render_template('errors/500.html'), 500
 
 
+@app.errorhandler(hashing.HashingBusy)
+def hashing_busy(exc):
+    """Backpressure: the worker's password hashing pool is saturated."""
+    logger.warning("Password hashing saturated on %s: %s", request.path, exc)
+    message = 'Too many sign-in attempts right now. Please try again in a moment.'
+    if request.endpoint in ('login', 'signup'):
+        flash(message, 'error')
+        response = app.make_response((render_template(f'{request.endpoint}.html'), 429))
+    else:
+        response = app.make_response((jsonify({'error': message}), 429))
+    response.headers['Retry-After'] = '1'
+    return response
+
+
 @app.errorhandler(Exception)
 def handle_exception(exc):
     logger.error("Unhandled exception: %s", exc, exc_info=True)
@@ -864,5 +731,7 @@ def handle_exception(exc):
 
 if __name__ == '__main__':
     logger.info("Starting Flask application")
+    from migrations import apply_migrations
+    apply_migrations()
     port = 8000 if app.config['DEBUG'] else 80
     app.run(host='0.0.0.0', port=port, debug=app.config['DEBUG'])
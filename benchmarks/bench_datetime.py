@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for task_service.parse_datetime_value
+
+Compares the previous strptime-loop parser with the current one on rows
+shaped like what SQLite hands back: created_at from CURRENT_TIMESTAMP,
+due dates from the form (isoformat, with and without seconds) and NULLs.
+
+Usage:
+    python benchmarks/bench_datetime.py [--rows 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from task_service import parse_datetime_value, _parse_datetime_text
+
+
+def legacy_parse_datetime_value(value):
+    """The parser as it was before the fast path, kept for comparison."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(str(value), fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(str(value))
+    except Exception:
+        return None
+
+
+def generate_values(rows, seed=42):
+    """Two values per row (created_at, due_date), like normalize_task() parses."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    values = []
+    for _ in range(rows):
+        created = start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        values.append(created.strftime('%Y-%m-%d %H:%M:%S'))
+        kind = rng.random()
+        due = start + timedelta(days=rng.randrange(365), hours=rng.choice((9, 12, 17)))
+        if kind < 0.3:
+            values.append(None)
+        elif kind < 0.8:
+            values.append(due.isoformat())
+        else:
+            values.append(due.strftime('%Y-%m-%dT%H:%M'))
+    return values
+
+
+def run(parser, values):
+    started = time.perf_counter()
+    for value in values:
+        parser(value)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--board-rows', type=int, default=2000)
+    args = parser.parse_args()
+
+    values = generate_values(args.rows)
+    assert all(legacy_parse_datetime_value(v) == parse_datetime_value(v) for v in values[:5000])
+
+    # The same board rendered repeatedly, as on the SQL (uncached) path
+    board = values[:2 * args.board_rows] * max(1, args.rows // args.board_rows)
+
+    per_row = lambda seconds, n: seconds / n * 1e6
+    print(f"{args.rows} rows, 2 datetime columns per row")
+    for label, sample in (("distinct rows", values), (f"{args.board_rows}-task board, repeated", board)):
+        rows = len(sample) // 2
+        legacy = run(legacy_parse_datetime_value, sample)
+        _parse_datetime_text.cache_clear()
+        current = run(parse_datetime_value, sample)
+        print(f"  {label}")
+        print(f"    strptime loop   {legacy:8.3f}s  {per_row(legacy, rows):7.2f} us/row")
+        print(f"    fromisoformat   {current:8.3f}s  {per_row(current, rows):7.2f} us/row")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Benchmarks for the request hot paths on a synthetic multi-user dataset
+
+Builds a throwaway SQLite database with datagen.generate() (N users x M
+tasks), then times the board query, the board load through the snapshot
+cache, the /home render (warm, cold and searched), password verification,
+the login route and every task write route through the Flask test client.
+Runs offline on SQLite.
+
+Results are printed as a table and can be written as JSON with --output;
+pass an earlier file as --compare to see the change per benchmark.
+
+Usage:
+    python benchmarks/bench_requests.py [--users 20] [--tasks 1000] [--iterations 50]
+        [--only home,task_toggle] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Before the app is imported: no app.log from benchmark runs
+os.environ['DB_TYPE'] = 'sqlite'
+os.environ.setdefault('LOG_FILE', '')
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logging
+
+import database
+import datagen
+import hashing
+import task_service
+from config import Config
+from migrations import apply_migrations
+
+
+def _login(client, user_id, username):
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['username'] = username
+
+
+def _expect(response, status):
+    assert response.status_code == status, f"HTTP {response.status_code}, expected {status}"
+
+
+# Each factory gets the shared context and the number of calls it will get,
+# and returns op(i), or (prepare(i), op(i)) when every call needs untimed setup.
+
+def bench_query_tasks(ctx, calls):
+    user_id = ctx['user_id']
+    return lambda i: database.query_tasks(user_id, limit=Config.TASKS_PAGE_SIZE)
+
+
+def bench_load_board(ctx, calls):
+    user_id = ctx['user_id']
+    return lambda i: task_service.load_board(user_id, limit=Config.TASKS_PAGE_SIZE, now=task_service.local_now())
+
+
+def bench_home(ctx, calls):
+    client = ctx['client']
+    return lambda i: _expect(client.get('/home'), 200)
+
+
+def bench_home_cold(ctx, calls):
+    from app import card_cache
+    client = ctx['client']
+
+    def prepare(i):
+        task_service.snapshot_cache.clear()
+        card_cache.clear()
+
+    return prepare, lambda i: _expect(client.get('/home'), 200)
+
+
+def bench_home_search(ctx, calls):
+    client = ctx['client']
+    queries = ('report', 'pay rent', 'invoice', 'deploy backup')
+    return lambda i: _expect(client.get('/home', query_string={'q': queries[i % len(queries)]}), 200)
+
+
+def bench_verify_user(ctx, calls):
+    accounts = ctx['accounts']
+
+    def op(i):
+        assert database.verify_user(accounts[i % len(accounts)][1], datagen.PASSWORD)
+    return op
+
+
+def bench_login(ctx, calls):
+    client = ctx['app'].test_client()
+    accounts = ctx['accounts']
+
+    def prepare(i):
+        with client.session_transaction() as sess:
+            sess.clear()
+
+    def op(i):
+        form = {'username': accounts[i % len(accounts)][1], 'password': datagen.PASSWORD}
+        _expect(client.post('/login', data=form), 302)
+    return prepare, op
+
+
+def _task_form(i):
+    return {'title': f'Bench task {i}', 'description': 'Created by bench_requests',
+            'priority': ('High', 'Medium', 'Low')[i % 3], 'category': 'Work', 'due_date': ''}
+
+
+def bench_task_add(ctx, calls):
+    client = ctx['client']
+    return lambda i: _expect(client.post('/task/add', data=_task_form(i)), 302)
+
+
+def bench_task_edit(ctx, calls):
+    client, task_ids = ctx['client'], ctx['task_ids']
+    return lambda i: _expect(client.post(f'/task/{task_ids[i % len(task_ids)]}/edit', data=_task_form(i)), 302)
+
+
+def bench_task_toggle(ctx, calls):
+    client, task_ids = ctx['client'], ctx['task_ids']
+    return lambda i: _expect(client.post(f'/task/{task_ids[i % len(task_ids)]}/toggle'), 302)
+
+
+def bench_task_move(ctx, calls):
+    client, task_ids = ctx['client'], ctx['task_ids']
+    statuses = database.VALID_TASK_STATUSES
+
+    def op(i):
+        form = {'status': statuses[i % len(statuses)]}
+        _expect(client.post(f'/task/{task_ids[i % len(task_ids)]}/move', data=form), 302)
+    return op
+
+
+def bench_task_delete(ctx, calls):
+    client, user_id = ctx['client'], ctx['user_id']
+    doomed = [database.create_task(user_id, f'Doomed {i}')[0]['id'] for i in range(calls)]
+    return lambda i: _expect(client.post(f'/task/{doomed[i]}/delete'), 302)
+
+
+# Reads first: the write benchmarks change the benchmarked user's board
+BENCHMARKS = {
+    'query_tasks': bench_query_tasks,
+    'load_board': bench_load_board,
+    'home': bench_home,
+    'home_cold': bench_home_cold,
+    'home_search': bench_home_search,
+    'verify_user': bench_verify_user,
+    'login': bench_login,
+    'task_add': bench_task_add,
+    'task_edit': bench_task_edit,
+    'task_toggle': bench_task_toggle,
+    'task_move': bench_task_move,
+    'task_delete': bench_task_delete,
+}
+
+
+def summarize(samples):
+    """Timing summary in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'calls': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'median_ms': round(statistics.median(ordered), 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        'min_ms': round(ordered[0], 4),
+        'max_ms': round(ordered[-1], 4),
+        'stdev_ms': round(statistics.stdev(ordered), 4) if len(ordered) > 1 else 0.0,
+    }
+
+
+def run_benchmark(factory, ctx, iterations, warmup):
+    built = factory(ctx, warmup + iterations)
+    prepare, op = built if isinstance(built, tuple) else (None, built)
+    samples = []
+    for i in range(warmup + iterations):
+        if prepare:
+            prepare(i)
+        started = time.perf_counter()
+        op(i)
+        elapsed = (time.perf_counter() - started) * 1000
+        if i >= warmup:
+            samples.append(elapsed)
+    return summarize(samples)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    header = f"{'benchmark':<14} {'median ms':>10} {'p95 ms':>10} {'mean ms':>10}"
+    if baseline:
+        header += f" {'base median':>12} {'change':>8}"
+    print(header)
+    for name, stats in results.items():
+        line = f"{name:<14} {stats['median_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['mean_ms']:>10.3f}"
+        base = (baseline or {}).get(name)
+        if base:
+            change = (stats['median_ms'] - base['median_ms']) / base['median_ms'] * 100 if base['median_ms'] else 0.0
+            line += f" {base['median_ms']:>12.3f} {change:>+7.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=1000, help='Tasks per user')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=50, help='Timed calls per benchmark')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed calls before timing')
+    parser.add_argument('--only', default='', help='Comma-separated benchmark names (default: all)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Earlier --output file to compare medians against')
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()] or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        baseline = previous['results']
+        shape = (previous['meta']['users'], previous['meta']['tasks_per_user'], previous['meta']['seed'])
+        if shape != (args.users, args.tasks, args.seed):
+            print(f"warning: {args.compare} was run with users/tasks/seed {shape}; the comparison is not like for like",
+                  file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.SQLITE_DATABASE = os.path.join(tmp, 'bench.db')
+        from app import app
+        logging.getLogger().setLevel(logging.WARNING)
+        apply_migrations()
+
+        started = time.perf_counter()
+        accounts = datagen.generate(args.users, args.tasks, seed=args.seed)
+        print(f"{args.users} users x {args.tasks} tasks generated in {time.perf_counter() - started:.1f}s; "
+              f"{args.iterations} timed calls per benchmark", file=sys.stderr)
+
+        user_id, username = accounts[0]
+        client = app.test_client()
+        _login(client, user_id, username)
+        rows, _ = database.query_tasks(user_id, limit=100)
+        ctx = {'app': app, 'client': client, 'accounts': accounts, 'user_id': user_id,
+               'task_ids': [row['id'] for row in rows]}
+
+        results = {}
+        for name in selected:
+            results[name] = run_benchmark(BENCHMARKS[name], ctx, args.iterations, args.warmup)
+
+        database.close_pools()
+        hashing.shutdown()
+
+    print_results(results, baseline)
+    if args.output:
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'users': args.users,
+                'tasks_per_user': args.tasks,
+                'seed': args.seed,
+                'iterations': args.iterations,
+                'warmup': args.warmup,
+                'password_hash_method': Config.PASSWORD_HASH_METHOD,
+            },
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark for task search: tasks_fts index vs LIKE scans
+
+Fills a throwaway SQLite database with N tasks spread over a few users,
+with words drawn from a Zipf-distributed vocabulary, then times the ranked
+board search for one user with the full-text index and with the LIKE
+fallback at growing table sizes. Index lookups cost grows with the number
+of matches; LIKE scans grow with the user's whole history.
+
+Usage:
+    python benchmarks/bench_search.py [--sizes 20000,100000,400000] [--users 20]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import database
+from config import Config
+from migrations import apply_migrations
+
+VOCABULARY = [f"word{i}" for i in range(5000)]
+CUMULATIVE_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) ** 1.1 for rank in range(len(VOCABULARY))))
+# A common word, a two-word query, a rare word and a prefix
+QUERIES = ('word50', 'word200 word10', 'word1000', 'word123')
+
+
+def fill(count, users, rng):
+    words = lambda k: ' '.join(rng.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=k))
+    rows = []
+    for _ in range(count):
+        rows.append((words(4), words(15), 'Medium', 'General', 'todo', rng.randrange(1, users + 1)))
+    with database.db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, description, priority, category, status, user_id) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+
+
+def time_query(query, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        database.query_tasks(1, search=query, sort='relevance', limit=50)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='20000,100000,400000')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.SQLITE_DATABASE = os.path.join(tmp, 'bench.db')
+        apply_migrations()
+        real_backend = database.search_backend
+        print(f"{args.users} users; ms per ranked search for user 1, mean of {args.repeat} runs")
+        print(f"{'tasks':>8} {'query':>16} {'fts5':>8} {'like':>8}")
+
+        rng = random.Random(7)
+        filled = 0
+        for size in (int(s) for s in args.sizes.split(',')):
+            fill(size - filled, args.users, rng)
+            filled = size
+            for query in QUERIES:
+                database.search_backend = real_backend
+                fts_ms = time_query(query, args.repeat)
+                database.search_backend = lambda: 'like'
+                like_ms = time_query(query, args.repeat)
+                print(f"{size:>8} {query:>16} {fts_ms:>8.2f} {like_ms:>8.2f}")
+
+        database.search_backend = real_backend
+        database.close_pools()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark: SQLite throughput with several writer processes, by tuning profile
+
+Emulates gunicorn workers sharing one tasks.db: --writers processes create,
+move and toggle tasks while --readers processes load boards and stats, all
+for --duration seconds. Runs once with the old connection settings
+(rollback journal, synchronous=FULL, default caches, 5 s busy timeout) and
+once with the configured SQLITE_* profile (WAL by default), each on a fresh
+copy of the same generated dataset, and reports operations per second,
+latency and "database is locked" failures.
+
+Usage:
+    python benchmarks/bench_sqlite_writers.py [--writers 4] [--readers 4] [--duration 10]
+        [--users 20] [--tasks 500] [--output sqlite.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import database
+import datagen
+import hashing
+from config import Config
+from migrations import apply_migrations
+
+PROFILES = {
+    # What get_sqlite_connection() did before the tuning settings existed
+    'legacy': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_MMAP_SIZE': 0,
+        'SQLITE_CACHE_SIZE': -2000,
+        'SQLITE_BUSY_TIMEOUT': 5.0,
+    },
+    'tuned': {
+        'SQLITE_JOURNAL_MODE': Config.SQLITE_JOURNAL_MODE,
+        'SQLITE_SYNCHRONOUS': Config.SQLITE_SYNCHRONOUS,
+        'SQLITE_MMAP_SIZE': Config.SQLITE_MMAP_SIZE,
+        'SQLITE_CACHE_SIZE': Config.SQLITE_CACHE_SIZE,
+        'SQLITE_BUSY_TIMEOUT': Config.SQLITE_BUSY_TIMEOUT,
+    },
+}
+
+
+def _apply(settings, db_path):
+    Config.DB_TYPE = 'sqlite'
+    Config.SQLITE_DATABASE = db_path
+    for name, value in settings.items():
+        setattr(Config, name, value)
+
+
+def _worker(role, settings, db_path, user_ids, task_ids, start_at, stop_at, seed, results):
+    """Run writes or reads until stop_at and put (role, latencies_ms, locked, other_errors) on results."""
+    _apply(settings, db_path)
+    rng = random.Random(seed)
+    latencies, locked, other = [], 0, 0
+    while time.time() < start_at:
+        time.sleep(0.001)
+    while time.time() < stop_at:
+        user_id = rng.choice(user_ids)
+        started = time.perf_counter()
+        try:
+            if role == 'writer':
+                op = rng.random()
+                if op < 0.4:
+                    database.create_task(user_id, f'Writer task {rng.randrange(10 ** 6)}', priority='Low')
+                elif op < 0.7:
+                    database.set_task_status(user_id, rng.choice(task_ids[user_id]),
+                                             rng.choice(database.VALID_TASK_STATUSES))
+                else:
+                    database.toggle_task(user_id, rng.choice(task_ids[user_id]))
+            else:
+                database.query_tasks(user_id, limit=Config.TASKS_PAGE_SIZE)
+                database.get_task_stats(user_id, task_now())
+        except sqlite3.OperationalError as exc:
+            if 'locked' in str(exc) or 'busy' in str(exc):
+                locked += 1
+            else:
+                other += 1
+            continue
+        except Exception:
+            other += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    database.close_pools()
+    results.put((role, latencies, locked, other))
+
+
+def task_now():
+    from task_service import local_now
+    return local_now()
+
+
+def prepare(path, args):
+    """Generate the dataset once (with the tuned profile) and return ids per user."""
+    _apply(PROFILES['tuned'], path)
+    apply_migrations()
+    accounts = datagen.generate(args.users, args.tasks, seed=args.seed)
+    task_ids = {}
+    with database.db_connection() as conn:
+        for user_id, _ in accounts:
+            rows = conn.execute("SELECT id FROM tasks WHERE user_id = ?", (user_id,)).fetchall()
+            task_ids[user_id] = [row[0] for row in rows]
+        # Leave a plain single-file database so each profile starts from the same state
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA journal_mode = DELETE")
+    database.close_pools()
+    hashing.shutdown()
+    return [user_id for user_id, _ in accounts], task_ids
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def run_profile(name, settings, db_path, user_ids, task_ids, args):
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    start_at = time.time() + 2.0
+    stop_at = start_at + args.duration
+    roles = ['writer'] * args.writers + ['reader'] * args.readers
+    processes = [
+        ctx.Process(target=_worker, args=(role, settings, db_path, user_ids, task_ids, start_at, stop_at,
+                                          args.seed * 1000 + n, results))
+        for n, role in enumerate(roles)
+    ]
+    for process in processes:
+        process.start()
+    # A process that died without reporting would otherwise block here forever
+    collected = [results.get(timeout=args.duration + 60) for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {}
+    for role in ('writer', 'reader'):
+        latencies = sorted(l for r, ls, _, _ in collected if r == role for l in ls)
+        summary[role + 's'] = {
+            'ops_per_second': round(len(latencies) / args.duration, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'locked_errors': sum(locked for r, _, locked, _ in collected if r == role),
+            'other_errors': sum(other for r, _, _, other in collected if r == role),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4, help='Writer processes (one per emulated worker)')
+    parser.add_argument('--readers', type=int, default=4, help='Reader processes')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per profile')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=500, help='Tasks per user')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    report = {'meta': {'writers': args.writers, 'readers': args.readers, 'duration': args.duration,
+                       'users': args.users, 'tasks_per_user': args.tasks, 'sqlite': sqlite3.sqlite_version,
+                       'profiles': PROFILES},
+              'results': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        pristine = os.path.join(tmp, 'pristine.db')
+        user_ids, task_ids = prepare(pristine, args)
+        print(f"{args.writers} writer + {args.readers} reader processes, {args.duration:g}s per profile, "
+              f"{args.users} users x {args.tasks} tasks")
+        print(f"{'profile':<8} {'role':<8} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'locked':>7}")
+        for name, settings in PROFILES.items():
+            db_path = os.path.join(tmp, f'{name}.db')
+            shutil.copyfile(pristine, db_path)
+            summary = run_profile(name, settings, db_path, user_ids, task_ids, args)
+            report['results'][name] = summary
+            for role, stats in summary.items():
+                print(f"{name:<8} {role:<8} {stats['ops_per_second']:>9.1f} {stats['p50_ms']:>8.2f} "
+                      f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['locked_errors']:>7}")
+
+    legacy, tuned = report['results']['legacy']['writers'], report['results']['tuned']['writers']
+    if legacy['ops_per_second']:
+        print(f"write throughput: {tuned['ops_per_second'] / legacy['ops_per_second']:.1f}x the legacy profile")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Deterministic synthetic dataset for the benchmarks
+
+generate() fills the configured database with N users x M tasks. The same
+seed always produces the same rows: titles, descriptions, priorities,
+categories, statuses, and created/due dates given as offsets from an
+anchor day (today by default), so the overdue / due-today / due-this-week
+mix is the same whenever the benchmark runs.
+
+All users share one password hash, computed once, so generating many
+accounts does not pay the PBKDF2 cost per user.
+
+Usage (standalone, to inspect a dataset):
+    python benchmarks/datagen.py --users 10 --tasks 500 --db /tmp/bench.db
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import database
+import hashing
+
+PASSWORD = 'bench-password'
+CATEGORIES = ('General', 'Work', 'Personal', 'Finance', 'Health', 'Shopping', 'Travel', 'Home')
+PRIORITIES = (('High', 2), ('Medium', 5), ('Low', 3))
+STATUSES = (('todo', 4), ('in_progress', 2), ('in_review', 1), ('done', 3))
+WORDS = ('report', 'invoice', 'call', 'email', 'review', 'plan', 'budget', 'meeting', 'draft', 'update',
+         'dentist', 'groceries', 'flight', 'hotel', 'rent', 'taxes', 'garden', 'car', 'backup', 'deploy',
+         'slides', 'contract', 'renew', 'insurance', 'gym', 'book', 'order', 'fix', 'clean', 'pay')
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def username(index):
+    return f"bench{index:05d}"
+
+
+def task_rows(user_id, count, rng, anchor):
+    """count task tuples for one user, in the column order of TASK_INSERT_SQL."""
+    rows = []
+    for _ in range(count):
+        title = ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize()
+        description = ' '.join(rng.choices(WORDS, k=rng.choice((0, 5, 20, 80))))
+        status = _weighted(rng, STATUSES)
+        created = anchor - timedelta(days=rng.randrange(365), seconds=rng.randrange(86400))
+        due = None
+        if rng.random() < 0.7:
+            # Mostly upcoming, some overdue, a few due today
+            due = anchor + timedelta(days=rng.randint(-30, 60), hours=rng.choice((9, 12, 17)))
+        rows.append((
+            title, description, _weighted(rng, PRIORITIES), rng.choice(CATEGORIES), status,
+            1 if status == 'done' else 0,
+            due.isoformat() if due else None, created.strftime('%Y-%m-%d %H:%M:%S'), user_id,
+        ))
+    return rows
+
+
+TASK_INSERT_SQL = (
+    "INSERT INTO tasks (title, description, priority, category, status, completed, due_date, created_at, user_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def generate(users, tasks_per_user, seed=1, anchor=None):
+    """
+    Insert users x tasks_per_user tasks into the configured database
+
+    Args:
+        users: Number of accounts (bench00000, bench00001, ...; password PASSWORD)
+        tasks_per_user: Tasks created for each account
+        seed: Random seed; the same seed gives the same rows
+        anchor: Day the relative dates are measured from (defaults to today)
+
+    Returns:
+        List of (user_id, username) in creation order
+    """
+    rng = random.Random(seed)
+    anchor = anchor or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = hashing.hash_password(PASSWORD)
+    accounts = []
+    with database.db_connection() as conn:
+        cursor = conn.cursor()
+        for index in range(users):
+            name = username(index)
+            cursor.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+                (name, f"{name}@example.com", password_hash)
+            )
+            cursor.execute("SELECT id FROM users WHERE username = ?", (name,))
+            user_id = cursor.fetchone()[0]
+            cursor.executemany(TASK_INSERT_SQL, task_rows(user_id, tasks_per_user, rng, anchor))
+            accounts.append((user_id, name))
+        conn.commit()
+        cursor.close()
+    return accounts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=500, help='Tasks per user')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--db', required=True, help='SQLite file to create (must not exist)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        parser.error(f"{args.db} already exists")
+    from config import Config
+    from migrations import apply_migrations
+    Config.DB_TYPE = 'sqlite'
+    Config.SQLITE_DATABASE = args.db
+    apply_migrations()
+    accounts = generate(args.users, args.tasks, seed=args.seed)
+    database.close_pools()
+    hashing.shutdown()
+    print(f"Created {len(accounts)} users x {args.tasks} tasks in {args.db} (password: {PASSWORD})")
+
+
+if __name__ == '__main__':
+    main()
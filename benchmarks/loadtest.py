@@ -0,0 +1,398 @@
+"""
+Load test: boot the app under gunicorn_config.py and drive mixed user traffic
+
+For every worker class x worker count asked for, starts
+`gunicorn --config gunicorn_config.py app:app` on a copy of a generated
+SQLite dataset (see datagen.py), then runs --clients simulated users for
+--duration seconds after a --warmup. Each simulated user keeps one
+keep-alive connection and its own session cookie, logs in, and then picks
+actions from the traffic mix (board view, create, move, toggle, and a
+fresh login now and then).
+
+Reports per endpoint: requests, throughput, p50/p95/p99 latency and error
+rate (any unexpected status, e.g. 429 from a saturated hashing pool, or a
+connection error). Simulated users run on several client processes so the
+load generator itself is not limited by one GIL.
+
+Usage:
+    python benchmarks/loadtest.py [--worker-class sync,gthread] [--workers 1,2,4]
+        [--threads 4] [--clients 32] [--duration 30] [--mix board=60,create=10,move=10,toggle=15,login=5]
+        [--output capacity.json]
+"""
+import argparse
+import concurrent.futures
+import http.client
+import http.cookies
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+
+os.environ['DB_TYPE'] = 'sqlite'
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import database
+import datagen
+import hashing
+from config import Config
+from migrations import apply_migrations
+
+DEFAULT_MIX = 'board=60,create=10,move=10,toggle=15,login=5'
+# Action -> status a successful request answers with
+EXPECTED_STATUS = {'login': 302, 'board': 200, 'create': 302, 'move': 302, 'toggle': 302}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in EXPECTED_STATUS:
+            raise ValueError(f"unknown action {name!r} (choose from {', '.join(EXPECTED_STATUS)})")
+        mix[name] = float(weight)
+    return mix
+
+
+class SimulatedUser:
+    """One browser: a keep-alive connection, a session cookie and an account."""
+
+    def __init__(self, host, port, username, task_ids, seed, timeout=30):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.username = username
+        self.task_ids = task_ids
+        self.rng = random.Random(seed)
+        self.cookies = {}
+        self.conn = None
+        self.created = 0
+
+    def _request(self, method, path, form=None):
+        body, headers = None, {}
+        if form is not None:
+            body = urllib.parse.urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{k}={v}" for k, v in self.cookies.items())
+        for attempt in (1, 2):
+            reused = self.conn is not None
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                self.conn.close()
+                self.conn = None
+                # Like a browser, retry once on a fresh connection when the server
+                # had closed an idle keep-alive connection (keepalive, max_requests)
+                if not reused or attempt == 2:
+                    raise
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for name, morsel in http.cookies.SimpleCookie(header).items():
+                if morsel.value:
+                    self.cookies[name] = morsel.value
+                else:
+                    self.cookies.pop(name, None)
+        return response.status
+
+    def act(self, action):
+        """Run one action and return the HTTP status."""
+        if action == 'login':
+            self.cookies.clear()
+            return self._request('POST', '/login', {'username': self.username, 'password': datagen.PASSWORD})
+        if action == 'board':
+            return self._request('GET', '/home')
+        if action == 'create':
+            self.created += 1
+            return self._request('POST', '/task/add', {
+                'title': f'Load test {self.created}', 'description': 'Created by loadtest.py',
+                'priority': self.rng.choice(('High', 'Medium', 'Low')), 'category': 'Work', 'due_date': '',
+            })
+        task_id = self.rng.choice(self.task_ids)
+        if action == 'move':
+            return self._request('POST', f'/task/{task_id}/move',
+                                 {'status': self.rng.choice(database.VALID_TASK_STATUSES)})
+        return self._request('POST', f'/task/{task_id}/toggle')
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+def _drive(host, port, accounts, mix, measure_from, stop_at, think, seed):
+    """
+    Run one thread per account until stop_at (client process entry point)
+
+    Returns:
+        {action: {'latencies': [ms, ...], 'errors': {status: n}}} for requests
+        started at or after measure_from ('connection' for transport errors)
+    """
+    actions, weights = zip(*mix.items())
+    samples = {action: {'latencies': [], 'errors': {}} for action in actions}
+    lock = threading.Lock()
+
+    def run(index, username, task_ids):
+        user = SimulatedUser(host, port, username, task_ids, seed * 100003 + index)
+        action = 'login'
+        while True:
+            started = time.time()
+            if started >= stop_at:
+                break
+            t0 = time.perf_counter()
+            try:
+                status = user.act(action)
+            except (OSError, http.client.HTTPException):
+                status = 'connection'
+            elapsed = (time.perf_counter() - t0) * 1000
+            ok = status == EXPECTED_STATUS[action]
+            if started >= measure_from:
+                with lock:
+                    samples[action]['latencies'].append(elapsed)
+                    if not ok:
+                        errors = samples[action]['errors']
+                        errors[str(status)] = errors.get(str(status), 0) + 1
+            if action == 'login' and not ok:
+                time.sleep(0.05)
+                continue
+            action = user.rng.choices(actions, weights=weights)[0]
+            if think:
+                time.sleep(user.rng.expovariate(1 / think))
+        user.close()
+
+    threads = [threading.Thread(target=run, args=(i, username, task_ids))
+               for i, (username, task_ids) in enumerate(accounts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+def summarize(samples, seconds):
+    endpoints = {}
+    total_latencies, total_errors = [], {}
+    for action, data in samples.items():
+        ordered = sorted(data['latencies'])
+        total_latencies.extend(ordered)
+        for status, count in data['errors'].items():
+            total_errors[status] = total_errors.get(status, 0) + count
+        endpoints[action] = _stats(ordered, data['errors'], seconds)
+    total = _stats(sorted(total_latencies), total_errors, seconds)
+    return endpoints, total
+
+
+def _stats(ordered, errors, seconds):
+    return {
+        'requests': len(ordered),
+        'throughput_rps': round(len(ordered) / seconds, 2),
+        'p50_ms': percentile(ordered, 0.50),
+        'p95_ms': percentile(ordered, 0.95),
+        'p99_ms': percentile(ordered, 0.99),
+        'errors': sum(errors.values()),
+        'error_statuses': dict(errors),
+        'error_rate': round(sum(errors.values()) / len(ordered), 4) if ordered else 0.0,
+    }
+
+
+def _wait_until_healthy(port, process, log_path, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+            conn.close()
+        except OSError:
+            pass
+        time.sleep(0.2)
+    with open(log_path) as f:
+        tail = f.read()[-4000:]
+    raise RuntimeError(f"gunicorn did not become healthy on port {port}:\n{tail}")
+
+
+def start_server(port, db_path, worker_class, workers, threads, log_path, extra_env):
+    env = dict(os.environ, **extra_env)
+    env.update({
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_WORKER_CLASS': worker_class,
+        'GUNICORN_THREADS': str(threads),
+        'GUNICORN_ACCESSLOG': '',
+        'GUNICORN_LOGLEVEL': 'warning',
+        'DB_TYPE': 'sqlite',
+        'SQLITE_DATABASE': db_path,
+        'LOG_FILE': '',
+    })
+    log = open(log_path, 'w')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn_config.py', 'app:app'],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    log.close()
+    try:
+        _wait_until_healthy(port, process, log_path)
+    except Exception:
+        stop_server(process)
+        raise
+    return process
+
+
+def stop_server(process):
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def run_load(port, accounts, mix, args):
+    processes = max(1, min(args.client_processes, len(accounts)))
+    slices = [accounts[i::processes] for i in range(processes)]
+    measure_from = time.time() + args.warmup + 1
+    stop_at = measure_from + args.duration
+    merged = {action: {'latencies': [], 'errors': {}} for action in mix}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_drive, '127.0.0.1', port, chunk, mix, measure_from, stop_at,
+                               args.think_ms / 1000, args.seed + n)
+                   for n, chunk in enumerate(slices)]
+        for future in futures:
+            for action, data in future.result().items():
+                merged[action]['latencies'].extend(data['latencies'])
+                for status, count in data['errors'].items():
+                    merged[action]['errors'][status] = merged[action]['errors'].get(status, 0) + count
+    return summarize(merged, args.duration)
+
+
+def prepare_dataset(path, args):
+    """Migrate and fill a pristine SQLite file; every server run starts from a copy."""
+    Config.SQLITE_DATABASE = path
+    apply_migrations()
+    accounts = datagen.generate(args.clients, args.tasks, seed=args.seed)
+    with database.db_connection() as conn:
+        cursor = conn.cursor()
+        owned = []
+        for user_id, username in accounts:
+            cursor.execute("SELECT id FROM tasks WHERE user_id = ? ORDER BY id LIMIT 200", (user_id,))
+            owned.append((username, [row[0] for row in cursor.fetchall()]))
+        cursor.close()
+    database.close_pools()
+    hashing.shutdown()
+    return owned
+
+
+def print_row(label, stats):
+    print(f"  {label:<8} {stats['requests']:>8} {stats['throughput_rps']:>9.1f} "
+          f"{stats['p50_ms'] or 0:>9.1f} {stats['p95_ms'] or 0:>9.1f} {stats['p99_ms'] or 0:>9.1f} "
+          f"{stats['error_rate'] * 100:>7.2f}%  {_format_statuses(stats['error_statuses'])}")
+
+
+def _format_statuses(statuses):
+    return ', '.join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker-class', default='sync', help='Comma-separated gunicorn worker classes')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated worker counts')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker for the gthread class')
+    parser.add_argument('--clients', type=int, default=32, help='Simulated users (one account each)')
+    parser.add_argument('--tasks', type=int, default=200, help='Tasks per account in the dataset')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per configuration')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before each measurement')
+    parser.add_argument('--think-ms', type=float, default=0, help='Mean pause between a user\'s actions')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='action=weight pairs')
+    parser.add_argument('--client-processes', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--port', type=int, default=18000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--password-hash-method', default=Config.PASSWORD_HASH_METHOD,
+                        help='Hash cost for the dataset and the server (logins are dominated by it)')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    worker_classes = [c.strip() for c in args.worker_class.split(',') if c.strip()]
+    worker_counts = [int(n) for n in args.workers.split(',') if n.strip()]
+    Config.PASSWORD_HASH_METHOD = args.password_hash_method
+    extra_env = {'PASSWORD_HASH_METHOD': args.password_hash_method}
+
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        pristine = os.path.join(tmp, 'pristine.db')
+        accounts = prepare_dataset(pristine, args)
+        print(f"{args.clients} simulated users, {args.tasks} tasks each; {args.duration:g}s measured "
+              f"after {args.warmup:g}s warmup; mix {args.mix}", file=sys.stderr)
+
+        for worker_class in worker_classes:
+            for workers in worker_counts:
+                threads = args.threads if worker_class == 'gthread' else 1
+                db_path = os.path.join(tmp, f'{worker_class}-{workers}.db')
+                shutil.copyfile(pristine, db_path)
+                log_path = os.path.join(tmp, f'{worker_class}-{workers}.log')
+                process = start_server(args.port, db_path, worker_class, workers, threads, log_path, extra_env)
+                try:
+                    endpoints, total = run_load(args.port, accounts, mix, args)
+                finally:
+                    stop_server(process)
+
+                label = f"{worker_class} x{workers}" + (f" ({threads} threads)" if threads > 1 else '')
+                print(f"\n{label}")
+                print(f"  {'endpoint':<8} {'requests':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+                      f"{'p99 ms':>9} {'errors':>8}")
+                for action, stats in endpoints.items():
+                    print_row(action, stats)
+                print_row('total', total)
+                runs.append({'worker_class': worker_class, 'workers': workers, 'threads': threads,
+                             'endpoints': endpoints, 'total': total})
+
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'clients': args.clients,
+                'tasks_per_user': args.tasks,
+                'duration': args.duration,
+                'warmup': args.warmup,
+                'think_ms': args.think_ms,
+                'mix': mix,
+                'password_hash_method': args.password_hash_method,
+            },
+            'runs': runs,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"\nResults written to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
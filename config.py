@@ -13,15 +13,73 @@ class Config:
     # SQLite configuration (local development)
     SQLITE_DATABASE = os.environ.get('SQLITE_DATABASE', 'tasks.db')
     
+    # SQLite tuning applied to every connection ('' leaves SQLite's default).
+    # WAL lets readers run alongside the single writer; synchronous=NORMAL is
+    # durable across application crashes under WAL; cache_size < 0 is in KiB.
+    # Foreign keys stay off by default: older databases hold tasks whose user
+    # row no longer exists.
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', '-65536'))
+    SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '10'))  # seconds
+    SQLITE_FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', 'False').lower() in ['true', '1', 'yes']
+    # Seconds between wal_checkpoint(PASSIVE) + optimize runs per worker (0 disables)
+    SQLITE_MAINTENANCE_INTERVAL = float(os.environ.get('SQLITE_MAINTENANCE_INTERVAL', '300'))
+    
     # Azure SQL configuration (production)
     AZURE_SQL_SERVER = os.environ.get('AZURE_SQL_SERVER', '')
     AZURE_SQL_DATABASE = os.environ.get('AZURE_SQL_DATABASE', '')
     AZURE_SQL_USERNAME = os.environ.get('AZURE_SQL_USERNAME', '')
     AZURE_SQL_PASSWORD = os.environ.get('AZURE_SQL_PASSWORD', '')
     
+    # Connection pool (one pool per worker process)
+    DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '1'))
+    DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '10'))
+    DB_POOL_IDLE_TIMEOUT = float(os.environ.get('DB_POOL_IDLE_TIMEOUT', '300'))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_PING_INTERVAL = float(os.environ.get('DB_POOL_PING_INTERVAL', '10'))
+    
     # Azure Application Insights
     APPINSIGHTS_INSTRUMENTATION_KEY = os.environ.get('APPINSIGHTS_INSTRUMENTATION_KEY', '')
     
+    # Task board pagination
+    TASKS_PAGE_SIZE = int(os.environ.get('TASKS_PAGE_SIZE', '200'))
+    TASKS_MAX_PAGE_SIZE = int(os.environ.get('TASKS_MAX_PAGE_SIZE', '1000'))
+    API_BATCH_MAX_OPERATIONS = int(os.environ.get('API_BATCH_MAX_OPERATIONS', '1000'))
+    TASKS_COLUMN_LIMIT = int(os.environ.get('TASKS_COLUMN_LIMIT', '50'))  # 0 = no per-column limit
+    
+    # Per-worker task snapshot cache
+    TASK_CACHE_ENABLED = os.environ.get('TASK_CACHE_ENABLED', 'True').lower() in ['true', '1', 'yes']
+    TASK_CACHE_MAX_BYTES = int(os.environ.get('TASK_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    TASK_CACHE_MAX_TASKS = int(os.environ.get('TASK_CACHE_MAX_TASKS', '2000'))
+    
+    # Logging (queue-backed, see logging_setup.py)
+    LOG_FILE = os.environ.get('LOG_FILE', 'app.log')
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', '5'))
+    
+    # Login identifier lookups cached per worker (never password checks; 0 disables)
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', '30'))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', '10000'))
+    
+    # Password hashing (see hashing.py): werkzeug method string, and a
+    # per-worker process pool (0 workers = hash inline) with a pending cap
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_SALT_LENGTH = int(os.environ.get('PASSWORD_HASH_SALT_LENGTH', '16'))
+    HASH_POOL_WORKERS = int(os.environ.get('HASH_POOL_WORKERS', '1'))
+    HASH_POOL_MAX_PENDING = int(os.environ.get('HASH_POOL_MAX_PENDING', '4'))
+    HASH_POOL_TIMEOUT = float(os.environ.get('HASH_POOL_TIMEOUT', '10'))
+    
+    # Rendered task cards cached per worker (0 disables the cache)
+    TASK_CARD_CACHE_SIZE = int(os.environ.get('TASK_CARD_CACHE_SIZE', '5000'))
+    
+    # Debug tracing (see tracing.py)
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+    TRACE_USER_IDS = os.environ.get('TRACE_USER_IDS', '')
+    TRACE_ALLOW_HEADER = os.environ.get('TRACE_ALLOW_HEADER', 'True').lower() in ['true', '1', 'yes']
+    
     # Application settings
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() in ['true', '1', 'yes']
     ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
@@ -35,6 +93,7 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     DB_TYPE = 'azure_sql'
+    TRACE_ALLOW_HEADER = os.environ.get('TRACE_ALLOW_HEADER', 'False').lower() in ['true', '1', 'yes']
 
 # Configuration dictionary
 config = {
@@ -1,17 +1,41 @@
 """
 Database connection module supporting both SQLite and Azure SQL
 """
+import os
+import re
 import sqlite3
 import logging
-from werkzeug.security import generate_password_hash, check_password_hash
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask import g, has_app_context
+
 from config import Config
+import hashing
+from db_pool import ConnectionPool
+from user_cache import UserCache
 
 logger = logging.getLogger(__name__)
 
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+
+# Login identifier -> user metadata, per worker (see user_cache.py)
+user_cache = UserCache(ttl=Config.USER_CACHE_TTL, max_entries=Config.USER_CACHE_SIZE)
+
+# Connection pools for this worker process, keyed by connection target
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+_pool_generation = 0
+
 def get_db_connection():
     """
     Create database connection based on configuration
     Returns a connection object with row_factory set
+
+    This opens a new, unpooled connection that the caller must close.
+    Request handlers should use db_connection() instead.
     """
     config = Config()
     
@@ -20,11 +44,38 @@ def get_db_connection():
     else:
         return get_sqlite_connection()
 
+SQLITE_JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SQLITE_SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def sqlite_pragmas():
+    """PRAGMA statements for the configured SQLite tuning profile (see Config.SQLITE_*)."""
+    pragmas = []
+    journal_mode = Config.SQLITE_JOURNAL_MODE.strip().upper()
+    if journal_mode:
+        if journal_mode not in SQLITE_JOURNAL_MODES:
+            raise ValueError(f"Unsupported SQLITE_JOURNAL_MODE: {Config.SQLITE_JOURNAL_MODE}")
+        pragmas.append(f"PRAGMA journal_mode = {journal_mode}")
+    synchronous = Config.SQLITE_SYNCHRONOUS.strip().upper()
+    if synchronous:
+        if synchronous not in SQLITE_SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Unsupported SQLITE_SYNCHRONOUS: {Config.SQLITE_SYNCHRONOUS}")
+        pragmas.append(f"PRAGMA synchronous = {synchronous}")
+    pragmas.append(f"PRAGMA mmap_size = {int(Config.SQLITE_MMAP_SIZE)}")
+    pragmas.append(f"PRAGMA cache_size = {int(Config.SQLITE_CACHE_SIZE)}")
+    pragmas.append(f"PRAGMA foreign_keys = {'ON' if Config.SQLITE_FOREIGN_KEYS else 'OFF'}")
+    return pragmas
+
+
 def get_sqlite_connection():
     """Create SQLite database connection for local development"""
     try:
-        conn = sqlite3.connect(Config.SQLITE_DATABASE)
+        # Pooled connections may be handed to a different thread than the one that opened them;
+        # timeout is the busy timeout: how long a writer waits for another worker's lock
+        conn = sqlite3.connect(Config.SQLITE_DATABASE, timeout=Config.SQLITE_BUSY_TIMEOUT, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        for pragma in sqlite_pragmas():
+            conn.execute(pragma)
         logger.info("Connected to SQLite database")
         return conn
     except Exception as e:
@@ -63,24 +114,208 @@ def get_azure_sql_connection():
         logger.error(f"Failed to connect to Azure SQL: {e}")
         raise
 
-def init_database():
-    """Initialize database schema"""
-    conn = get_db_connection()
-    
+def _pool_target():
+    """
+    Identify the database the current configuration points at
+
+    Returns (key, identity). For SQLite files the identity is the file's
+    inode, or None when the file does not exist yet, so a pool is rebuilt
+    when the file is deleted and recreated.
+    """
     if Config.DB_TYPE == 'azure_sql':
-        init_azure_sql_schema(conn)
-    else:
-        init_sqlite_schema(conn)
+        return ('azure_sql', Config.AZURE_SQL_SERVER, Config.AZURE_SQL_DATABASE), 'remote'
+
+    path = Config.SQLITE_DATABASE
+    if path == ':memory:':
+        return ('sqlite', path), 'memory'
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ('sqlite', path), None
+    return ('sqlite', path), (stat.st_dev, stat.st_ino)
+
+
+def _create_pool():
+    global _pool_generation
+    factory = get_azure_sql_connection if Config.DB_TYPE == 'azure_sql' else get_sqlite_connection
+    pool = ConnectionPool(
+        factory,
+        min_size=Config.DB_POOL_MIN_SIZE,
+        max_size=Config.DB_POOL_MAX_SIZE,
+        idle_timeout=Config.DB_POOL_IDLE_TIMEOUT,
+        checkout_timeout=Config.DB_POOL_TIMEOUT,
+        ping_interval=Config.DB_POOL_PING_INTERVAL,
+    )
+    _pool_generation += 1
+    pool.generation = _pool_generation
+    return pool
+
+
+def get_pool():
+    """Return the connection pool for the configured database in this process."""
+    global _pools_pid
+    key, identity = _pool_target()
+
+    with _pools_lock:
+        # A forked worker must never reuse its parent's sockets or file handles
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+
+        current = _pools.get(key)
+        if current is not None:
+            pool, known_identity = current
+            if identity is not None and identity == known_identity:
+                return pool
+            if identity is not None and known_identity is None:
+                # First connection created the file
+                _pools[key] = (pool, identity)
+                return pool
+            # Database file was deleted or replaced underneath us
+            pool.close()
+
+        pool = _create_pool()
+        _pools[key] = (pool, identity)
+        return pool
+
+
+@contextmanager
+def db_connection():
+    """
+    Borrow a pooled connection for the configured database
+
+    Inside a Flask app context every helper called during the request shares
+    one connection, borrowed on first use and kept on flask.g until
+    release_request_connection() returns it at teardown. Elsewhere the
+    connection goes back to the pool when the block exits. Either way, work
+    left uncommitted when the outermost block exits is rolled back.
+    """
+    pool = get_pool()
+    held = g.get('_db_connection') if has_app_context() else None
+    if not has_app_context() or (held is not None and held[0] is not pool):
+        # No request, or the configured database changed mid-request
+        with pool.connection() as conn:
+            yield conn
+        return
+
+    if held is None:
+        held = (pool, pool.acquire())
+        g._db_connection = held
+        g.db_connections_opened = g.get('db_connections_opened', 0) + 1
+    conn = held[1]
+    g._db_depth = g.get('_db_depth', 0) + 1
+    failed = False
+    try:
+        yield conn
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        g._db_depth -= 1
+        # Nested blocks share the outer block's transaction; only the outermost cleans up
+        if g._db_depth == 0 and (failed or getattr(conn, 'in_transaction', False)):
+            try:
+                conn.rollback()
+            except Exception as exc:
+                logger.warning("Rollback of request connection failed: %s", exc)
+
+
+def release_request_connection():
+    """
+    Return the app context's shared connection to its pool (teardown_appcontext)
+
+    Also runs the periodic SQLite maintenance on it when that is due.
+
+    Returns:
+        Connections this context borrowed from the pool
+    """
+    held = g.pop('_db_connection', None)
+    if held is not None:
+        pool, conn = held
+        try:
+            maybe_run_sqlite_maintenance(conn)
+        except Exception as exc:
+            logger.warning("SQLite maintenance failed: %s", exc)
+        pool.release(conn)
+    return g.pop('db_connections_opened', 0)
+
+
+_maintenance_lock = threading.Lock()
+_last_maintenance = time.monotonic()
+
+
+def run_sqlite_maintenance(conn):
+    """Checkpoint the WAL without blocking writers and refresh query planner statistics."""
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+    conn.execute("PRAGMA optimize").fetchall()
+
+
+def maybe_run_sqlite_maintenance(conn):
+    """
+    Run run_sqlite_maintenance() if SQLITE_MAINTENANCE_INTERVAL has passed in this worker
+
+    Returns:
+        True if maintenance ran
+    """
+    global _last_maintenance
+    interval = Config.SQLITE_MAINTENANCE_INTERVAL
+    if _is_azure() or interval <= 0 or time.monotonic() - _last_maintenance < interval:
+        return False
+    # One thread per worker does it; the others carry on
+    if not _maintenance_lock.acquire(blocking=False):
+        return False
+    try:
+        if time.monotonic() - _last_maintenance < interval:
+            return False
+        _last_maintenance = time.monotonic()
+        run_sqlite_maintenance(conn)
+        return True
+    finally:
+        _maintenance_lock.release()
+
+
+def database_generation():
+    """
+    Token that changes whenever the configured database changes
+
+    In-process caches use it as a namespace so entries loaded from one
+    database are never served for another (e.g. a replaced SQLite file).
+    """
+    return get_pool().generation
+
+
+def close_pools():
+    """Close every pool owned by this process."""
+    with _pools_lock:
+        pools = [pool for pool, _ in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def remove_sqlite_database(path):
+    """
+    Delete an SQLite database file together with its WAL and shared-memory files
+
+    Closes this process's pools first: a connection still open on a deleted
+    WAL database can remove or replay a log that now belongs to a new file
+    at the same path.
+    """
+    close_pools()
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def init_database():
+    """Initialize database schema by applying all pending migrations"""
+    from migrations import apply_migrations
+    apply_migrations()
     
-    conn.close()
     logger.info("Database initialized successfully")
 
-def init_sqlite_schema(conn):
-    """Initialize SQLite schema"""
-    with open('schema.sql', 'r') as f:
-        conn.executescript(f.read())
-    conn.commit()
-
 def init_azure_sql_schema(conn):
     """Initialize Azure SQL schema"""
     cursor = conn.cursor()
@@ -117,6 +352,24 @@ def init_azure_sql_schema(conn):
     conn.commit()
     cursor.close()
 
+# Composite indexes for the per-user task access paths (migration 3; migration 8 drops idx_tasks_user_due)
+AZURE_SQL_TASK_INDEXES = [
+    ('idx_tasks_user_created', 'tasks(user_id, created_at)'),
+    ('idx_tasks_user_status', 'tasks(user_id, status)'),
+    ('idx_tasks_user_due', 'tasks(user_id, due_date)'),
+]
+
+def create_azure_sql_task_indexes(conn):
+    """Create the per-user task indexes on Azure SQL if they are missing"""
+    cursor = conn.cursor()
+    for name, target in AZURE_SQL_TASK_INDEXES:
+        cursor.execute(f"""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = '{name}')
+            CREATE INDEX {name} ON {target}
+        """)
+    conn.commit()
+    cursor.close()
+
 def execute_query(query, params=None, fetch_one=False, fetch_all=False):
     """
     Execute a database query with automatic connection management
@@ -130,31 +383,30 @@ def execute_query(query, params=None, fetch_one=False, fetch_all=False):
     Returns:
         Query results or row count
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        if fetch_one:
-            result = cursor.fetchone()
-        elif fetch_all:
-            result = cursor.fetchall()
-        else:
-            conn.commit()
-            result = cursor.rowcount
+    with db_connection() as conn:
+        cursor = conn.cursor()
         
-        return result
-    except Exception as e:
-        logger.error(f"Database query failed: {e}")
-        conn.rollback()
-        raise
-    finally:
-        cursor.close()
-        conn.close()
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            
+            if fetch_one:
+                result = cursor.fetchone()
+            elif fetch_all:
+                result = cursor.fetchall()
+            else:
+                conn.commit()
+                result = cursor.rowcount
+            
+            return result
+        except Exception as e:
+            logger.error(f"Database query failed: {e}")
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
 
 
 # User Authentication Functions
@@ -170,32 +422,36 @@ def create_user(username, email, password):
     
     Returns:
         User ID if successful, None if user exists
+
+    Raises:
+        hashing.HashingBusy: Too many password hashes in flight on this worker
     """
+    password_hash = hashing.hash_password(password)
     try:
-        password_hash = generate_password_hash(password)
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        if Config.DB_TYPE == 'azure_sql':
-            cursor.execute(
-                "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?); SELECT SCOPE_IDENTITY() AS user_id",
-                (username, email, password_hash)
-            )
-            # Move to the result set with the SCOPE_IDENTITY() value
-            cursor.nextset()
-            result = cursor.fetchone()
-            user_id = int(result[0]) if result and result[0] is not None else None
-        else:
-            cursor.execute(
-                "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
-                (username, email, password_hash)
-            )
-            user_id = cursor.lastrowid
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            
+            if Config.DB_TYPE == 'azure_sql':
+                cursor.execute(
+                    "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?); SELECT SCOPE_IDENTITY() AS user_id",
+                    (username, email, password_hash)
+                )
+                # Move to the result set with the SCOPE_IDENTITY() value
+                cursor.nextset()
+                result = cursor.fetchone()
+                user_id = int(result[0]) if result and result[0] is not None else None
+            else:
+                cursor.execute(
+                    "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+                    (username, email, password_hash)
+                )
+                user_id = cursor.lastrowid
+            
+            conn.commit()
+            cursor.close()
         
+        # The signup checks usually just cached both identifiers as unknown
+        forget_logins(username, email)
         logger.info(f"User created: {username}")
         return user_id
     except Exception as e:
@@ -214,12 +470,11 @@ def get_user_by_username(username):
         User dict or None if not found
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, username, email, password_hash FROM users WHERE username = ?", (username,))
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, username, email, password_hash FROM users WHERE username = ?", (username,))
+            user = cursor.fetchone()
+            cursor.close()
         
         if user:
             return dict(user) if hasattr(user, 'keys') else {
@@ -245,12 +500,11 @@ def get_user_by_email(email):
         User dict or None if not found
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, username, email, password_hash FROM users WHERE email = ?", (email,))
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, username, email, password_hash FROM users WHERE email = ?", (email,))
+            user = cursor.fetchone()
+            cursor.close()
         
         if user:
             return dict(user) if hasattr(user, 'keys') else {
@@ -265,6 +519,97 @@ def get_user_by_email(email):
         return None
 
 
+def _login_cache_key(identifier):
+    return (database_generation(), identifier)
+
+
+def _match_login(rows, identifier):
+    """Pick the row an identifier logs in as: a username match wins over an email match."""
+    folded = identifier.lower()
+    for field in ('username', 'email'):
+        for row in rows:
+            if (row.get(field) or '').lower() == folded:
+                return row
+    return None
+
+
+def _fetch_login_rows(identifiers):
+    """Every user whose username or email is one of the identifiers, in one query."""
+    placeholders = ', '.join('?' * len(identifiers))
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, username, email, password_hash FROM users "
+            f"WHERE username IN ({placeholders}) OR email IN ({placeholders})",
+            tuple(identifiers) * 2
+        )
+        rows = [_row_dict(cursor, row) for row in cursor.fetchall()]
+        cursor.close()
+    return rows
+
+
+def get_user_by_login(identifier):
+    """
+    Retrieve the user a login identifier (username or email) refers to
+
+    Uses the unique username and email indexes in a single query and
+    refreshes the user cache when the account exists.
+
+    Returns:
+        User dict including password_hash, or None if not found
+    """
+    generation = user_cache.generation()
+    try:
+        user = _match_login(_fetch_login_rows([identifier]), identifier)
+    except Exception as e:
+        logger.error(f"Failed to get user by login: {e}")
+        return None
+    if user:
+        user_cache.put(_login_cache_key(identifier), user, generation)
+    return user
+
+
+def lookup_logins(*identifiers):
+    """
+    Public metadata (id, username, email) for each login identifier
+
+    Served from the user cache where possible; the rest are fetched
+    together in one query. Misses are not cached: the account may be
+    created on another worker, whose invalidation this worker never sees.
+
+    Returns:
+        {identifier: user metadata dict or None}
+    """
+    found = {}
+    missing = []
+    for identifier in identifiers:
+        hit, user = user_cache.get(_login_cache_key(identifier))
+        if hit:
+            found[identifier] = user
+        else:
+            missing.append(identifier)
+
+    if missing:
+        generation = user_cache.generation()
+        try:
+            rows = _fetch_login_rows(missing)
+        except Exception as e:
+            logger.error(f"Failed to look up logins: {e}")
+            found.update((identifier, None) for identifier in missing)
+            return found
+        for identifier in missing:
+            user = _match_login(rows, identifier)
+            if user:
+                user_cache.put(_login_cache_key(identifier), user, generation)
+            found[identifier] = {field: user[field] for field in ('id', 'username', 'email')} if user else None
+    return found
+
+
+def forget_logins(*identifiers):
+    """Drop cached lookups after an account is created or renamed."""
+    user_cache.invalidate(*(_login_cache_key(identifier) for identifier in identifiers if identifier))
+
+
 def verify_user(username, password):
     """
     Verify user credentials
@@ -274,16 +619,38 @@ def verify_user(username, password):
         password: Plain text password to verify
     
     Returns:
-        User dict if valid, None if invalid
+        User dict if valid, None if invalid. Hashes made with outdated
+        parameters are replaced on a successful check.
+
+    Raises:
+        hashing.HashingBusy: Too many password hashes in flight on this worker
     """
-    # Try username first, then email
-    user = get_user_by_username(username)
+    # Always read the row: the password hash is needed anyway, and a cached
+    # "no such account" from this worker may predate a signup on another one
+    user = get_user_by_login(username)
     if not user:
-        user = get_user_by_email(username)
-    
-    if user and check_password_hash(user['password_hash'], password):
-        return user
-    return None
+        return None
+    valid, new_hash = hashing.verify_password(user['password_hash'], password)
+    if not valid:
+        return None
+    if new_hash:
+        update_password_hash(user['id'], new_hash)
+        user['password_hash'] = new_hash
+    return user
+
+
+def update_password_hash(user_id, password_hash):
+    """Store a new password hash (password change or cost upgrade on login)."""
+    try:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, user_id))
+            conn.commit()
+            cursor.close()
+        return True
+    except Exception as e:
+        logger.error(f"Failed to update password hash: {e}")
+        return False
 
 
 def get_user_by_id(user_id):
@@ -297,12 +664,11 @@ def get_user_by_id(user_id):
         User dict or None if not found
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, username, email FROM users WHERE id = ?", (user_id,))
-        user = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, username, email FROM users WHERE id = ?", (user_id,))
+            user = cursor.fetchone()
+            cursor.close()
         
         if user:
             return dict(user) if hasattr(user, 'keys') else {
@@ -314,3 +680,926 @@ def get_user_by_id(user_id):
     except Exception as e:
         logger.error(f"Failed to get user by ID: {e}")
         return None
+
+
+# Schema capabilities
+
+class SchemaError(RuntimeError):
+    """Raised when the tasks table cannot serve per-user queries."""
+
+
+# database_generation() -> capability map, see task_schema()
+_task_schemas = {}
+_task_schemas_lock = threading.Lock()
+
+
+def _inspect_task_schema():
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if _is_azure():
+            cursor.execute("SELECT name FROM sys.columns WHERE object_id = OBJECT_ID('tasks')")
+            columns = {row[0].lower() for row in cursor.fetchall()}
+            cursor.execute("SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('tasks')")
+            search = 'fulltext' if cursor.fetchone() else 'like'
+        else:
+            # table_xinfo also lists generated columns (priority_rank), which table_info hides
+            cursor.execute("PRAGMA table_xinfo(tasks)")
+            columns = {row[1].lower() for row in cursor.fetchall()}
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+            search = 'fts5' if cursor.fetchone() else 'like'
+        cursor.close()
+    return {
+        'columns': frozenset(columns),
+        'has_status': 'status' in columns,
+        'has_completed': 'completed' in columns,
+        'has_user_id': 'user_id' in columns,
+        'search': search,
+    }
+
+
+def task_schema():
+    """
+    Capabilities of the tasks table, inspected once per process and database
+
+    Queries build their exact column lists from this map instead of trying
+    statement variants until one succeeds.
+
+    Returns:
+        Dict with 'columns', 'has_status', 'has_completed', 'has_user_id'
+        and 'search' (see search_backend())
+
+    Raises:
+        SchemaError: The table is missing or has no user_id column
+    """
+    generation = database_generation()
+    schema = _task_schemas.get(generation)
+    if schema is not None:
+        return schema
+    # Threads of a gthread worker that miss together inspect the table once
+    with _task_schemas_lock:
+        schema = _task_schemas.get(generation)
+        if schema is None:
+            schema = _inspect_task_schema()
+            if not schema['has_user_id']:
+                # Never fall back to unscoped queries: every user would see every task
+                raise SchemaError("tasks table has no user_id column; run `python manage.py migrate`")
+            _task_schemas[generation] = schema
+    return schema
+
+
+def forget_task_schema():
+    """Drop the cached capability maps (after migrations change the schema)."""
+    _task_schemas.clear()
+
+
+def task_list_columns():
+    """TASK_LIST_COLUMNS as present in this database, with completed standing in for a missing status."""
+    schema = task_schema()
+    columns = [column for column in TASK_LIST_COLUMNS if column in schema['columns']]
+    if not schema['has_status'] and schema['has_completed']:
+        columns.append('completed')
+    return columns
+
+
+def _done_sql():
+    return "status = 'done'" if task_schema()['has_status'] else "completed = 1"
+
+
+def _pending_sql():
+    if task_schema()['has_status']:
+        return "(status IS NULL OR status <> 'done')"
+    return "(completed IS NULL OR completed = 0)"
+
+
+# Task Queries
+
+PRIORITY_RANK_SQL = "CASE priority WHEN 'High' THEN 3 WHEN 'Low' THEN 1 ELSE 2 END"
+PRIORITY_RANKS = {'High': 3, 'Medium': 2, 'Low': 1}
+
+TASK_LIST_COLUMNS = ['id', 'title', 'description', 'created_at', 'due_date', 'priority', 'category', 'status', 'revision']
+
+# Every edit of a task row bumps its revision (see render_task_card in app.py)
+TASK_TOUCH_SQL = "revision = revision + 1, updated_at = CURRENT_TIMESTAMP"
+
+# Sort option -> ordered (key, SQL expression, descending) tuples; the last key is unique.
+# Migration 7 stores PRIORITY_RANK_SQL as the indexed priority_rank column (see _sort_keys()).
+TASK_SORTS = {
+    'priority_desc': [('priority_rank', PRIORITY_RANK_SQL, True), ('created_at', 'created_at', True), ('id', 'id', True)],
+    'priority_asc': [('priority_rank', PRIORITY_RANK_SQL, False), ('created_at', 'created_at', True), ('id', 'id', True)],
+    'created_desc': [('created_at', 'created_at', True), ('id', 'id', True)],
+    'created_asc': [('created_at', 'created_at', False), ('id', 'id', False)],
+    # Best match first; needs the search join built by build_task_query()
+    'relevance': [('search_rank', 'matches.search_rank', False), ('id', 'id', True)],
+}
+DEFAULT_TASK_SORT = 'priority_desc'
+TASK_STATUS_FILTERS = ('all', 'completed', 'pending', 'overdue', 'today')
+
+
+def _is_azure():
+    return Config.DB_TYPE == 'azure_sql'
+
+
+def _due_date_sql():
+    """Column expression comparable with _timestamp_param() values."""
+    # SQLite stores due dates as text in a couple of ISO variants; datetime() normalizes them
+    return 'due_date' if _is_azure() else 'datetime(due_date)'
+
+
+def _timestamp_param(value):
+    if _is_azure():
+        return value
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _row_dict(cursor, row):
+    """Normalize a fetched row to a dict for both SQLite and Azure SQL."""
+    if hasattr(row, 'keys'):
+        return dict(row)
+    columns = [col[0] for col in cursor.description]
+    return {col: row[idx] for idx, col in enumerate(columns)}
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# Task search
+
+SEARCH_MAX_TERMS = 8
+
+
+def search_terms(search):
+    """Split a search box value into lowercase word terms (each matched as a prefix)."""
+    return re.findall(r'\w+', (search or '').lower())[:SEARCH_MAX_TERMS]
+
+
+def search_backend():
+    """
+    How task search is answered on the current database
+
+    'fts5' (SQLite tasks_fts table) and 'fulltext' (Azure SQL full-text index)
+    are created by migration 6; 'like' is the fallback when the index could
+    not be created, e.g. a SQLite build without FTS5.
+    """
+    return task_schema()['search']
+
+
+def resolve_task_sort(sort, search=''):
+    """The sort actually applied: 'relevance' needs a search term, else the default is used."""
+    if sort not in TASK_SORTS or (sort == 'relevance' and not search_terms(search)):
+        return DEFAULT_TASK_SORT
+    return sort
+
+
+def _sort_keys(sort):
+    """TASK_SORTS[sort], ordering by the indexed priority_rank column where the table has it."""
+    keys = TASK_SORTS.get(sort, TASK_SORTS[DEFAULT_TASK_SORT])
+    if 'priority_rank' not in task_schema()['columns']:
+        return keys
+    return [(key, 'priority_rank' if key == 'priority_rank' else expr, descending)
+            for key, expr, descending in keys]
+
+
+def _search_source(user_id, terms):
+    """
+    FROM clause joining the user's matching task ids with their rank, and its parameters
+
+    Lower ranks are better. Index backends rank with bm25/RANK; the LIKE
+    fallback filters on every term and ranks tasks with more title hits first.
+    """
+    backend = search_backend()
+    if backend == 'fts5':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        matches = ("SELECT rowid AS match_id, bm25(tasks_fts, 10.0, 1.0) AS search_rank "
+                   "FROM tasks_fts WHERE tasks_fts MATCH ?")
+        # CROSS JOIN pins SQLite's join order: read the matches once, then look
+        # tasks up by primary key, instead of probing the index per user task
+        return f"({matches}) AS matches CROSS JOIN tasks ON tasks.id = matches.match_id", [match]
+    if backend == 'fulltext':
+        match = ' AND '.join(f'"{term}*"' for term in terms)
+        matches = ("SELECT [KEY] AS match_id, -[RANK] AS search_rank "
+                   "FROM CONTAINSTABLE(tasks, (title, description), ?)")
+        params = [match]
+    else:
+        title_hit = "CASE WHEN LOWER(title) LIKE ? ESCAPE '\\' THEN 0 ELSE 1 END"
+        any_hit = "(LOWER(title) LIKE ? ESCAPE '\\' OR LOWER(COALESCE(description, '')) LIKE ? ESCAPE '\\')"
+        patterns = [f"%{_escape_like(term)}%" for term in terms]
+        matches = (f"SELECT id AS match_id, {' + '.join([title_hit] * len(terms))} AS search_rank "
+                   f"FROM tasks WHERE user_id = ? AND {' AND '.join([any_hit] * len(terms))}")
+        params = patterns + [user_id] + [p for pattern in patterns for p in (pattern, pattern)]
+    return f"tasks JOIN ({matches}) AS matches ON matches.match_id = tasks.id", params
+
+
+def encode_task_cursor(task, sort=DEFAULT_TASK_SORT):
+    """
+    Build the keyset cursor pointing just after a task
+
+    The cursor is the comma-separated sort key of the row, e.g.
+    ``<created_at>,<id>`` or ``<priority_rank>,<created_at>,<id>``.
+    """
+    keys = TASK_SORTS.get(sort, TASK_SORTS[DEFAULT_TASK_SORT])
+    values = []
+    for key, _, _ in keys:
+        if key == 'priority_rank':
+            values.append(str(PRIORITY_RANKS.get(task.get('priority'), 2)))
+        elif key == 'search_rank':
+            values.append(repr(float(task.get('search_rank') or 0)))
+        elif key == 'created_at':
+            created_at = task.get('created_at')
+            if not isinstance(created_at, datetime):
+                created_at = datetime.fromisoformat(str(created_at))
+            values.append(created_at.isoformat())
+        else:
+            values.append(str(task.get(key)))
+    return ','.join(values)
+
+
+def decode_task_cursor(cursor_value, sort=DEFAULT_TASK_SORT):
+    """
+    Parse a keyset cursor into typed sort-key values
+
+    Raises:
+        ValueError: If the cursor does not match the sort option
+    """
+    keys = TASK_SORTS.get(sort, TASK_SORTS[DEFAULT_TASK_SORT])
+    parts = cursor_value.split(',')
+    if len(parts) != len(keys):
+        raise ValueError(f"Cursor {cursor_value!r} does not match sort {sort!r}")
+
+    values = []
+    for (key, _, _), part in zip(keys, parts):
+        if key in ('priority_rank', 'id'):
+            values.append(int(part))
+        elif key == 'search_rank':
+            values.append(float(part))
+        else:
+            values.append(datetime.fromisoformat(part))
+    return values
+
+
+def _created_at_param(value):
+    if _is_azure():
+        return value
+    # SQLite compares created_at as the CURRENT_TIMESTAMP text it was stored with
+    if value.microsecond:
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def build_task_query(user_id, search='', status_filter='all', category='', sort=DEFAULT_TASK_SORT,
+                     after=None, limit=None, now=None):
+    """
+    Translate task list filters into a parameterized SELECT
+
+    Args:
+        user_id: Owner of the tasks
+        search: Words matched by prefix against title and description (all must match)
+        status_filter: One of TASK_STATUS_FILTERS
+        category: Exact category match (case-insensitive); empty or 'all' for any
+        sort: One of TASK_SORTS ('relevance' falls back to the default without a search)
+        after: Decoded keyset cursor values from decode_task_cursor()
+        limit: Maximum number of rows
+        now: Reference time for the overdue and today filters
+
+    Returns:
+        (sql, params) tuple; searches also select a search_rank column
+    """
+    now = now or datetime.now()
+    words = search_terms(search)
+    keys = _sort_keys(resolve_task_sort(sort, search))
+    due = _due_date_sql()
+    columns = task_list_columns()
+    source, source_params = 'tasks', []
+    clauses = ["user_id = ?"]
+    params = [user_id]
+
+    if words:
+        source, source_params = _search_source(user_id, words)
+        columns.append("matches.search_rank")
+
+    if category and category.lower() != 'all':
+        clauses.append("LOWER(category) = ?")
+        params.append(category.lower())
+
+    if status_filter == 'completed':
+        clauses.append(_done_sql())
+    elif status_filter == 'pending':
+        clauses.append(_pending_sql())
+    elif status_filter == 'overdue':
+        clauses.append(f"{_pending_sql()} AND {due} < ?")
+        params.append(_timestamp_param(now))
+    elif status_filter == 'today':
+        if 'due_day' in task_schema()['columns']:
+            # Equality on the indexed day keeps the rows in sort order (migration 8)
+            clauses.append("due_day = ?")
+            params.append(now.date() if _is_azure() else now.date().isoformat())
+        else:
+            day_start = datetime.combine(now.date(), datetime.min.time())
+            clauses.append(f"{due} >= ? AND {due} < ?")
+            params.extend([_timestamp_param(day_start), _timestamp_param(day_start + timedelta(days=1))])
+
+    if after:
+        after = [_created_at_param(value) if isinstance(value, datetime) else value for value in after]
+        # The predicate must bound the leading sort key so the index seeks to the
+        # cursor instead of walking the user's rows from the first page on
+        exprs = [expr for _, expr, _ in keys]
+        leading_desc = keys[0][2]
+        if not _is_azure() and all(descending == leading_desc for _, _, descending in keys):
+            # Row value: (k1, k2, ...) < (v1, v2, ...), a single index range in SQLite
+            placeholders = ', '.join('?' * len(keys))
+            clauses.append(f"({', '.join(exprs)}) {'<' if leading_desc else '>'} ({placeholders})")
+            params.extend(after)
+        else:
+            # k1 <= v1 AND ((k1 < v1) OR (k1 = v1 AND k2 < v2) OR ...)
+            clauses.append(f"{exprs[0]} {'<=' if leading_desc else '>='} ?")
+            params.append(after[0])
+            alternatives = []
+            for depth, (_, expr, descending) in enumerate(keys):
+                terms = [f"{prev_expr} = ?" for prev_expr in exprs[:depth]]
+                terms.append(f"{expr} {'<' if descending else '>'} ?")
+                alternatives.append("(" + " AND ".join(terms) + ")")
+                params.extend(after[:depth + 1])
+            clauses.append("(" + " OR ".join(alternatives) + ")")
+
+    order_by = ", ".join(f"{expr} {'DESC' if descending else 'ASC'}" for _, expr, descending in keys)
+    sql = f"SELECT {', '.join(columns)} FROM {source} WHERE {' AND '.join(clauses)} ORDER BY {order_by}"
+
+    if limit is not None:
+        if _is_azure():
+            sql += " OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+        else:
+            sql += " LIMIT ?"
+        params.append(int(limit))
+
+    # The FROM clause's placeholders come before the WHERE clause's
+    return sql, tuple(source_params + params)
+
+
+def query_tasks(user_id, search='', status_filter='all', category='', sort=DEFAULT_TASK_SORT,
+                after=None, limit=50, now=None):
+    """
+    Fetch one page of a user's tasks with filtering and sorting done in SQL
+
+    Returns:
+        (rows, next_cursor) where rows are raw column dicts and next_cursor
+        is None on the last page
+    """
+    sql, params = build_task_query(
+        user_id, search=search, status_filter=status_filter, category=category,
+        sort=sort, after=after, limit=limit + 1, now=now
+    )
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = [_row_dict(cursor, row) for row in cursor.fetchall()]
+        cursor.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_task_cursor(rows[-1], resolve_task_sort(sort, search))
+    return rows, next_cursor
+
+
+def hot_queries(user_id=1, now=None):
+    """
+    Representative statements issued on the request hot paths
+
+    Returns:
+        List of (name, sql, params) tuples
+    """
+    now = now or datetime.now()
+    queries = []
+    for sort in TASK_SORTS:
+        sql, params = build_task_query(user_id, sort=sort, limit=50, now=now)
+        queries.append((f"board page, sort={sort}", sql, params))
+    for status_filter in TASK_STATUS_FILTERS[1:]:
+        sql, params = build_task_query(user_id, status_filter=status_filter, limit=50, now=now)
+        queries.append((f"board page, status={status_filter}", sql, params))
+    sql, params = build_task_query(user_id, search='report', sort='created_desc', limit=50, now=now)
+    queries.append(("board search", sql, params))
+    sql, params = build_task_query(user_id, search='quarterly rep', sort='relevance', limit=50, now=now)
+    queries.append(("board search, ranked", sql, params))
+    sql, params = build_task_query(user_id, sort='created_desc', after=[now, 1000],
+                                   limit=50, now=now)
+    queries.append(("board next page", sql, params))
+    sql, params = build_task_query(user_id, after=[2, now, 1000], limit=50, now=now)
+    queries.append((f"board next page, sort={DEFAULT_TASK_SORT}", sql, params))
+    queries.append(("dashboard stats",) + build_task_stats_query(user_id, now))
+    queries.extend([
+        ("user by login", "SELECT id, username, email, password_hash FROM users "
+                          "WHERE username IN (?) OR email IN (?)", ('example', 'example')),
+        ("user by id", "SELECT id, username, email FROM users WHERE id = ?", (user_id,)),
+    ])
+    return queries
+
+
+def explain_query(sql, params=()):
+    """
+    Return the database's query plan for a statement as a list of lines
+
+    SQLite uses EXPLAIN QUERY PLAN; Azure SQL uses SET SHOWPLAN_TEXT, which
+    compiles the statement without running it.
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        lines = []
+        if _is_azure():
+            cursor.execute("SET SHOWPLAN_TEXT ON")
+            try:
+                cursor.execute(sql, params)
+                while True:
+                    lines.extend(str(row[0]).rstrip() for row in cursor.fetchall())
+                    if not cursor.nextset():
+                        break
+            finally:
+                cursor.execute("SET SHOWPLAN_TEXT OFF")
+        else:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            lines = [row[3] for row in cursor.fetchall()]
+        cursor.close()
+    return lines
+
+
+def build_task_stats_query(user_id, now):
+    """
+    Build the conditional-aggregation query behind the dashboard counters
+
+    Returns:
+        (sql, params) tuple
+    """
+    due = _due_date_sql()
+    pending = _pending_sql()
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    tomorrow_start = today_start + timedelta(days=1)
+    sql = f"""
+        SELECT
+            SUM(CASE WHEN {pending} AND {due} < ? THEN 1 ELSE 0 END) AS overdue,
+            SUM(CASE WHEN {pending} AND {due} >= ? AND {due} < ? THEN 1 ELSE 0 END) AS due_today,
+            SUM(CASE WHEN {pending} AND {due} >= ? AND {due} <= ? THEN 1 ELSE 0 END) AS due_week,
+            SUM(CASE WHEN {pending} THEN 1 ELSE 0 END) AS total
+        FROM tasks
+        WHERE user_id = ?
+    """
+    params = (
+        _timestamp_param(now),
+        _timestamp_param(now), _timestamp_param(tomorrow_start),
+        _timestamp_param(now), _timestamp_param(now + timedelta(days=7)),
+        user_id,
+    )
+    return sql, params
+
+
+def get_task_stats(user_id, now):
+    """
+    Count a user's open tasks for the dashboard in a single query
+
+    Args:
+        user_id: Owner of the tasks
+        now: Reference time for overdue / due today / due this week
+
+    Returns:
+        Dict with overdue, due_today, due_week and total counters
+    """
+    sql, params = build_task_stats_query(user_id, now)
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+        cursor.close()
+
+    keys = ('overdue', 'due_today', 'due_week', 'total')
+    if not row:
+        return dict.fromkeys(keys, 0)
+    return {key: int(row[idx] or 0) for idx, key in enumerate(keys)}
+
+
+# Task Reads and Writes
+#
+# Every write bumps the owner's row in task_versions inside the same
+# transaction, so per-worker caches can tell when their snapshot is stale.
+
+VALID_TASK_STATUSES = ('todo', 'in_progress', 'in_review', 'done')
+
+
+def _bump_task_version(cursor, user_id):
+    """Increment and return the user's task version (call inside the write transaction)."""
+    if _is_azure():
+        cursor.execute("""
+            MERGE task_versions WITH (HOLDLOCK) AS target
+            USING (SELECT ? AS user_id) AS source ON target.user_id = source.user_id
+            WHEN MATCHED THEN UPDATE SET version = target.version + 1
+            WHEN NOT MATCHED THEN INSERT (user_id, version) VALUES (source.user_id, 1)
+            OUTPUT inserted.version;
+        """, (user_id,))
+    else:
+        cursor.execute("INSERT OR IGNORE INTO task_versions (user_id, version) VALUES (?, 0)", (user_id,))
+        cursor.execute("UPDATE task_versions SET version = version + 1 WHERE user_id = ?", (user_id,))
+        cursor.execute("SELECT version FROM task_versions WHERE user_id = ?", (user_id,))
+    row = cursor.fetchone()
+    return int(row[0])
+
+
+def get_task_version(user_id):
+    """Return the user's task change counter (0 if they never wrote a task)."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM task_versions WHERE user_id = ?", (user_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    return int(row[0]) if row else 0
+
+
+def _select_task(cursor, user_id, task_id):
+    cursor.execute(
+        f"SELECT {', '.join(task_list_columns())} FROM tasks WHERE id = ? AND user_id = ?",
+        (task_id, user_id)
+    )
+    row = cursor.fetchone()
+    return _row_dict(cursor, row) if row else None
+
+
+def get_task(user_id, task_id):
+    """Return one of the user's tasks as a raw column dict, or None."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        task = _select_task(cursor, user_id, task_id)
+        cursor.close()
+    return task
+
+
+def fetch_user_tasks(user_id, limit=None):
+    """
+    Fetch a user's tasks, newest first, as raw column dicts
+
+    Args:
+        user_id: Owner of the tasks
+        limit: Optional maximum number of rows
+    """
+    sql, params = build_task_query(user_id, sort='created_desc', limit=limit)
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = [_row_dict(cursor, row) for row in cursor.fetchall()]
+        cursor.close()
+    return rows
+
+
+def iter_user_tasks(user_id, batch_size=500):
+    """
+    Yield a user's tasks, oldest first, as raw column dicts
+
+    Rows are fetched batch_size at a time so memory stays flat for any
+    number of tasks. The pooled connection is held until the generator is
+    exhausted or closed.
+    """
+    sql, params = build_task_query(user_id, sort='created_asc')
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+
+def _due_date_value(due_date):
+    return due_date.isoformat() if due_date else None
+
+
+def create_task(user_id, title, description='', priority='Medium', category='General', due_date=None, status='todo'):
+    """
+    Insert a task for a user
+
+    Returns:
+        (task, version) with the stored row and the user's new task version
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        params = (title, description, _due_date_value(due_date), priority, category, status, user_id)
+        if _is_azure():
+            cursor.execute(
+                "INSERT INTO tasks (title, description, due_date, priority, category, status, user_id) "
+                "OUTPUT inserted.id VALUES (?, ?, ?, ?, ?, ?, ?)",
+                params
+            )
+            task_id = int(cursor.fetchone()[0])
+        else:
+            cursor.execute(
+                "INSERT INTO tasks (title, description, due_date, priority, category, status, user_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                params
+            )
+            task_id = cursor.lastrowid
+        version = _bump_task_version(cursor, user_id)
+        task = _select_task(cursor, user_id, task_id)
+        conn.commit()
+        cursor.close()
+    return task, version
+
+
+def update_task(user_id, task_id, title, description, priority, category, due_date, status):
+    """
+    Replace the editable fields of a task
+
+    Returns:
+        (task, version), or (None, None) if the user has no such task
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            UPDATE tasks 
+            SET title = ?, description = ?, priority = ?, category = ?, due_date = ?, status = ?, {TASK_TOUCH_SQL}
+            WHERE id = ? AND user_id = ?
+            """,
+            (title, description, priority, category, _due_date_value(due_date), status, task_id, user_id)
+        )
+        if cursor.rowcount == 0:
+            cursor.close()
+            return None, None
+        version = _bump_task_version(cursor, user_id)
+        task = _select_task(cursor, user_id, task_id)
+        conn.commit()
+        cursor.close()
+    return task, version
+
+
+def set_task_status(user_id, task_id, status):
+    """
+    Move a task to another Kanban column
+
+    Returns:
+        (task, version), or (None, None) if the user has no such task
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE tasks SET status = ?, {TASK_TOUCH_SQL} WHERE id = ? AND user_id = ?",
+            (status, task_id, user_id)
+        )
+        if cursor.rowcount == 0:
+            cursor.close()
+            return None, None
+        version = _bump_task_version(cursor, user_id)
+        task = _select_task(cursor, user_id, task_id)
+        conn.commit()
+        cursor.close()
+    return task, version
+
+
+# UPDATE ... RETURNING needs SQLite 3.35; older libraries re-read the row in the same transaction
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def _toggle_assignments():
+    """SET clauses flipping a task's state; right-hand sides see the pre-update row."""
+    schema = task_schema()
+    if schema['has_status']:
+        # status is canonical; the legacy completed flag mirrors it when both exist
+        assignments = ["status = CASE WHEN status = 'done' THEN 'todo' ELSE 'done' END"]
+        if schema['has_completed']:
+            assignments.append("completed = CASE WHEN status = 'done' THEN 0 ELSE 1 END")
+        return assignments
+    return ["completed = CASE WHEN completed = 1 THEN 0 ELSE 1 END"]
+
+
+def toggle_task(user_id, task_id):
+    """
+    Flip a task between done and todo
+
+    The flip happens in one conditional UPDATE that also returns the new row,
+    so concurrent toggles of the same task serialize on the row and each one
+    sees the state left by the previous one.
+
+    Returns:
+        (task, version), or (None, None) if the user has no such task
+    """
+    assignments = ', '.join(_toggle_assignments() + [TASK_TOUCH_SQL])
+    columns = task_list_columns()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if _is_azure():
+            cursor.execute(
+                f"UPDATE tasks SET {assignments} "
+                f"OUTPUT {', '.join('inserted.' + column for column in columns)} "
+                "WHERE id = ? AND user_id = ?",
+                (task_id, user_id)
+            )
+            row = cursor.fetchone()
+            task = _row_dict(cursor, row) if row else None
+        elif SQLITE_HAS_RETURNING:
+            cursor.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ? AND user_id = ? RETURNING {', '.join(columns)}",
+                (task_id, user_id)
+            )
+            row = cursor.fetchone()
+            task = _row_dict(cursor, row) if row else None
+        else:
+            cursor.execute(f"UPDATE tasks SET {assignments} WHERE id = ? AND user_id = ?", (task_id, user_id))
+            task = _select_task(cursor, user_id, task_id) if cursor.rowcount else None
+
+        if task is None:
+            conn.rollback()
+            cursor.close()
+            return None, None
+        version = _bump_task_version(cursor, user_id)
+        conn.commit()
+        cursor.close()
+    return task, version
+
+
+def delete_task(user_id, task_id):
+    """
+    Delete one of the user's tasks
+
+    Returns:
+        (deleted, version) where version is None if nothing was deleted
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM tasks WHERE id = ? AND user_id = ?', (task_id, user_id))
+        if cursor.rowcount == 0:
+            cursor.close()
+            return False, None
+        version = _bump_task_version(cursor, user_id)
+        conn.commit()
+        cursor.close()
+    return True, version
+
+
+def insert_tasks(user_id, tasks):
+    """
+    Insert many tasks for a user in one transaction
+
+    Args:
+        tasks: Field dicts (title, description, priority, category, due_date,
+            status and optionally created_at)
+
+    Returns:
+        The user's new task version
+    """
+    params = []
+    for fields in tasks:
+        created_at = fields.get('created_at')
+        params.append((
+            fields['title'], fields['description'], _due_date_value(fields['due_date']),
+            fields['priority'], fields['category'], fields['status'], user_id,
+            # SQLite keeps CURRENT_TIMESTAMP's text format so keyset cursors compare correctly
+            _created_at_param(created_at) if created_at else None,
+        ))
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if _is_azure():
+            cursor.fast_executemany = True
+        cursor.executemany(
+            "INSERT INTO tasks (title, description, due_date, priority, category, status, user_id, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+            params
+        )
+        version = _bump_task_version(cursor, user_id)
+        conn.commit()
+        cursor.close()
+    return version
+
+
+# Bulk operations
+#
+# IN lists and multi-row VALUES are chunked to stay under SQLite's and
+# SQL Server's (2100) bound-parameter limits.
+BATCH_CHUNK_SIZE = 250
+
+
+def _chunks(items, size=BATCH_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _select_tasks_by_ids(cursor, user_id, task_ids):
+    rows = []
+    for chunk in _chunks(list(task_ids)):
+        placeholders = ', '.join('?' for _ in chunk)
+        cursor.execute(
+            f"SELECT {', '.join(task_list_columns())} FROM tasks WHERE user_id = ? AND id IN ({placeholders})",
+            [user_id] + list(chunk)
+        )
+        rows.extend(_row_dict(cursor, row) for row in cursor.fetchall())
+    return rows
+
+
+def get_tasks_by_ids(user_id, task_ids):
+    """Return {id: raw task dict} for those of the ids the user owns."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        rows = _select_tasks_by_ids(cursor, user_id, task_ids)
+        cursor.close()
+    return {row['id']: row for row in rows}
+
+
+def _insert_tasks(cursor, user_id, creates):
+    """Insert task field dicts, returning their new ids in the same order."""
+    if not creates:
+        return []
+    if not _is_azure():
+        # SQLite runs in-process, so per-row inserts cost no round trips and
+        # give each row's id through lastrowid
+        ids = []
+        for fields in creates:
+            cursor.execute(
+                "INSERT INTO tasks (title, description, due_date, priority, category, status, user_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fields['title'], fields['description'], _due_date_value(fields['due_date']),
+                 fields['priority'], fields['category'], fields['status'], user_id)
+            )
+            ids.append(cursor.lastrowid)
+        return ids
+
+    # Azure SQL: one MERGE per chunk; OUTPUT can reference the source ordinal,
+    # which a plain INSERT ... OUTPUT cannot, so ids map back to their rows
+    ids = [None] * len(creates)
+    indexed = list(enumerate(creates))
+    for chunk in _chunks(indexed):
+        values = ', '.join('(?, ?, ?, ?, ?, ?, ?)' for _ in chunk)
+        params = []
+        for ordinal, fields in chunk:
+            params.extend((ordinal, fields['title'], fields['description'], _due_date_value(fields['due_date']),
+                           fields['priority'], fields['category'], fields['status']))
+        cursor.execute(
+            f"""
+            MERGE tasks AS target
+            USING (VALUES {values}) AS source (ordinal, title, description, due_date, priority, category, status)
+            ON 1 = 0
+            WHEN NOT MATCHED THEN
+                INSERT (title, description, due_date, priority, category, status, user_id)
+                VALUES (source.title, source.description, source.due_date, source.priority,
+                        source.category, source.status, ?)
+            OUTPUT source.ordinal, inserted.id;
+            """,
+            params + [user_id]
+        )
+        for ordinal, task_id in cursor.fetchall():
+            ids[int(ordinal)] = int(task_id)
+    return ids
+
+
+def apply_task_batch(user_id, creates=(), updates=(), moves=(), toggles=(), deletes=()):
+    """
+    Apply many task writes in one transaction
+
+    Args:
+        creates: Field dicts (title, description, priority, category, due_date, status)
+        updates: (task_id, field dict) pairs replacing the editable fields
+        moves: (task_id, status) pairs
+        toggles: Task ids flipped between done and todo in SQL
+        deletes: Task ids
+
+    Returns:
+        (created_ids, tasks, version) where tasks maps every created or
+        changed id to its stored row
+    """
+    updates, moves, toggles, deletes = list(updates), list(moves), list(toggles), list(deletes)
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        if _is_azure():
+            # Send each executemany as one parameter array instead of a round trip per row
+            cursor.fast_executemany = True
+        created_ids = _insert_tasks(cursor, user_id, list(creates))
+
+        if updates:
+            cursor.executemany(
+                f"""
+                UPDATE tasks
+                SET title = ?, description = ?, priority = ?, category = ?, due_date = ?, status = ?, {TASK_TOUCH_SQL}
+                WHERE id = ? AND user_id = ?
+                """,
+                [(f['title'], f['description'], f['priority'], f['category'], _due_date_value(f['due_date']),
+                  f['status'], task_id, user_id) for task_id, f in updates]
+            )
+        if moves:
+            cursor.executemany(
+                f"UPDATE tasks SET status = ?, {TASK_TOUCH_SQL} WHERE id = ? AND user_id = ?",
+                [(status, task_id, user_id) for task_id, status in moves]
+            )
+        if toggles:
+            cursor.executemany(
+                f"UPDATE tasks SET {', '.join(_toggle_assignments())}, {TASK_TOUCH_SQL} WHERE id = ? AND user_id = ?",
+                [(task_id, user_id) for task_id in toggles]
+            )
+        if deletes:
+            cursor.executemany(
+                "DELETE FROM tasks WHERE id = ? AND user_id = ?",
+                [(task_id, user_id) for task_id in deletes]
+            )
+
+        version = _bump_task_version(cursor, user_id)
+        changed = created_ids + [task_id for task_id, _ in updates] + [task_id for task_id, _ in moves] + toggles
+        tasks = {row['id']: row for row in _select_tasks_by_ids(cursor, user_id, changed)}
+        conn.commit()
+        cursor.close()
+    return created_ids, tasks, version
@@ -0,0 +1,248 @@
+"""
+Connection pooling for SQLite and Azure SQL connections
+
+Each gunicorn worker keeps its own pool, so connections are never shared
+across processes. Connections are handed out LIFO so the most recently used
+(and therefore most likely still alive) connection is reused first.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Callbacks notified on every checkout: callback(result, wait_seconds)
+# where result is 'hit', 'miss' or 'timeout'.
+_listeners = []
+
+
+def add_listener(callback):
+    """Register a callback invoked for every pool checkout."""
+    _listeners.append(callback)
+
+
+def _notify(result, wait_seconds):
+    for callback in _listeners:
+        try:
+            callback(result, wait_seconds)
+        except Exception as exc:
+            logger.debug("Pool listener failed: %s", exc)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class _PoolEntry:
+    """Book-keeping for a single pooled connection."""
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+def _ping(conn):
+    """Default liveness check: run a trivial query."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def _rollback(conn):
+    """Default reset: discard any transaction left open by the borrower."""
+    conn.rollback()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections
+
+    Args:
+        factory: Callable returning a new connection
+        min_size: Idle connections kept open even past the idle timeout
+        max_size: Maximum number of connections (idle + checked out)
+        idle_timeout: Seconds an idle connection may sit before being closed
+        checkout_timeout: Seconds to wait for a free connection before PoolTimeout
+        ping_interval: Connections idle longer than this are pinged on checkout
+        ping: Liveness check, raises if the connection is unusable
+        reset: Called on return to clear per-borrower state
+    """
+
+    def __init__(self, factory, min_size=1, max_size=10, idle_timeout=300.0,
+                 checkout_timeout=30.0, ping_interval=10.0, ping=_ping, reset=_rollback):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._factory = factory
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+        self._ping = ping
+        self._reset = reset
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._in_use = {}
+        self._size = 0
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+
+    @property
+    def size(self):
+        """Number of open connections (idle + checked out)."""
+        return self._size
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    def acquire(self):
+        """Check out a connection, creating one if the pool is not full."""
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+
+        while True:
+            entry = None
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                self._reap_idle_locked()
+                if self._idle:
+                    entry = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        _notify('timeout', time.monotonic() - start)
+                        raise PoolTimeout(
+                            f"No database connection available after {self.checkout_timeout:.1f}s"
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            if entry is None:
+                try:
+                    entry = _PoolEntry(self._factory())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                result = 'miss'
+            elif not self._is_alive(entry):
+                self._discard(entry)
+                continue
+            else:
+                result = 'hit'
+
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+                if result == 'hit':
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            _notify(result, time.monotonic() - start)
+            return entry.conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if it is broken."""
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            logger.warning("Released a connection that does not belong to this pool")
+            return
+
+        if not discard:
+            try:
+                self._reset(conn)
+            except Exception as exc:
+                logger.warning("Discarding pooled connection after failed reset: %s", exc)
+                discard = True
+
+        if discard or self._closed:
+            self._discard(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections and stop handing out new ones."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        """Snapshot of pool counters."""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'hits': self.hits,
+                'misses': self.misses,
+                'timeouts': self.timeouts,
+            }
+
+    def _is_alive(self, entry):
+        if time.monotonic() - entry.last_used < self.ping_interval:
+            return True
+        try:
+            self._ping(entry.conn)
+            return True
+        except Exception as exc:
+            logger.info("Dropping dead pooled connection: %s", exc)
+            return False
+
+    def _reap_idle_locked(self):
+        """Close connections idle past the timeout, keeping min_size open."""
+        if not self._idle or self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        # Oldest entries sit at the front of the LIFO stack
+        while self._idle and self._size > self.min_size:
+            entry = self._idle[0]
+            if now - entry.last_used <= self.idle_timeout:
+                break
+            self._idle.pop(0)
+            self._size -= 1
+            self._close_quietly(entry.conn)
+
+    def _discard(self, entry):
+        self._close_quietly(entry.conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,56 @@
+"""
+Bounded LRU cache for rendered template fragments
+
+Used for task cards: a card's HTML only changes when its row changes (its
+revision) or when the overdue/due-today flags flip, so the rendered markup
+can be reused across requests of the same worker.
+"""
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU mapping of key -> rendered markup
+
+    Args:
+        max_entries: Fragments kept before the least recently used is dropped
+    """
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def put(self, key, fragment):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
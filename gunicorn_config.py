@@ -1,25 +1,35 @@
 # Gunicorn configuration for production deployment
 # Use this for Azure App Service and production environments
 
+# Process model settings can be overridden with GUNICORN_* environment
+# variables (see .env.example); benchmarks/loadtest.py uses them to compare
+# worker classes and counts.
+
 import multiprocessing
+import os
 
 # Server Socket
-bind = "0.0.0.0:8000"
+bind = os.environ.get('GUNICORN_BIND', "0.0.0.0:8000")
 backlog = 2048
 
 # Worker Processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
+workers = int(os.environ.get('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+# 'sync' serves one request per process; 'gthread' serves GUNICORN_THREADS
+# at once per process, which suits Azure SQL where requests mostly wait on
+# database round trips. Shared per-worker state (connection pool, caches,
+# hashing pool) is thread-safe in both modes.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.environ.get('GUNICORN_THREADS') or (8 if worker_class == 'gthread' else 1))
 worker_connections = 1000
-max_requests = 1000
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
 max_requests_jitter = 50
-timeout = 120
-keepalive = 5
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
 
-# Logging
-accesslog = '-'
+# Logging ('' disables the access log)
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
 errorlog = '-'
-loglevel = 'info'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"'
 
 # Process Naming
@@ -36,3 +46,26 @@ tmp_upload_dir = None
 limit_request_line = 4096
 limit_request_fields = 100
 limit_request_field_size = 8190
+
+
+# Server Hooks
+def on_starting(server):
+    """Apply pending schema migrations once, in the master, before workers fork."""
+    from config import Config
+    from migrations import apply_migrations
+
+    if threads > Config.DB_POOL_MAX_SIZE:
+        server.log.warning(
+            "%d threads per worker share DB_POOL_MAX_SIZE=%d connections; requests will queue for one",
+            threads, Config.DB_POOL_MAX_SIZE
+        )
+    try:
+        apply_migrations()
+    except Exception as exc:
+        # Abort startup: workers must not serve a half-migrated schema
+        server.log.error("Schema migration failed: %s", exc)
+        raise
+    finally:
+        # Workers open their own pools after fork
+        from database import close_pools
+        close_pools()
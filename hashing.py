@@ -0,0 +1,169 @@
+"""
+Password hashing on a bounded per-worker process pool
+
+PBKDF2/scrypt are deliberately slow, so running them inline lets a burst of
+logins hold every request thread. Hashes run in a small process pool
+(HASH_POOL_WORKERS, 0 = inline in the caller) and at most
+HASH_POOL_MAX_PENDING may be running or queued per worker; beyond that
+callers get HashingBusy, which the routes turn into HTTP 429.
+
+The algorithm and cost come from PASSWORD_HASH_METHOD (werkzeug method
+syntax). Hashes made with other parameters still verify and are upgraded
+by verify_password() on a successful check.
+"""
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Callbacks notified on every hashing call: callback(operation, outcome, seconds)
+# where operation is 'hash' or 'verify' and outcome is 'ok', 'busy' or 'timeout'.
+_listeners = []
+
+_state_lock = threading.Lock()
+_executor = None
+_slots = None
+_owner_pid = None
+
+
+class HashingBusy(Exception):
+    """Raised when the worker already has HASH_POOL_MAX_PENDING hashes in flight."""
+
+
+def add_listener(callback):
+    """Register a callback invoked for every hashing call."""
+    _listeners.append(callback)
+
+
+def _notify(operation, outcome, seconds):
+    for callback in _listeners:
+        try:
+            callback(operation, outcome, seconds)
+        except Exception as exc:
+            logger.debug("Hashing listener failed: %s", exc)
+
+
+def canonical_method(method):
+    """Expand werkzeug's shorthand methods to the full form stored in hashes."""
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        digest = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{digest}:{iterations}"
+    if parts[0] == 'scrypt':
+        n, r, p = (parts[1:] + ['32768', '8', '1'][len(parts) - 1:])[:3]
+        return f"scrypt:{n}:{r}:{p}"
+    return method
+
+
+def needs_rehash(pwhash):
+    """True when a stored hash was made with other parameters than PASSWORD_HASH_METHOD."""
+    return pwhash.split('$', 1)[0] != canonical_method(Config.PASSWORD_HASH_METHOD)
+
+
+# Run in the pool processes: module-level so they can be pickled
+
+def _hash(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _verify(pwhash, password, method, salt_length):
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if pwhash.split('$', 1)[0] != canonical_method(method):
+        return True, generate_password_hash(password, method=method, salt_length=salt_length)
+    return True, None
+
+
+def _pool_context():
+    """Start method for the pool processes.
+
+    The pool is created lazily from a request thread, and gthread workers
+    have other threads holding locks at that moment; a forked child
+    inherits those locks held and can hang. forkserver (spawn where it is
+    unavailable) starts the children from a clean single-threaded process.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _pool_state():
+    """The executor (None when hashing inline) and slot semaphore of this process."""
+    global _executor, _slots, _owner_pid
+    with _state_lock:
+        # A forked worker must not reuse its parent's pool processes
+        if _owner_pid != os.getpid():
+            _executor = None
+            if Config.HASH_POOL_WORKERS > 0:
+                _executor = concurrent.futures.ProcessPoolExecutor(max_workers=Config.HASH_POOL_WORKERS,
+                                                                   mp_context=_pool_context())
+            _slots = threading.BoundedSemaphore(max(1, Config.HASH_POOL_MAX_PENDING))
+            _owner_pid = os.getpid()
+        return _executor, _slots
+
+
+def _run(operation, fn, *args):
+    executor, slots = _pool_state()
+    if not slots.acquire(blocking=False):
+        _notify(operation, 'busy', 0.0)
+        raise HashingBusy("Too many password hashes in progress")
+
+    started = time.perf_counter()
+    if executor is None:
+        try:
+            result = fn(*args)
+        finally:
+            slots.release()
+    else:
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        # The slot stays taken until the job finishes, even if we stop waiting
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            result = future.result(timeout=Config.HASH_POOL_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            _notify(operation, 'timeout', time.perf_counter() - started)
+            raise HashingBusy("Password hashing timed out")
+
+    _notify(operation, 'ok', time.perf_counter() - started)
+    return result
+
+
+def hash_password(password):
+    """Hash a password with the configured method and cost."""
+    return _run('hash', _hash, password, Config.PASSWORD_HASH_METHOD, Config.PASSWORD_HASH_SALT_LENGTH)
+
+
+def verify_password(pwhash, password):
+    """
+    Check a password against a stored hash
+
+    Returns:
+        (valid, new_hash) where new_hash is set when the password was right
+        but the stored hash should be replaced (see needs_rehash())
+
+    Raises:
+        HashingBusy: The worker is saturated; retry later
+    """
+    return _run('verify', _verify, pwhash, password, Config.PASSWORD_HASH_METHOD, Config.PASSWORD_HASH_SALT_LENGTH)
+
+
+def shutdown():
+    """Stop this process's hashing pool (tests and worker exit)."""
+    global _executor, _owner_pid
+    with _state_lock:
+        if _executor is not None and _owner_pid == os.getpid():
+            _executor.shutdown(wait=True)
+        _executor = None
+        _owner_pid = None
@@ -32,6 +32,9 @@ IF OBJECT_ID('tasks', 'U') IS NOT NULL
 IF OBJECT_ID('users', 'U') IS NOT NULL
     DROP TABLE users;
 
+IF OBJECT_ID('task_versions', 'U') IS NOT NULL
+    DROP TABLE task_versions;
+
 -- Create users table
 CREATE TABLE users (
     id INT IDENTITY(1,1) PRIMARY KEY,
@@ -53,12 +56,25 @@ CREATE TABLE tasks (
     user_id INT NOT NULL,
     created_at DATETIME2 DEFAULT GETDATE(),
     updated_at DATETIME2 DEFAULT GETDATE(),
+    revision INT NOT NULL DEFAULT 1,
+    priority_rank AS (CASE priority WHEN 'High' THEN 3 WHEN 'Low' THEN 1 ELSE 2 END) PERSISTED,
+    due_day AS CAST(due_date AS DATE) PERSISTED,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
--- Create index on user_id for better query performance
-CREATE INDEX idx_tasks_user_id ON tasks(user_id);
-CREATE INDEX idx_tasks_status ON tasks(status);
+-- Per-user change counter, bumped by every task write so caches can detect stale snapshots
+CREATE TABLE task_versions (
+    user_id INT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Composite indexes for the per-user task access paths
+CREATE INDEX idx_tasks_user_created ON tasks(user_id, created_at);
+CREATE INDEX idx_tasks_user_status ON tasks(user_id, status);
+CREATE INDEX idx_tasks_user_priority ON tasks(user_id, priority_rank, created_at, id);
+CREATE INDEX idx_tasks_user_priority_asc ON tasks(user_id, priority_rank, created_at DESC, id DESC);
+CREATE INDEX idx_tasks_user_due_day ON tasks(user_id, due_day, priority_rank, created_at, id);
+CREATE INDEX idx_tasks_user_open ON tasks(user_id, priority_rank, created_at, id) INCLUDE (status, due_date);
 """
 
 def init_database():
@@ -0,0 +1,133 @@
+"""
+Queue-backed logging pipeline
+
+Request threads only put records on a bounded in-memory queue; a single
+QueueListener thread per process writes them to stdout, the rotating
+app.log (as JSON lines) and, when configured, Application Insights. If the
+sinks fall behind and the queue fills up, new records are dropped and
+counted instead of blocking the request.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record):
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler = None
+_listener = None
+
+
+def configure_logging(log_file='app.log', level=logging.INFO, queue_size=10000,
+                      max_bytes=10 * 1024 * 1024, backup_count=5, extra_handlers=()):
+    """
+    Route the root logger through a bounded queue to the real sinks
+
+    Safe to call more than once; later calls only add extra_handlers.
+
+    Args:
+        log_file: Path of the rotating JSON log file (None to disable)
+        level: Root logger level
+        queue_size: Records buffered before new ones are dropped
+        max_bytes: Size at which log_file is rotated
+        backup_count: Rotated files to keep
+        extra_handlers: Additional sinks, e.g. the Application Insights handler
+
+    Returns:
+        The DroppingQueueHandler attached to the root logger
+    """
+    global _handler, _listener
+
+    if _listener is not None:
+        for handler in extra_handlers:
+            add_handler(handler)
+        return _handler
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    sinks = [stream_handler]
+
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                           encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        sinks.append(file_handler)
+    sinks.extend(extra_handlers)
+
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    _listener = QueueListener(_handler.queue, *sinks, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_handler)
+    return _handler
+
+
+def add_handler(handler):
+    """Attach another sink to the running listener."""
+    if _listener is None:
+        logging.getLogger().addHandler(handler)
+        return
+    _listener.handlers = _listener.handlers + (handler,)
+
+
+def dropped_records():
+    """Number of records dropped because the queue was full."""
+    return _handler.dropped if _handler is not None else 0
+
+
+def queue_depth():
+    return _handler.queue.qsize() if _handler is not None else 0
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Management commands for the Task Manager database
+
+Usage:
+    python manage.py migrate [--target VERSION]
+    python manage.py schema-version
+    python manage.py explain [--user-id ID]
+    python manage.py import FILE --user USERNAME [--format csv|ndjson] [--chunk-size N]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+from database import explain_query, hot_queries, get_user_by_username
+from migrations import LATEST_VERSION, apply_migrations, get_schema_version
+
+
+def cmd_migrate(args):
+    applied = apply_migrations(target=args.target)
+    if applied:
+        print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+    else:
+        print("Database schema is already up to date")
+    return 0
+
+
+def cmd_schema_version(args):
+    print(f"Current schema version: {get_schema_version()} (latest: {LATEST_VERSION})")
+    return 0
+
+
+def cmd_explain(args):
+    """Print the query plan of every hot query so index regressions are visible."""
+    for name, sql, params in hot_queries(user_id=args.user_id):
+        print(f"== {name}")
+        print(f"   {sql}")
+        for line in explain_query(sql, params):
+            print(f"   -> {line}")
+        print()
+    return 0
+
+
+def cmd_import(args):
+    """Bulk import tasks for one user from a CSV or NDJSON file."""
+    from task_service import import_tasks, EXPORT_FORMATS
+
+    user = get_user_by_username(args.user)
+    if not user:
+        print(f"Unknown user: {args.user}", file=sys.stderr)
+        return 1
+
+    fmt = args.format or os.path.splitext(args.file)[1].lstrip('.').lower() or 'csv'
+    if fmt not in EXPORT_FORMATS:
+        print(f"Unsupported format: {fmt}", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+
+    def progress(imported, failed):
+        print(f"  {imported} imported, {failed} rejected ({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+
+    with open(args.file, 'r', encoding='utf-8-sig', newline='') as f:
+        summary = import_tasks(user['id'], f, fmt, chunk_size=args.chunk_size, on_progress=progress)
+
+    for error in summary['errors']:
+        print(f"line {error['line']}: {error['error']}")
+    if summary['failed'] > len(summary['errors']):
+        print(f"... and {summary['failed'] - len(summary['errors'])} more rejected rows")
+    print(f"Imported {summary['imported']} tasks, rejected {summary['failed']} "
+          f"in {time.perf_counter() - started:.1f}s")
+    return 0 if not summary['failed'] else 2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Task Manager management commands")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate = subparsers.add_parser('migrate', help='Apply pending schema migrations')
+    migrate.add_argument('--target', type=int, default=None, help='Stop after this migration version')
+    migrate.set_defaults(func=cmd_migrate)
+
+    version = subparsers.add_parser('schema-version', help='Show the applied schema version')
+    version.set_defaults(func=cmd_schema_version)
+
+    explain = subparsers.add_parser('explain', help='Print query plans for the hot queries')
+    explain.add_argument('--user-id', type=int, default=1, help='User id to bind into the queries')
+    explain.set_defaults(func=cmd_explain)
+
+    importer = subparsers.add_parser('import', help='Bulk import tasks from CSV or NDJSON')
+    importer.add_argument('file', help='Path to a .csv or .ndjson file (same columns as /export)')
+    importer.add_argument('--user', required=True, help='Username that will own the tasks')
+    importer.add_argument('--format', choices=['csv', 'ndjson'], default=None,
+                          help='File format (defaults to the file extension)')
+    importer.add_argument('--chunk-size', type=int, default=1000, help='Rows per insert transaction')
+    importer.set_defaults(func=cmd_import)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
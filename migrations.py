@@ -0,0 +1,390 @@
+"""
+Versioned schema migrations for SQLite and Azure SQL
+
+Applied once per deploy (gunicorn's on_starting hook or
+`python manage.py migrate`) instead of probing the schema on every request.
+Each step is idempotent so databases created before the schema_version
+table existed can be brought up to date safely.
+"""
+import logging
+import sqlite3
+from datetime import datetime
+
+from config import Config
+from database import (db_connection, init_azure_sql_schema, create_azure_sql_task_indexes, forget_task_schema,
+                      PRIORITY_RANK_SQL, SCHEMA_FILE)
+
+logger = logging.getLogger(__name__)
+
+
+def _sqlite_columns(cursor, table):
+    # table_xinfo includes generated columns
+    cursor.execute(f"PRAGMA table_xinfo({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _sqlite_add_columns(cursor, table, columns):
+    existing = _sqlite_columns(cursor, table)
+    for name, definition in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            logger.info("Added %s column to SQLite %s table", name, table)
+
+
+def _azure_add_columns(cursor, table, columns):
+    for name, definition in columns:
+        cursor.execute(
+            f"IF COL_LENGTH('{table}', '{name}') IS NULL ALTER TABLE {table} ADD {name} {definition}"
+        )
+
+
+# 1 - users and tasks tables
+
+def _schema_statements():
+    """Split schema.sql into individual statements, dropping comment lines."""
+    with open(SCHEMA_FILE, 'r') as f:
+        script = f.read()
+    for chunk in script.split(';'):
+        lines = [line for line in chunk.splitlines() if not line.strip().startswith('--')]
+        statement = '\n'.join(lines).strip()
+        if statement:
+            yield statement
+
+
+def _baseline_sqlite(conn, cursor):
+    # Indexes in schema.sql can reference columns that legacy tables only gain in
+    # migration 2, so they are created by migration 3 instead
+    for statement in _schema_statements():
+        if not statement.upper().startswith('CREATE INDEX'):
+            cursor.execute(statement)
+
+
+def _baseline_azure_sql(conn, cursor):
+    init_azure_sql_schema(conn)
+
+
+# 2 - optional task columns that older databases were created without
+
+def _task_columns_sqlite(conn, cursor):
+    _sqlite_add_columns(cursor, 'tasks', [
+        ('due_date', "DATETIME"),
+        ('priority', "VARCHAR(10) NOT NULL DEFAULT 'Medium'"),
+        ('category', "VARCHAR(100) DEFAULT 'General'"),
+        ('status', "VARCHAR(20) DEFAULT 'todo'"),
+    ])
+
+
+def _task_columns_azure_sql(conn, cursor):
+    _azure_add_columns(cursor, 'tasks', [
+        ('due_date', "DATETIME NULL"),
+        ('priority', "NVARCHAR(10) NOT NULL DEFAULT 'Medium'"),
+        ('category', "NVARCHAR(100) DEFAULT 'General'"),
+        ('status', "NVARCHAR(20) DEFAULT 'todo'"),
+    ])
+
+
+# 3 - composite indexes for the per-user task access paths
+
+def _task_indexes_sqlite(conn, cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks(user_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks(user_id, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_user_due ON tasks(user_id, datetime(due_date))")
+
+
+def _task_indexes_azure_sql(conn, cursor):
+    create_azure_sql_task_indexes(conn)
+
+
+# 4 - per-user change counter for task snapshot caches
+
+def _task_versions_sqlite(conn, cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def _task_versions_azure_sql(conn, cursor):
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='task_versions' AND xtype='U')
+        CREATE TABLE task_versions (
+            user_id INT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+
+
+# 5 - per-task revision and updated_at, bumped by every edit (card fragment cache key)
+
+def _task_revision_sqlite(conn, cursor):
+    # ALTER TABLE cannot add a CURRENT_TIMESTAMP default, so existing rows start NULL
+    _sqlite_add_columns(cursor, 'tasks', [
+        ('updated_at', "DATETIME"),
+        ('revision', "INTEGER NOT NULL DEFAULT 1"),
+    ])
+
+
+def _task_revision_azure_sql(conn, cursor):
+    _azure_add_columns(cursor, 'tasks', [
+        ('updated_at', "DATETIME2 NULL DEFAULT GETDATE()"),
+        ('revision', "INT NOT NULL DEFAULT 1"),
+    ])
+
+
+# 6 - full-text search index over task titles and descriptions
+
+def _task_search_sqlite(conn, cursor):
+    # External-content table: the index stores no copy of the text, and the
+    # triggers keep it in step with every insert, edit and delete
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                title, description,
+                content='tasks', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as exc:
+        logger.warning("FTS5 unavailable (%s); task search will use LIKE scans", exc)
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+    """)
+    cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def _task_search_azure_sql(conn, cursor):
+    # Full-text DDL cannot run inside a transaction. The index is populated
+    # in the background (CHANGE_TRACKING AUTO), so new tasks become
+    # searchable a few seconds after they are written.
+    conn.commit()
+    conn.autocommit = True
+    try:
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'ux_tasks_id' AND object_id = OBJECT_ID('tasks'))
+            CREATE UNIQUE INDEX ux_tasks_id ON tasks(id)
+        """)
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.fulltext_catalogs WHERE name = 'task_search')
+            CREATE FULLTEXT CATALOG task_search
+        """)
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('tasks'))
+            CREATE FULLTEXT INDEX ON tasks (title, description)
+                KEY INDEX ux_tasks_id ON task_search
+                WITH CHANGE_TRACKING AUTO, STOPLIST = OFF
+        """)
+    except Exception as exc:
+        logger.warning("Full-text index unavailable (%s); task search will use LIKE scans", exc)
+    finally:
+        conn.autocommit = False
+
+
+# 7 - indexed priority rank, so the default board sort reads an index in order
+
+def _task_priority_rank_sqlite(conn, cursor):
+    # ALTER TABLE can only add VIRTUAL generated columns; the index stores the values
+    _sqlite_add_columns(cursor, 'tasks', [
+        ('priority_rank', f"INTEGER GENERATED ALWAYS AS ({PRIORITY_RANK_SQL}) VIRTUAL"),
+    ])
+    # Read backwards for priority_desc; priority_asc keeps newest first within a rank
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_priority ON tasks(user_id, priority_rank, created_at, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_priority_asc "
+        "ON tasks(user_id, priority_rank, created_at DESC, id DESC)"
+    )
+
+
+def _task_priority_rank_azure_sql(conn, cursor):
+    _azure_add_columns(cursor, 'tasks', [
+        ('priority_rank', f"AS ({PRIORITY_RANK_SQL}) PERSISTED"),
+    ])
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'idx_tasks_user_priority')
+        CREATE INDEX idx_tasks_user_priority ON tasks(user_id, priority_rank, created_at, id)
+    """)
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'idx_tasks_user_priority_asc')
+        CREATE INDEX idx_tasks_user_priority_asc ON tasks(user_id, priority_rank, created_at DESC, id DESC)
+    """)
+
+
+# 8 - indexes that keep the overdue and due-today filters in default sort order
+
+OPEN_TASK_SQL = "status IS NULL OR status <> 'done'"
+
+
+def _task_filter_indexes_sqlite(conn, cursor):
+    _sqlite_add_columns(cursor, 'tasks', [
+        ('due_day', "TEXT GENERATED ALWAYS AS (date(due_date)) VIRTUAL"),
+    ])
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_due_day ON tasks(user_id, due_day, priority_rank, created_at, id)"
+    )
+    # Partial: only open tasks, with the due date alongside so overdue rows are
+    # picked out of the index without reading the table
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_open "
+        f"ON tasks(user_id, priority_rank, created_at, id, datetime(due_date)) WHERE {OPEN_TASK_SQL}"
+    )
+    # Its due-date range drew the planner into sorting every overdue task
+    cursor.execute("DROP INDEX IF EXISTS idx_tasks_user_due")
+    # Without statistics the planner cannot tell a one-day range from a sort order
+    cursor.execute("ANALYZE")
+
+
+def _task_filter_indexes_azure_sql(conn, cursor):
+    _azure_add_columns(cursor, 'tasks', [
+        ('due_day', "AS CAST(due_date AS DATE) PERSISTED"),
+    ])
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'idx_tasks_user_due_day')
+        CREATE INDEX idx_tasks_user_due_day ON tasks(user_id, due_day, priority_rank, created_at, id)
+    """)
+    # Filtered indexes cannot express the IS NULL OR, so status and due_date ride along instead
+    cursor.execute("""
+        IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'idx_tasks_user_open')
+        CREATE INDEX idx_tasks_user_open ON tasks(user_id, priority_rank, created_at, id) INCLUDE (status, due_date)
+    """)
+    cursor.execute("""
+        IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'idx_tasks_user_due' AND object_id = OBJECT_ID('tasks'))
+        DROP INDEX idx_tasks_user_due ON tasks
+    """)
+
+
+# Ordered list of (version, description, {db_type: step})
+MIGRATIONS = [
+    (1, 'Create users and tasks tables', {
+        'sqlite': _baseline_sqlite,
+        'azure_sql': _baseline_azure_sql,
+    }),
+    (2, 'Add due_date, priority, category and status to tasks', {
+        'sqlite': _task_columns_sqlite,
+        'azure_sql': _task_columns_azure_sql,
+    }),
+    (3, 'Add per-user indexes on tasks (created_at, status, due_date)', {
+        'sqlite': _task_indexes_sqlite,
+        'azure_sql': _task_indexes_azure_sql,
+    }),
+    (4, 'Add task_versions change counter', {
+        'sqlite': _task_versions_sqlite,
+        'azure_sql': _task_versions_azure_sql,
+    }),
+    (5, 'Add revision and updated_at to tasks', {
+        'sqlite': _task_revision_sqlite,
+        'azure_sql': _task_revision_azure_sql,
+    }),
+    (6, 'Add full-text search index on task title and description', {
+        'sqlite': _task_search_sqlite,
+        'azure_sql': _task_search_azure_sql,
+    }),
+    (7, 'Add indexed priority_rank to tasks for the priority sorts', {
+        'sqlite': _task_priority_rank_sqlite,
+        'azure_sql': _task_priority_rank_azure_sql,
+    }),
+    (8, 'Index the overdue and due-today filters in default sort order', {
+        'sqlite': _task_filter_indexes_sqlite,
+        'azure_sql': _task_filter_indexes_azure_sql,
+    }),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _ensure_version_table(conn, cursor):
+    if Config.DB_TYPE == 'azure_sql':
+        cursor.execute("""
+            IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='schema_version' AND xtype='U')
+            CREATE TABLE schema_version (
+                version INT PRIMARY KEY,
+                description NVARCHAR(255) NOT NULL,
+                applied_at DATETIME NOT NULL
+            )
+        """)
+    else:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at DATETIME NOT NULL
+            )
+        """)
+    conn.commit()
+
+
+def get_schema_version():
+    """Return the highest applied migration version (0 for an unversioned database)."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        _ensure_version_table(conn, cursor)
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        row = cursor.fetchone()
+        cursor.close()
+    return row[0] if row and row[0] is not None else 0
+
+
+def apply_migrations(target=None):
+    """
+    Apply pending migrations in order
+
+    Args:
+        target: Stop after this version (defaults to the latest)
+
+    Returns:
+        List of versions that were applied
+    """
+    target = LATEST_VERSION if target is None else target
+    db_type = 'azure_sql' if Config.DB_TYPE == 'azure_sql' else 'sqlite'
+    applied = []
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        _ensure_version_table(conn, cursor)
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        row = cursor.fetchone()
+        current = row[0] if row and row[0] is not None else 0
+
+        for version, description, steps in MIGRATIONS:
+            if version <= current or version > target:
+                continue
+            try:
+                steps[db_type](conn, cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.utcnow().isoformat(sep=' ', timespec='seconds'))
+                )
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                logger.error("Migration %s (%s) failed: %s", version, description, exc)
+                raise
+            logger.info("Applied migration %s: %s", version, description)
+            applied.append(version)
+
+        cursor.close()
+
+    if applied:
+        forget_task_schema()
+    else:
+        logger.info("Database schema is up to date (version %s)", current)
+    return applied
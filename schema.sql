@@ -18,6 +18,30 @@ CREATE TABLE IF NOT EXISTS tasks (
     due_date DATETIME,
     status VARCHAR(20) DEFAULT 'todo',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    revision INTEGER NOT NULL DEFAULT 1,
+    -- Sort key of the default board order (High 3, Medium 2, Low 1), as database.PRIORITY_RANK_SQL
+    priority_rank INTEGER GENERATED ALWAYS AS (CASE priority WHEN 'High' THEN 3 WHEN 'Low' THEN 1 ELSE 2 END) VIRTUAL,
+    -- Calendar day of due_date, matched by the due-today filter
+    due_day TEXT GENERATED ALWAYS AS (date(due_date)) VIRTUAL,
     user_id INTEGER NOT NULL,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
+
+-- Per-user change counter, bumped by every task write so caches can detect stale snapshots
+CREATE TABLE IF NOT EXISTS task_versions (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+-- Per-user access paths: board listing, status filters and due-date filters.
+-- SQLite compares due dates through datetime() because they are stored as text.
+CREATE INDEX IF NOT EXISTS idx_tasks_user_created ON tasks(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks(user_id, status);
+-- Priority sorts read in index order (priority_desc backwards, priority_asc forwards)
+CREATE INDEX IF NOT EXISTS idx_tasks_user_priority ON tasks(user_id, priority_rank, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_priority_asc ON tasks(user_id, priority_rank, created_at DESC, id DESC);
+-- Due-today and overdue filters in default sort order (open tasks only for overdue)
+CREATE INDEX IF NOT EXISTS idx_tasks_user_due_day ON tasks(user_id, due_day, priority_rank, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_open ON tasks(user_id, priority_rank, created_at, id, datetime(due_date))
+    WHERE status IS NULL OR status <> 'done';
@@ -181,6 +181,18 @@ function filterTasks() {
     updateColumnCounts();
 }
 
+// Search and category are applied in SQL so they cover every page, not just the loaded one
+function applyServerFilters() {
+    const params = new URLSearchParams(window.location.search);
+    const searchTerm = (document.getElementById('searchInput')?.value || '').trim();
+    const categoryFilter = document.getElementById('categoryFilter')?.value || 'All';
+
+    if (searchTerm) params.set('q', searchTerm); else params.delete('q');
+    if (categoryFilter !== 'All') params.set('category', categoryFilter); else params.delete('category');
+    params.delete('after');
+    window.location.search = params.toString();
+}
+
 function resetFilters() {
     const searchInput = document.getElementById('searchInput');
     const categorySelect = document.getElementById('categoryFilter');
@@ -188,6 +200,11 @@ function resetFilters() {
     if (searchInput) searchInput.value = '';
     if (categorySelect) categorySelect.value = 'All';
     if (prioritySelect) prioritySelect.value = 'All';
+
+    if (window.location.search) {
+        window.location.search = '';
+        return;
+    }
     filterTasks();
 }
 
@@ -196,10 +213,13 @@ function updateColumnCounts() {
         const column = document.getElementById(`column-${status}`);
         const countElement = document.getElementById(`count-${status}`);
         if (!column || !countElement) return;
-        const visibleTasks = Array.from(column.querySelectorAll('.task-card')).filter(card => {
+        const cards = Array.from(column.querySelectorAll('.task-card'));
+        const visibleTasks = cards.filter(card => {
             return window.getComputedStyle(card).display !== 'none';
         }).length;
-        countElement.textContent = visibleTasks;
+        // Cards beyond the column limit are not rendered; count them unless a filter hides cards
+        const hiddenTasks = visibleTasks === cards.length ? parseInt(column.dataset.hidden || '0', 10) : 0;
+        countElement.textContent = visibleTasks + hiddenTasks;
     });
 }
 
@@ -319,7 +339,19 @@ document.addEventListener('DOMContentLoaded', function() {
     const categoryFilter = document.getElementById('categoryFilter');
     const priorityFilter = document.getElementById('priorityFilter');
 
-    if (searchInput) searchInput.addEventListener('input', filterTasks);
+    if (categoryFilter && categoryFilter.dataset.selected) {
+        const selected = Array.from(categoryFilter.options).find(
+            option => option.value.toLowerCase() === categoryFilter.dataset.selected.toLowerCase()
+        );
+        if (selected) categoryFilter.value = selected.value;
+    }
+
+    if (searchInput) {
+        searchInput.addEventListener('input', filterTasks);
+        searchInput.addEventListener('keydown', (e) => {
+            if (e.key === 'Enter') applyServerFilters();
+        });
+    }
     if (categoryFilter) categoryFilter.addEventListener('change', filterTasks);
     if (priorityFilter) priorityFilter.addEventListener('change', filterTasks);
 
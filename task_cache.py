@@ -0,0 +1,267 @@
+"""
+Per-user, in-process snapshot cache of normalized tasks
+
+Each worker keeps the normalized task dicts of recently active users, tagged
+with the user's task version from the task_versions table. A view checks
+that one counter and, if it still matches, filters/sorts/pages the snapshot
+in memory instead of querying the tasks table. Writes made by this worker
+patch the snapshot in place; writes made by any other worker bump the
+counter and the snapshot is reloaded on the next view.
+
+Only boards up to TASK_CACHE_MAX_TASKS are cached; larger boards keep using
+the paginated SQL path. Total memory is bounded by TASK_CACHE_MAX_BYTES with
+least-recently-used eviction.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from database import PRIORITY_RANKS, TASK_SORTS, DEFAULT_TASK_SORT
+
+# Rough per-task overhead of the dict, its keys and the datetime objects
+_TASK_BASE_BYTES = 1200
+
+# Returned by get() for boards known to exceed max_tasks at that version
+OVERSIZED = object()
+
+
+def estimate_task_size(task):
+    """Approximate memory held by one normalized task dict."""
+    size = _TASK_BASE_BYTES
+    for key in ('title', 'description', 'category', 'priority', 'status'):
+        value = task.get(key)
+        if value:
+            size += sys.getsizeof(value)
+    return size
+
+
+class _Snapshot:
+    __slots__ = ('version', 'tasks', 'size')
+
+    def __init__(self, version, tasks):
+        self.version = version
+        if tasks is None:
+            # Oversized board: remember only that it is too big to cache
+            self.tasks = None
+            self.size = _TASK_BASE_BYTES
+        else:
+            self.tasks = {task['id']: task for task in tasks}
+            self.size = sum(estimate_task_size(task) for task in tasks)
+
+
+class TaskSnapshotCache:
+    """
+    LRU cache of per-user task snapshots with a memory cap
+
+    Args:
+        max_bytes: Approximate memory budget across all users
+        max_tasks: Boards with more tasks than this are not cached
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_tasks=2000):
+        self.max_bytes = max_bytes
+        self.max_tasks = max_tasks
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, namespace, user_id, version):
+        """
+        Return the user's cached tasks if the snapshot is at this version
+
+        Returns None on a miss and OVERSIZED if the board is known to be too
+        large to cache.
+        """
+        key = (namespace, user_id)
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None or snapshot.version != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if snapshot.tasks is None:
+                return OVERSIZED
+            return list(snapshot.tasks.values())
+
+    def put(self, namespace, user_id, version, tasks):
+        """
+        Store a full snapshot of the user's tasks
+
+        Boards larger than max_tasks are recorded as OVERSIZED instead.
+        Returns True if the tasks themselves were cached.
+        """
+        cacheable = len(tasks) <= self.max_tasks
+        snapshot = _Snapshot(version, tasks if cacheable else None)
+        key = (namespace, user_id)
+        with self._lock:
+            self._remove_locked(key)
+            self._entries[key] = snapshot
+            self._bytes += snapshot.size
+            self._evict_locked()
+        return cacheable
+
+    def apply(self, namespace, user_id, version, upsert=None, delete_id=None):
+        """
+        Patch a snapshot after a write made by this worker
+
+        The patch only applies if the snapshot was exactly one version behind;
+        otherwise another worker wrote in between and the entry is dropped.
+        """
+        key = (namespace, user_id)
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is None:
+                return
+            if snapshot.version != version - 1:
+                self._remove_locked(key)
+                return
+            if snapshot.tasks is None:
+                snapshot.version = version
+                return
+
+            if delete_id is not None:
+                removed = snapshot.tasks.pop(delete_id, None)
+                if removed is not None:
+                    snapshot.size -= estimate_task_size(removed)
+                    self._bytes -= estimate_task_size(removed)
+            if upsert is not None:
+                previous = snapshot.tasks.get(upsert['id'])
+                if previous is not None:
+                    snapshot.size -= estimate_task_size(previous)
+                    self._bytes -= estimate_task_size(previous)
+                snapshot.tasks[upsert['id']] = upsert
+                snapshot.size += estimate_task_size(upsert)
+                self._bytes += estimate_task_size(upsert)
+
+            snapshot.version = version
+            if len(snapshot.tasks) > self.max_tasks:
+                self._remove_locked(key)
+                return
+            self._entries.move_to_end(key)
+            self._evict_locked()
+
+    def invalidate(self, namespace, user_id):
+        with self._lock:
+            self._remove_locked((namespace, user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _remove_locked(self, key):
+        snapshot = self._entries.pop(key, None)
+        if snapshot is not None:
+            self._bytes -= snapshot.size
+
+    def _evict_locked(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, snapshot = self._entries.popitem(last=False)
+            self._bytes -= snapshot.size
+            self.evictions += 1
+
+
+# Snapshot views
+#
+# These mirror database.build_task_query() and database.get_task_stats() so a
+# cached board renders exactly like the SQL path. Searches always go to the
+# full-text index (task_service.search_board), so snapshots are never searched.
+
+def _is_pending(task):
+    return task['status'] != 'done'
+
+
+def _matches(task, status_filter, category, now):
+    if category and category.lower() != 'all':
+        if (task.get('category') or '').lower() != category.lower():
+            return False
+
+    due_date = task.get('due_date')
+    if status_filter == 'completed':
+        return task['status'] == 'done'
+    if status_filter == 'pending':
+        return _is_pending(task)
+    if status_filter == 'overdue':
+        return _is_pending(task) and due_date is not None and due_date < now
+    if status_filter == 'today':
+        day_start = datetime.combine(now.date(), datetime.min.time())
+        return due_date is not None and day_start <= due_date < day_start + timedelta(days=1)
+    return True
+
+
+def _sort_value(task, key):
+    if key == 'priority_rank':
+        return PRIORITY_RANKS.get(task.get('priority'), 2)
+    if key == 'created_at':
+        return task.get('created_at') or datetime.min
+    return task.get(key)
+
+
+def _after_cursor(task, keys, after):
+    """True if the task sorts strictly after the keyset cursor."""
+    for (key, _, descending), cursor_value in zip(keys, after):
+        value = _sort_value(task, key)
+        if value == cursor_value:
+            continue
+        return value < cursor_value if descending else value > cursor_value
+    return False
+
+
+def query_snapshot(tasks, status_filter='all', category='', sort=DEFAULT_TASK_SORT,
+                   after=None, limit=50, now=None):
+    """
+    Filter, sort and page a snapshot the same way database.query_tasks() does
+
+    Returns:
+        (tasks, has_more)
+    """
+    now = now or datetime.now()
+    keys = TASK_SORTS.get(sort, TASK_SORTS[DEFAULT_TASK_SORT])
+
+    selected = [
+        task for task in tasks
+        if _matches(task, status_filter, category, now)
+        and (not after or _after_cursor(task, keys, after))
+    ]
+    # Stable multi-key sort: apply the least significant key first
+    for key, _, descending in reversed(keys):
+        selected.sort(key=lambda task: _sort_value(task, key), reverse=descending)
+
+    return selected[:limit], len(selected) > limit
+
+
+def snapshot_stats(tasks, now):
+    """Dashboard counters over a snapshot, matching database.get_task_stats()."""
+    tomorrow_start = datetime.combine(now.date(), datetime.min.time()) + timedelta(days=1)
+    week_end = now + timedelta(days=7)
+    stats = {'overdue': 0, 'due_today': 0, 'due_week': 0, 'total': 0}
+    for task in tasks:
+        if not _is_pending(task):
+            continue
+        stats['total'] += 1
+        due_date = task.get('due_date')
+        if due_date is None:
+            continue
+        if due_date < now:
+            stats['overdue'] += 1
+        else:
+            if due_date < tomorrow_start:
+                stats['due_today'] += 1
+            if due_date <= week_end:
+                stats['due_week'] += 1
+    return stats
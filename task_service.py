@@ -0,0 +1,677 @@
+"""
+Task reads and writes shared by the request handlers
+
+Coordinates database.py with the per-worker snapshot cache in task_cache.py:
+views are served from the cache while the user's task version is unchanged,
+and every write patches the cached snapshot in place.
+"""
+import csv
+import io
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from markupsafe import Markup, escape
+
+import database
+import tracing
+from config import Config
+from database import PRIORITY_RANKS, DEFAULT_TASK_SORT
+from task_cache import TaskSnapshotCache, OVERSIZED, query_snapshot, snapshot_stats
+
+logger = logging.getLogger(__name__)
+
+snapshot_cache = TaskSnapshotCache(
+    max_bytes=Config.TASK_CACHE_MAX_BYTES,
+    max_tasks=Config.TASK_CACHE_MAX_TASKS,
+)
+
+# Callbacks notified on every board load: callback(result)
+# where result is 'hit', 'miss' or 'oversized'.
+_listeners = []
+
+
+def add_listener(callback):
+    """Register a callback invoked for every snapshot cache lookup."""
+    _listeners.append(callback)
+
+
+def _notify(result):
+    for callback in _listeners:
+        try:
+            callback(result)
+        except Exception as exc:
+            logger.debug("Task cache listener failed: %s", exc)
+
+
+def local_now():
+    """Current time in the app's display timezone (UTC+1, Western Europe Time)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+
+
+# Formats tried only when fromisoformat() rejects a value (e.g. unpadded fields)
+_FALLBACK_DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S")
+
+
+@lru_cache(maxsize=8192)
+def _parse_datetime_text(text):
+    # Every format the app stores (CURRENT_TIMESTAMP, isoformat(), datetime-local
+    # input) is ISO 8601, which fromisoformat() parses in C without exceptions
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in _FALLBACK_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_datetime_value(value):
+    """Return datetime from DB value or None."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        # Azure SQL (pyodbc) already returns datetime objects
+        return value
+    return _parse_datetime_text(str(value))
+
+
+def apply_time_flags(task, now):
+    """Set the flags that depend on the current time."""
+    due_date = task['due_date']
+    task['is_overdue'] = not task['completed'] and due_date is not None and due_date < now
+    task['is_due_today'] = (
+        due_date is not None
+        and due_date.date() == now.date()
+        and not task['is_overdue']
+    )
+    return task
+
+
+def normalize_task(raw, now):
+    """Turn a raw task row into the dict the templates expect, with derived flags."""
+    # Handle both schema types: Azure SQL (status) and SQLite (completed)
+    if 'status' in raw:
+        status = raw.get('status') or 'todo'
+        completed = status == 'done'
+    else:
+        completed = bool(raw.get('completed', 0))
+        status = 'done' if completed else 'todo'
+
+    task = {
+        'id': raw.get('id'),
+        'title': raw.get('title', ''),
+        'description': raw.get('description', ''),
+        'completed': completed,
+        'created_at': parse_datetime_value(raw.get('created_at')),
+        'due_date': parse_datetime_value(raw.get('due_date')),
+        'priority': raw.get('priority', 'Medium'),
+        'category': raw.get('category', 'General'),
+        'status': status,
+        'revision': raw.get('revision'),
+    }
+    task['priority_rank'] = PRIORITY_RANKS.get(task['priority'], 2)
+    return apply_time_flags(task, now)
+
+
+def trace_due_checks(tasks, now):
+    """Trace the overdue/due-today decision for each dated task (traced requests only)."""
+    if not tracing.enabled():
+        return
+    for task in tasks:
+        if task['due_date'] is None:
+            continue
+        tracing.trace('task_due_check', lambda task=task: {
+            'task_id': task['id'],
+            'completed': task['completed'],
+            'due_date': task['due_date'],
+            'now': now,
+            'is_overdue': task['is_overdue'],
+            'is_due_today': task['is_due_today'],
+        })
+
+
+VALID_PRIORITIES = ('High', 'Medium', 'Low')
+
+
+class TaskValidationError(ValueError):
+    """Raised when submitted task fields are invalid."""
+
+
+def _field(data, name, default=''):
+    value = data.get(name)
+    return default if value is None else str(value).strip()
+
+
+def validate_task_fields(data, strict=False):
+    """
+    Clean the task fields submitted by the HTML forms or the JSON API
+
+    Args:
+        data: Mapping with title, description, priority, category, due_date, status
+        strict: Reject unknown priorities and statuses instead of using the defaults
+
+    Returns:
+        dict with title, description, priority, category, due_date (datetime or None), status
+
+    Raises:
+        TaskValidationError: with a message suitable for showing to the user
+    """
+    title = _field(data, 'title')
+    if not title:
+        raise TaskValidationError('Task title is required')
+    if len(title) > 255:
+        raise TaskValidationError('Task title too long (max 255 characters)')
+
+    priority = _field(data, 'priority', 'Medium').title()
+    if priority not in VALID_PRIORITIES:
+        if strict:
+            raise TaskValidationError('Invalid priority')
+        priority = 'Medium'
+
+    status = _field(data, 'status', 'todo')
+    if status not in database.VALID_TASK_STATUSES:
+        if strict:
+            raise TaskValidationError('Invalid status')
+        status = 'todo'
+
+    due_date = None
+    due_date_str = _field(data, 'due_date')
+    if due_date_str:
+        try:
+            due_date = datetime.fromisoformat(due_date_str)
+        except ValueError:
+            raise TaskValidationError('Invalid due date format')
+        if due_date.tzinfo is not None:
+            raise TaskValidationError('Invalid due date format')
+
+    return {
+        'title': title,
+        'description': _field(data, 'description'),
+        'priority': priority,
+        'category': _field(data, 'category', 'General') or 'General',
+        'due_date': due_date,
+        'status': status,
+    }
+
+
+def _cached_tasks(user_id, now):
+    """
+    Return the user's full normalized task list from the snapshot cache
+
+    Returns None when caching is disabled or the board is too large, in
+    which case callers should use the paginated SQL path.
+    """
+    if not Config.TASK_CACHE_ENABLED:
+        return None
+
+    namespace = database.database_generation()
+    version = database.get_task_version(user_id)
+    tasks = snapshot_cache.get(namespace, user_id, version)
+    if tasks is OVERSIZED:
+        _notify('oversized')
+        return None
+    if tasks is not None:
+        _notify('hit')
+        return tasks
+
+    _notify('miss')
+    rows = database.fetch_user_tasks(user_id, limit=snapshot_cache.max_tasks + 1)
+    tasks = [normalize_task(row, now) for row in rows]
+    if not snapshot_cache.put(namespace, user_id, version, tasks):
+        return None
+    return tasks
+
+
+def highlight(text, terms):
+    """Escape text and wrap every word starting with one of the terms in <mark>."""
+    if not text or not terms:
+        return escape(text or '')
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.IGNORECASE)
+    parts = []
+    position = 0
+    for match in pattern.finditer(text):
+        parts.append(escape(text[position:match.start()]))
+        parts.append(Markup('<mark>%s</mark>') % match.group(0))
+        position = match.end()
+    parts.append(escape(text[position:]))
+    return Markup('').join(parts)
+
+
+def search_board(user_id, search, status_filter='all', category='', sort='relevance',
+                 after=None, limit=50, now=None, snapshot=None, with_stats=True):
+    """
+    Run a search through the database's full-text index
+
+    Searches always go to SQL (ranked, prefix-matched) rather than scanning
+    the snapshot; the snapshot, when cached, still provides the counters.
+
+    Returns:
+        (tasks, next_cursor, stats) with 'search_rank' and 'highlights' set on
+        each task; stats is None unless with_stats
+    """
+    now = now or local_now()
+    terms = database.search_terms(search)
+    rows, next_cursor = database.query_tasks(
+        user_id, search=search, status_filter=status_filter, category=category,
+        sort=sort, after=after, limit=limit, now=now
+    )
+    tasks = []
+    for row in rows:
+        task = normalize_task(row, now)
+        task['search_rank'] = row.get('search_rank')
+        task['highlights'] = {
+            'title': highlight(task['title'], terms),
+            'description': highlight(task['description'], terms),
+        }
+        tasks.append(task)
+
+    tracing.trace('board_loaded', lambda: {
+        'source': 'search', 'backend': database.search_backend(), 'tasks': len(tasks),
+    })
+    trace_due_checks(tasks, now)
+    if not with_stats:
+        return tasks, next_cursor, None
+    stats = snapshot_stats(snapshot, now) if snapshot is not None else database.get_task_stats(user_id, now)
+    return tasks, next_cursor, stats
+
+
+def load_board(user_id, search='', status_filter='all', category='', sort=DEFAULT_TASK_SORT,
+               after=None, limit=50, now=None, with_stats=True):
+    """
+    Load one page of a user's board plus the dashboard counters
+
+    Args:
+        with_stats: False skips the counters (and, on the SQL path, their
+            per-user aggregate query) for callers that only need the page
+
+    Returns:
+        (tasks, next_cursor, stats); stats is None unless with_stats
+    """
+    now = now or local_now()
+    # Searches without any word characters match everything, as in SQL
+    searching = bool(database.search_terms(search))
+    # A search reads the snapshot only for the counters
+    snapshot = _cached_tasks(user_id, now) if with_stats or not searching else None
+
+    if searching:
+        return search_board(user_id, search, status_filter=status_filter, category=category, sort=sort,
+                            after=after, limit=limit, now=now, snapshot=snapshot, with_stats=with_stats)
+
+    if snapshot is None:
+        rows, next_cursor = database.query_tasks(
+            user_id, status_filter=status_filter, category=category,
+            sort=sort, after=after, limit=limit, now=now
+        )
+        tasks = [normalize_task(row, now) for row in rows]
+        tracing.trace('board_loaded', lambda: {'source': 'sql', 'tasks': len(tasks)})
+        trace_due_checks(tasks, now)
+        return tasks, next_cursor, database.get_task_stats(user_id, now) if with_stats else None
+
+    page, has_more = query_snapshot(
+        snapshot, status_filter=status_filter, category=category,
+        sort=sort, after=after, limit=limit, now=now
+    )
+    # Copies, so the time-dependent flags never leak back into the cache
+    tasks = [apply_time_flags(dict(task), now) for task in page]
+    next_cursor = database.encode_task_cursor(page[-1], sort) if has_more else None
+    tracing.trace('board_loaded', lambda: {'source': 'cache', 'tasks': len(tasks), 'snapshot': len(snapshot)})
+    trace_due_checks(tasks, now)
+    return tasks, next_cursor, snapshot_stats(snapshot, now) if with_stats else None
+
+
+def bucket_by_status(tasks, column_limits=None):
+    """
+    Split tasks into Kanban columns in a single pass
+
+    Args:
+        tasks: Tasks in display order
+        column_limits: Optional {status: max cards to render}
+
+    Returns:
+        {status: {'tasks': [...], 'count': n, 'hidden': n}} for every valid status
+    """
+    column_limits = column_limits or {}
+    columns = {status: {'tasks': [], 'count': 0, 'hidden': 0} for status in database.VALID_TASK_STATUSES}
+    for task in tasks:
+        column = columns.get(task['status'])
+        if column is None:
+            continue
+        column['count'] += 1
+        limit = column_limits.get(task['status'])
+        if limit is None or len(column['tasks']) < limit:
+            column['tasks'].append(task)
+        else:
+            column['hidden'] += 1
+    return columns
+
+
+def get_task(user_id, task_id):
+    """Return one of the user's tasks normalized, or None."""
+    raw = database.get_task(user_id, task_id)
+    return normalize_task(raw, local_now()) if raw else None
+
+
+BATCH_OPERATIONS = ('create', 'update', 'move', 'toggle', 'delete')
+
+
+def _task_id(value):
+    if isinstance(value, bool):
+        raise TaskValidationError('Invalid task id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise TaskValidationError('Invalid task id')
+
+
+def editable_fields(task):
+    """A normalized task's writable fields, as validate_task_fields() accepts them (PATCH and batch update)."""
+    return {
+        'title': task['title'],
+        'description': task['description'],
+        'priority': task['priority'],
+        'category': task['category'],
+        'due_date': task['due_date'].isoformat() if task['due_date'] else None,
+        'status': task['status'],
+    }
+
+
+def _operation_task(operation):
+    """The 'task' object of a create/update operation (missing counts as empty)."""
+    task = operation.get('task')
+    if task is None:
+        return {}
+    if not isinstance(task, dict):
+        raise TaskValidationError("'task' must be an object")
+    return task
+
+
+def apply_batch(user_id, operations):
+    """
+    Validate and apply a list of task operations in one transaction
+
+    Each operation is a dict with an 'op' of create, update, move, toggle or
+    delete, plus 'id' (all but create), 'task' (create/update fields) or
+    'status' (move). Invalid items are reported and skipped; the valid ones
+    are written together.
+
+    Returns:
+        One result dict per operation, in order, with 'index', 'op', 'status'
+        (an HTTP status code) and either 'task', 'id' or 'error'
+    """
+    results = [None] * len(operations)
+    targets = {}
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPERATIONS:
+            results[index] = {'index': index, 'op': None, 'status': 400, 'error': 'Unknown operation'}
+            continue
+        if operation['op'] == 'create':
+            continue
+        try:
+            task_id = _task_id(operation.get('id'))
+        except TaskValidationError as exc:
+            results[index] = {'index': index, 'op': operation['op'], 'status': 400, 'error': str(exc)}
+            continue
+        if task_id in targets:
+            results[index] = {'index': index, 'op': operation['op'], 'status': 409,
+                              'error': 'Task appears more than once in the batch'}
+            continue
+        targets[task_id] = index
+
+    current = database.get_tasks_by_ids(user_id, targets) if targets else {}
+    now = local_now()
+
+    creates, updates, moves, toggles, deletes = [], [], [], [], []
+    for index, operation in enumerate(operations):
+        if results[index] is not None:
+            continue
+        op = operation['op']
+        try:
+            if op == 'create':
+                fields = validate_task_fields(_operation_task(operation), strict=True)
+                creates.append((index, fields))
+                continue
+
+            task_id = _task_id(operation['id'])
+            if task_id not in current:
+                results[index] = {'index': index, 'op': op, 'status': 404, 'error': 'Task not found'}
+                continue
+            existing = normalize_task(current[task_id], now)
+
+            if op == 'update':
+                merged = editable_fields(existing)
+                changes = _operation_task(operation)
+                merged.update({key: value for key, value in changes.items() if key in merged})
+                updates.append((index, task_id, validate_task_fields(merged, strict=True)))
+            elif op == 'move':
+                status = str(operation.get('status') or '').strip()
+                if status not in database.VALID_TASK_STATUSES:
+                    raise TaskValidationError('Invalid status')
+                moves.append((index, task_id, status))
+            elif op == 'toggle':
+                # Flipped by the UPDATE itself so a concurrent toggle is not lost
+                toggles.append((index, task_id))
+            else:
+                deletes.append((index, task_id))
+        except TaskValidationError as exc:
+            results[index] = {'index': index, 'op': op, 'status': 400, 'error': str(exc)}
+
+    if creates or updates or moves or toggles or deletes:
+        created_ids, rows, _ = database.apply_task_batch(
+            user_id,
+            creates=[fields for _, fields in creates],
+            updates=[(task_id, fields) for _, task_id, fields in updates],
+            moves=[(task_id, status) for _, task_id, status in moves],
+            toggles=[task_id for _, task_id in toggles],
+            deletes=[task_id for _, task_id in deletes],
+        )
+        # Several rows changed under one version bump; reload the snapshot on the next view
+        snapshot_cache.invalidate(database.database_generation(), user_id)
+
+        changed = [(index, 'create', task_id, 201) for (index, _), task_id in zip(creates, created_ids)]
+        changed += [(index, 'update', task_id, 200) for index, task_id, _ in updates]
+        changed += [(index, 'move', task_id, 200) for index, task_id, _ in moves]
+        changed += [(index, 'toggle', task_id, 200) for index, task_id in toggles]
+        for index, op, task_id, status in changed:
+            if task_id not in rows:
+                # Deleted by a concurrent request between the read and the write
+                results[index] = {'index': index, 'op': op, 'status': 404, 'error': 'Task not found'}
+                continue
+            results[index] = {'index': index, 'op': op, 'status': status,
+                              'task': normalize_task(rows[task_id], now)}
+        for index, task_id in deletes:
+            results[index] = {'index': index, 'op': 'delete', 'status': 204, 'id': task_id}
+
+    return results
+
+
+EXPORT_COLUMNS = ('id', 'title', 'description', 'status', 'completed', 'priority', 'category',
+                  'due_date', 'created_at')
+
+# Format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def _export_record(task):
+    record = {column: task[column] for column in EXPORT_COLUMNS}
+    for column in ('due_date', 'created_at'):
+        record[column] = record[column].isoformat() if record[column] else None
+    return record
+
+
+def iter_export(user_id, fmt='csv', rows_per_chunk=200):
+    """
+    Yield a user's tasks as CSV or NDJSON text chunks
+
+    Rows are streamed from the database (see database.iter_user_tasks) and
+    normalized like the board, so memory use does not grow with the number
+    of tasks.
+    """
+    now = local_now()
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator='\n')
+        writer.writeheader()
+        # Send the header straight away so the download starts immediately
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    pending = 0
+    for raw in database.iter_user_tasks(user_id):
+        record = _export_record(normalize_task(raw, now))
+        if writer is not None:
+            writer.writerow(record)
+        else:
+            buffer.write(json.dumps(record))
+            buffer.write('\n')
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+
+def _iter_import_records(stream, fmt):
+    """Yield (line number, record dict) pairs from a CSV or NDJSON text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+        yield line_number, record if isinstance(record, dict) else None
+
+
+def import_tasks(user_id, stream, fmt='csv', chunk_size=1000, on_progress=None):
+    """
+    Validate and insert tasks from a CSV or NDJSON text stream
+
+    Rows are parsed as they are read and validated with the same rules as
+    the add-task form; valid rows are inserted chunk_size at a time, one
+    transaction per chunk. An optional created_at column is kept.
+
+    Args:
+        stream: Iterable of text lines (an open file or upload stream)
+        fmt: 'csv' or 'ndjson' (the formats /export produces)
+        on_progress: Called as on_progress(imported, failed) after each chunk
+
+    Returns:
+        {'imported': n, 'failed': n, 'errors': [{'line': n, 'error': msg}, ...]}
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise TaskValidationError('Unsupported import format')
+
+    summary = {'imported': 0, 'failed': 0, 'errors': []}
+    pending = []
+
+    def flush():
+        if not pending:
+            return
+        database.insert_tasks(user_id, pending)
+        summary['imported'] += len(pending)
+        pending.clear()
+        if on_progress:
+            on_progress(summary['imported'], summary['failed'])
+
+    for line_number, record in _iter_import_records(stream, fmt):
+        try:
+            if record is None:
+                raise TaskValidationError('Malformed row')
+            fields = validate_task_fields(record)
+            created_at = _field(record, 'created_at')
+            if created_at:
+                fields['created_at'] = parse_datetime_value(created_at)
+                if fields['created_at'] is None:
+                    raise TaskValidationError('Invalid created_at format')
+        except TaskValidationError as exc:
+            summary['failed'] += 1
+            if len(summary['errors']) < IMPORT_MAX_REPORTED_ERRORS:
+                summary['errors'].append({'line': line_number, 'error': str(exc)})
+            continue
+        pending.append(fields)
+        if len(pending) >= chunk_size:
+            flush()
+    flush()
+
+    if summary['imported'] and Config.TASK_CACHE_ENABLED:
+        snapshot_cache.invalidate(database.database_generation(), user_id)
+    return summary
+
+
+def _record_write(user_id, version, task=None, delete_id=None):
+    if version is None or not Config.TASK_CACHE_ENABLED:
+        return
+    snapshot_cache.apply(database.database_generation(), user_id, version, upsert=task, delete_id=delete_id)
+
+
+def create_task(user_id, title, description='', priority='Medium', category='General', due_date=None, status='todo'):
+    """Create a task and return it normalized."""
+    raw, version = database.create_task(
+        user_id, title, description=description, priority=priority,
+        category=category, due_date=due_date, status=status
+    )
+    task = normalize_task(raw, local_now())
+    _record_write(user_id, version, task=task)
+    return task
+
+
+def update_task(user_id, task_id, title, description, priority, category, due_date, status):
+    """Edit a task; returns the normalized task or None if not found."""
+    raw, version = database.update_task(user_id, task_id, title, description, priority, category, due_date, status)
+    if raw is None:
+        return None
+    task = normalize_task(raw, local_now())
+    _record_write(user_id, version, task=task)
+    return task
+
+
+def move_task(user_id, task_id, status):
+    """Move a task to another column; returns the normalized task or None if not found."""
+    raw, version = database.set_task_status(user_id, task_id, status)
+    if raw is None:
+        return None
+    task = normalize_task(raw, local_now())
+    _record_write(user_id, version, task=task)
+    return task
+
+
+def toggle_task(user_id, task_id):
+    """Flip a task between done and todo; returns the normalized task or None."""
+    raw, version = database.toggle_task(user_id, task_id)
+    if raw is None:
+        return None
+    task = normalize_task(raw, local_now())
+    _record_write(user_id, version, task=task)
+    return task
+
+
+def delete_task(user_id, task_id):
+    """Delete a task; returns True if it existed."""
+    deleted, version = database.delete_task(user_id, task_id)
+    if deleted:
+        _record_write(user_id, version, delete_id=task_id)
+    return deleted
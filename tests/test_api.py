@@ -0,0 +1,245 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client logged in as a fresh user on a migrated database"""
+    from config import Config
+    from migrations import apply_migrations
+    from database import create_user, close_pools
+
+    monkeypatch.setattr(Config, 'SQLITE_DATABASE', str(tmp_path / 'api.db'))
+    apply_migrations()
+    user_id = create_user('apiuser', 'api@example.com', 'secret123')
+
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['user_id'] = user_id
+        yield client
+    close_pools()
+
+
+def test_api_requires_login(client):
+    """Requests without a session get 401 JSON"""
+    with client.session_transaction() as sess:
+        sess.clear()
+    response = client.get('/api/v1/tasks')
+    assert response.status_code == 401
+    assert response.get_json()['error']
+
+
+def test_api_create_get_patch_delete(client):
+    """Full lifecycle of a task through the JSON API"""
+    response = client.post('/api/v1/tasks', json={'title': 'API Task', 'priority': 'high',
+                                                   'due_date': '2030-01-02T09:30'})
+    assert response.status_code == 201
+    task = response.get_json()
+    assert task['priority'] == 'High'
+    assert task['due_date'] == '2030-01-02T09:30:00'
+    assert response.headers['Location'].endswith(f"/api/v1/tasks/{task['id']}")
+
+    response = client.patch(f"/api/v1/tasks/{task['id']}", json={'status': 'in_review'})
+    assert response.status_code == 200
+    patched = response.get_json()
+    assert patched['status'] == 'in_review'
+    assert patched['title'] == 'API Task'
+    assert patched['revision'] == task['revision'] + 1
+
+    response = client.get(f"/api/v1/tasks/{task['id']}")
+    assert response.get_json()['status'] == 'in_review'
+
+    assert client.delete(f"/api/v1/tasks/{task['id']}").status_code == 204
+    assert client.get(f"/api/v1/tasks/{task['id']}").status_code == 404
+
+
+def test_api_rejects_invalid_fields(client):
+    """Strict validation: unknown status and missing title are 400s"""
+    assert client.post('/api/v1/tasks', json={'title': ''}).status_code == 400
+    response = client.post('/api/v1/tasks', json={'title': 'Bad', 'status': 'archived'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid status'
+
+
+def test_api_list_etag_and_304(client):
+    """Unchanged boards revalidate with 304; a write changes the ETag"""
+    client.post('/api/v1/tasks', json={'title': 'First'})
+
+    response = client.get('/api/v1/tasks')
+    assert response.status_code == 200
+    assert [t['title'] for t in response.get_json()['tasks']] == ['First']
+    etag = response.headers['ETag']
+
+    response = client.get('/api/v1/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    client.post('/api/v1/tasks', json={'title': 'Second'})
+    response = client.get('/api/v1/tasks', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_api_list_paginates(client):
+    """next_cursor walks the list in pages"""
+    for i in range(3):
+        client.post('/api/v1/tasks', json={'title': f'Task {i}'})
+
+    page = client.get('/api/v1/tasks?limit=2&sort=created_asc').get_json()
+    assert len(page['tasks']) == 2
+    assert page['next_cursor']
+
+    page = client.get(f"/api/v1/tasks?limit=2&sort=created_asc&after={page['next_cursor']}").get_json()
+    assert len(page['tasks']) == 1
+    assert page['next_cursor'] is None
+
+
+def test_api_list_skips_dashboard_counters(client, monkeypatch):
+    """The SQL page path (cache off or board oversized) does not run the stats aggregate"""
+    import database
+    from config import Config
+
+    client.post('/api/v1/tasks', json={'title': 'Quarterly report'})
+    monkeypatch.setattr(Config, 'TASK_CACHE_ENABLED', False)
+
+    def no_stats(*args):
+        raise AssertionError("get_task_stats called for an API page")
+
+    monkeypatch.setattr(database, 'get_task_stats', no_stats)
+    assert [t['title'] for t in client.get('/api/v1/tasks').get_json()['tasks']] == ['Quarterly report']
+    assert len(client.get('/api/v1/tasks?q=report').get_json()['tasks']) == 1
+
+
+def test_api_batch_applies_operations_in_one_request(client):
+    """Mixed operations run together and report per-item results"""
+    created = [client.post('/api/v1/tasks', json={'title': f'Batch {i}'}).get_json() for i in range(3)]
+
+    response = client.post('/api/v1/tasks/batch', json={'operations': [
+        {'op': 'create', 'task': {'title': 'New in batch', 'category': 'Bulk'}},
+        {'op': 'update', 'id': created[0]['id'], 'task': {'category': 'Bulk'}},
+        {'op': 'move', 'id': created[1]['id'], 'status': 'done'},
+        {'op': 'delete', 'id': created[2]['id']},
+        {'op': 'delete', 'id': 999999},
+        {'op': 'create', 'task': {'title': ''}},
+        {'op': 'toggle', 'id': created[1]['id']},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+
+    assert [r['status'] for r in results] == [201, 200, 200, 204, 404, 400, 409]
+    assert results[0]['task']['title'] == 'New in batch'
+    assert results[1]['task']['category'] == 'Bulk'
+    assert results[1]['task']['title'] == 'Batch 0'
+    assert results[2]['task']['status'] == 'done'
+
+    tasks = client.get('/api/v1/tasks').get_json()['tasks']
+    assert sorted(t['title'] for t in tasks) == ['Batch 0', 'Batch 1', 'New in batch']
+
+
+def test_api_batch_rejects_task_that_is_not_an_object(client):
+    """A non-object 'task' fails only its own item; the rest of the batch is applied"""
+    created = client.post('/api/v1/tasks', json={'title': 'Keep me'}).get_json()
+
+    response = client.post('/api/v1/tasks/batch', json={'operations': [
+        {'op': 'create', 'task': ['x']},
+        {'op': 'update', 'id': created['id'], 'task': 'abc'},
+        {'op': 'create', 'task': {'title': 'Valid'}},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+
+    assert [(r['op'], r['status']) for r in results] == [('create', 400), ('update', 400), ('create', 201)]
+    assert results[0]['error'] == "'task' must be an object"
+    assert results[1]['error'] == "'task' must be an object"
+    titles = sorted(t['title'] for t in client.get('/api/v1/tasks').get_json()['tasks'])
+    assert titles == ['Keep me', 'Valid']
+
+
+def test_api_batch_handles_many_rows(client):
+    """Batches larger than one SQL chunk are applied completely"""
+    operations = [{'op': 'create', 'task': {'title': f'Bulk {i}'}} for i in range(600)]
+    results = client.post('/api/v1/tasks/batch', json={'operations': operations}).get_json()['results']
+    ids = [r['task']['id'] for r in results]
+    assert len(set(ids)) == 600
+
+    moves = [{'op': 'move', 'id': task_id, 'status': 'in_progress'} for task_id in ids]
+    results = client.post('/api/v1/tasks/batch', json={'operations': moves}).get_json()['results']
+    assert all(r['status'] == 200 and r['task']['status'] == 'in_progress' for r in results)
+
+
+def test_api_import_csv_and_ndjson(client):
+    """Imports insert valid rows and report the rejected ones by line"""
+    import io
+
+    csv_body = ("title,priority,status,due_date,created_at\n"
+                "Imported one,high,in_progress,2030-01-02T09:30,2024-05-01 08:00:00\n"
+                ",low,todo,,\n"
+                "Imported two,low,todo,not-a-date,\n"
+                "Imported three,low,done,,\n")
+    response = client.post('/api/v1/tasks/import',
+                           data={'file': (io.BytesIO(csv_body.encode()), 'tasks.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['imported'] == 2
+    assert summary['failed'] == 2
+    assert [error['line'] for error in summary['errors']] == [3, 4]
+
+    ndjson_body = '{"title": "From ndjson", "category": "Work"}\nnot json\n'
+    response = client.post('/api/v1/tasks/import?format=ndjson', data=ndjson_body,
+                           content_type='application/x-ndjson')
+    summary = response.get_json()
+    assert summary['imported'] == 1
+    assert summary['errors'] == [{'line': 2, 'error': 'Malformed row'}]
+
+    tasks = client.get('/api/v1/tasks').get_json()['tasks']
+    by_title = {task['title']: task for task in tasks}
+    assert set(by_title) == {'Imported one', 'Imported three', 'From ndjson'}
+    assert by_title['Imported one']['priority'] == 'High'
+    assert by_title['Imported one']['status'] == 'in_progress'
+    assert by_title['Imported one']['created_at'].startswith('2024-05-01T08:00')
+    assert by_title['From ndjson']['category'] == 'Work'
+
+    assert client.post('/api/v1/tasks/import?format=xml', data='x').status_code == 400
+
+
+def test_api_import_round_trips_export(client):
+    """An export re-imported into another account reproduces the tasks"""
+    import io
+    from database import create_user
+
+    for i in range(30):
+        client.post('/api/v1/tasks', json={'title': f'Task {i}', 'priority': 'low'})
+    exported = client.get('/export?format=csv').get_data()
+
+    with client.session_transaction() as sess:
+        sess['user_id'] = create_user('importer', 'importer@example.com', 'secret123')
+    response = client.post('/api/v1/tasks/import',
+                           data={'file': (io.BytesIO(exported), 'export.csv')},
+                           content_type='multipart/form-data')
+    assert response.get_json() == {'imported': 30, 'failed': 0, 'errors': []}
+    titles = [task['title'] for task in client.get('/api/v1/tasks').get_json()['tasks']]
+    assert sorted(titles) == sorted(f'Task {i}' for i in range(30))
+
+
+def test_api_search_ranks_and_highlights(client):
+    """q= searches by word prefix, ranks title matches first and returns escaped highlights"""
+    client.post('/api/v1/tasks', json={'title': 'Call <bank>', 'description': 'quarterly fees'})
+    client.post('/api/v1/tasks', json={'title': 'Quarterly report', 'description': 'numbers'})
+    client.post('/api/v1/tasks', json={'title': 'Unrelated'})
+
+    body = client.get('/api/v1/tasks?q=quart').get_json()
+    assert [task['title'] for task in body['tasks']] == ['Quarterly report', 'Call <bank>']
+    assert body['tasks'][0]['highlights']['title'] == '<mark>Quarterly</mark> report'
+    assert body['tasks'][1]['highlights'] == {'title': 'Call &lt;bank&gt;',
+                                              'description': '<mark>quarterly</mark> fees'}
+
+    body = client.get('/api/v1/tasks?q=quart&sort=created_asc').get_json()
+    assert [task['title'] for task in body['tasks']] == ['Call <bank>', 'Quarterly report']
+
+    assert 'highlights' not in client.get('/api/v1/tasks').get_json()['tasks'][0]
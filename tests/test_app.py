@@ -13,17 +13,12 @@ def client():
     """Create test client with fresh database"""
     app.config['TESTING'] = True
     import os
-    import time
     
     import sqlite3
     # Initialize database with schema
     test_db = 'test_tasks.db'
-    if os.path.exists(test_db):
-        try:
-            os.remove(test_db)
-        except:
-            time.sleep(0.1)
-            os.remove(test_db)
+    from database import remove_sqlite_database
+    remove_sqlite_database(test_db)
     
     # Override database path for testing
     from config import Config
@@ -70,6 +65,10 @@ def client():
     cursor.execute("INSERT INTO tasks (title, completed, priority, category, status, user_id) VALUES ('Test Task', 0, 'High', 'Work', 'todo', ?)", (user_id,))
     conn.commit()
     conn.close()
+
+    # Bring the hand-built schema up to the latest migration (task_versions etc.)
+    from migrations import apply_migrations
+    apply_migrations()
     
     with app.test_client() as client:
         # Set user_id in session for testing
@@ -79,11 +78,7 @@ def client():
     
     # Cleanup
     Config.SQLITE_DATABASE = original_db
-    if os.path.exists(test_db):
-        try:
-            os.remove(test_db)
-        except:
-            pass
+    remove_sqlite_database(test_db)
 
 def test_home_page_loads(client):
     """Test that homepage loads (landing page)"""
@@ -467,6 +462,42 @@ def test_task_filtering_by_category(client):
     assert b'Work Task' in response.data
 
 
+def test_login_rehashes_outdated_password_hash(client, monkeypatch):
+    """A successful login replaces a hash made with old parameters"""
+    import database
+    from config import Config
+
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+    user_id = database.create_user('rehash', 'rehash@example.com', 'testpass123')
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:2000')
+
+    with client.session_transaction() as sess:
+        sess.clear()
+    client.post('/login', data={'username': 'rehash', 'password': 'testpass123'})
+    with client.session_transaction() as sess:
+        assert sess['user_id'] == user_id
+    assert database.get_user_by_login('rehash')['password_hash'].startswith('pbkdf2:sha256:2000$')
+
+
+def test_login_returns_429_when_hashing_is_saturated(client, monkeypatch):
+    """Logins get backpressure instead of queueing behind the hashing pool"""
+    import hashing
+    from database import create_user
+
+    create_user('busyuser', 'busy@example.com', 'testpass123')
+
+    def busy(*args):
+        raise hashing.HashingBusy("saturated")
+
+    monkeypatch.setattr(hashing, 'verify_password', busy)
+    with client.session_transaction() as sess:
+        sess.clear()
+    response = client.post('/login', data={'username': 'busyuser', 'password': 'testpass123'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert b'Too many sign-in attempts' in response.data
+
+
 def test_login_invalid_password(client):
     """Test login fails with wrong password"""
     # Create a user
@@ -843,3 +874,244 @@ def test_task_filtering_by_priority(client):
     response = client.get('/tasks?priority=High')
     assert response.status_code == 200
     assert b'High Priority' in response.data
+
+
+def test_home_paginates_with_cursor(client):
+    """Board shows one page at a time and links to the next page"""
+    from config import Config
+    import sqlite3
+
+    conn = sqlite3.connect(Config.SQLITE_DATABASE)
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM users LIMIT 1")
+    user_id = cur.fetchone()[0]
+    cur.execute("INSERT INTO tasks (title, user_id, created_at) VALUES (?, ?, ?)",
+                ("Older Page Task", user_id, "2000-01-01 00:00:00"))
+    conn.commit()
+    conn.close()
+
+    response = client.get('/tasks?sort=created_desc&limit=1')
+    assert response.status_code == 200
+    assert b'Test Task' in response.data
+    assert b'Older Page Task' not in response.data
+
+    match = re.search(rb'href="([^"]*after=[^"]*)"', response.data)
+    assert match is not None
+    next_url = match.group(1).decode().replace('&amp;', '&')
+
+    response = client.get(next_url)
+    assert b'Older Page Task' in response.data
+    assert b'Test Task' not in response.data
+
+
+def test_stats_endpoint(client):
+    """Stats endpoint returns the dashboard counters as JSON"""
+    from config import Config
+    import sqlite3
+
+    conn = sqlite3.connect(Config.SQLITE_DATABASE)
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM users LIMIT 1")
+    user_id = cur.fetchone()[0]
+    past = (datetime.now() - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M")
+    cur.execute("INSERT INTO tasks (title, user_id, due_date, status) VALUES (?, ?, ?, ?)",
+                ("Overdue Stat", user_id, past, "todo"))
+    conn.commit()
+    conn.close()
+
+    response = client.get('/tasks/stats')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['overdue'] == 1
+    assert data['total'] == 2
+
+
+def test_cached_board_stays_coherent_after_writes(client):
+    """Writes through the app and from other workers both show up on the next view"""
+    import database
+    import task_service
+
+    response = client.get('/tasks')
+    assert b'Test Task' in response.data
+
+    client.post('/task/add', data={'title': 'Cached Add', 'priority': 'Low'})
+    response = client.get('/tasks')
+    assert b'Cached Add' in response.data
+    assert task_service.snapshot_cache.stats()['hits'] >= 1
+
+    with client.session_transaction() as sess:
+        user_id = sess['user_id']
+    task = next(t for t in database.fetch_user_tasks(user_id) if t['title'] == 'Cached Add')
+    client.post(f'/task/{task["id"]}/delete')
+    response = client.get('/tasks')
+    assert b'Cached Add' not in response.data
+
+    # A write that bypasses this worker's cache bumps the version and forces a reload
+    database.create_task(user_id, 'Other Worker Task')
+    response = client.get('/tasks')
+    assert b'Other Worker Task' in response.data
+
+
+def test_column_limit_and_show_more(client):
+    """Columns render at most TASKS_COLUMN_LIMIT cards and link to the rest"""
+    from config import Config
+    import sqlite3
+
+    conn = sqlite3.connect(Config.SQLITE_DATABASE)
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM users LIMIT 1")
+    user_id = cur.fetchone()[0]
+    for i in range(3):
+        cur.execute("INSERT INTO tasks (title, user_id, status) VALUES (?, ?, ?)", (f"Column Task {i}", user_id, "todo"))
+    conn.commit()
+    conn.close()
+
+    original_limit = app.config['TASKS_COLUMN_LIMIT']
+    app.config['TASKS_COLUMN_LIMIT'] = 2
+    try:
+        response = client.get('/tasks')
+        assert response.data.count(b'class="task-card ') == 2
+        assert b'id="count-todo">4<' in response.data
+        assert b'Show 2 more' in response.data
+
+        response = client.get('/tasks?expand=todo')
+        assert response.data.count(b'class="task-card ') == 4
+        assert b'more</a>' not in response.data
+    finally:
+        app.config['TASKS_COLUMN_LIMIT'] = original_limit
+
+
+def test_task_cards_render_from_fragment_cache(client):
+    """Unchanged cards are reused; an edit bumps the revision and re-renders"""
+    from app import card_cache
+
+    client.get('/tasks')
+    before = card_cache.stats()
+    response = client.get('/tasks')
+    assert card_cache.stats()['hits'] > before['hits']
+    assert b'Test Task' in response.data
+
+    with client.session_transaction() as sess:
+        user_id = sess['user_id']
+    import database
+    task = database.fetch_user_tasks(user_id)[0]
+    client.post(f'/task/{task["id"]}/edit', data={
+        'title': 'Renamed Task', 'priority': 'High', 'category': 'Work', 'status': 'todo'
+    })
+    assert database.get_task(user_id, task['id'])['revision'] == task['revision'] + 1
+
+    response = client.get('/tasks')
+    assert b'Renamed Task' in response.data
+    assert b'Test Task' not in response.data
+
+
+def test_home_search_highlights_matches(client):
+    """Search results are highlighted (and escaped) without touching the card cache"""
+    client.post('/task/add', data={'title': 'Renew <passport>', 'description': 'passport office'})
+
+    response = client.get('/tasks?q=pass')
+    assert response.data.count(b'class="task-card ') == 1
+    assert b'Renew &lt;<mark>passport</mark>&gt;' in response.data
+    assert b'<mark>passport</mark> office' in response.data
+
+    response = client.get('/tasks')
+    assert b'<mark>' not in response.data
+    assert b'Renew &lt;passport&gt;' in response.data
+
+
+def test_export_csv_and_ndjson(client):
+    """Exports stream every task with normalized fields"""
+    import csv
+    import io
+    import json
+
+    client.post('/task/add', data={'title': 'Export, with comma', 'due_date': '2030-01-02T09:30'})
+
+    response = client.get('/export?format=csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'attachment' in response.headers['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row['title'] for row in rows] == ['Test Task', 'Export, with comma']
+    assert rows[1]['due_date'] == '2030-01-02T09:30:00'
+    assert rows[0]['status'] == 'todo'
+
+    response = client.get('/export?format=ndjson')
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r['title'] for r in records] == ['Test Task', 'Export, with comma']
+    assert records[0]['completed'] is False
+
+    assert client.get('/export?format=xml').status_code == 400
+
+
+def test_concurrent_requests_share_worker_state(client):
+    """Many threads in one process (gunicorn gthread) keep the board consistent"""
+    import threading
+    from database import db_connection
+
+    with client.session_transaction() as sess:
+        user_id = sess['user_id']
+    with db_connection() as conn:
+        shared_id = conn.execute("SELECT id FROM tasks WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    threads_count, rounds = 8, 10
+    failures = []
+    start = threading.Barrier(threads_count)
+
+    def browse(n):
+        with app.test_client() as worker:
+            with worker.session_transaction() as sess:
+                sess['user_id'] = user_id
+            start.wait()
+            for i in range(rounds):
+                responses = [
+                    worker.post('/task/add', data={'title': f'T{n}-{i}', 'priority': 'Low', 'category': 'Work'}),
+                    worker.post(f'/task/{shared_id}/toggle'),
+                    worker.get('/home'),
+                ]
+                failures.extend(r.status_code for r in responses if r.status_code >= 400)
+                with worker.session_transaction() as sess:
+                    flashes = sess.pop('_flashes', [])
+                failures.extend(message for category, message in flashes if category == 'error')
+
+    threads = [threading.Thread(target=browse, args=(n,)) for n in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    with db_connection() as conn:
+        added = conn.execute("SELECT COUNT(*) FROM tasks WHERE user_id = ? AND title LIKE 'T%-%'", (user_id,)).fetchone()[0]
+        status = conn.execute("SELECT status FROM tasks WHERE id = ?", (shared_id,)).fetchone()[0]
+    assert added == threads_count * rounds
+    # An even number of toggles leaves the shared task where it started
+    assert status == 'todo'
+    # The board this worker serves next includes every thread's last task
+    board = client.get('/home').data
+    assert all(f'T{n}-{rounds - 1}'.encode() in board for n in range(threads_count))
+
+
+def test_request_borrows_one_db_connection(client, monkeypatch):
+    """Every database helper used by a request shares one pooled connection"""
+    import db_pool
+    import task_service
+    from app import card_cache
+
+    checkouts = []
+    monkeypatch.setattr(db_pool, '_listeners', [lambda result, wait: checkouts.append(result)])
+    task_service.snapshot_cache.clear()
+    card_cache.clear()
+
+    assert client.get('/home').status_code == 200
+    assert client.post('/task/add', data={'title': 'Shared', 'priority': 'Low', 'category': 'Work'}).status_code == 302
+    assert len(checkouts) == 2
+
+    with client.session_transaction() as sess:
+        sess.clear()
+    checkouts.clear()
+    # Login lookup, duplicate check and insert in one signup
+    client.post('/signup', data={'username': 'pooled', 'email': 'pooled@example.com',
+                                 'password': 'password123', 'confirm_password': 'password123'})
+    assert len(checkouts) == 1
+
@@ -5,7 +5,7 @@ import sqlite3
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database import get_db_connection, get_sqlite_connection, init_database
+from database import get_db_connection, get_sqlite_connection, init_database, remove_sqlite_database
 from config import Config
 
 
@@ -13,8 +13,7 @@ from config import Config
 def cleanup_test_db():
     """Clean up test database before and after tests"""
     test_db = 'test_tasks.db'
-    if os.path.exists(test_db):
-        os.remove(test_db)
+    remove_sqlite_database(test_db)
     
     # Temporarily change database path
     original_db = Config.SQLITE_DATABASE
@@ -23,8 +22,7 @@ def cleanup_test_db():
     yield test_db
     
     # Cleanup
-    if os.path.exists(test_db):
-        os.remove(test_db)
+    remove_sqlite_database(test_db)
     Config.SQLITE_DATABASE = original_db
 
 
@@ -112,8 +110,7 @@ def test_database_insert_and_query(cleanup_test_db):
 def test_database_connection_context():
     """Test database connections can be properly closed"""
     test_db = 'test_temp.db'
-    if os.path.exists(test_db):
-        os.remove(test_db)
+    remove_sqlite_database(test_db)
     
     Config.SQLITE_DATABASE = test_db
     
@@ -126,8 +123,7 @@ def test_database_connection_context():
     assert conn2 is not None
     conn2.close()
     
-    if os.path.exists(test_db):
-        os.remove(test_db)
+    remove_sqlite_database(test_db)
     Config.SQLITE_DATABASE = 'tasks.db'
 
 
@@ -164,3 +160,510 @@ def test_config_db_type():
     """Test Config DB_TYPE configuration"""
     config = Config()
     assert config.DB_TYPE in ['sqlite', 'azure_sql']
+
+
+def test_sqlite_connections_use_tuning_profile(cleanup_test_db, monkeypatch):
+    """WAL, synchronous, mmap, cache, busy timeout and foreign keys come from Config"""
+    conn = get_sqlite_connection()
+    settings = {pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                for pragma in ('journal_mode', 'synchronous', 'cache_size', 'busy_timeout', 'foreign_keys')}
+    conn.close()
+    assert settings == {
+        'journal_mode': 'wal',
+        'synchronous': 1,  # NORMAL
+        'cache_size': Config.SQLITE_CACHE_SIZE,
+        'busy_timeout': int(Config.SQLITE_BUSY_TIMEOUT * 1000),
+        'foreign_keys': 0,
+    }
+
+    monkeypatch.setattr(Config, 'SQLITE_JOURNAL_MODE', 'wal; DROP TABLE tasks')
+    with pytest.raises(ValueError):
+        get_sqlite_connection()
+
+
+def test_sqlite_maintenance_runs_once_per_interval(cleanup_test_db, monkeypatch):
+    """Checkpoint + optimize run when the interval has passed, then wait for the next one"""
+    import database
+    from database import db_connection, maybe_run_sqlite_maintenance
+
+    init_database()
+    monkeypatch.setattr(Config, 'SQLITE_MAINTENANCE_INTERVAL', 60)
+    monkeypatch.setattr(database, '_last_maintenance', 0.0)
+    with db_connection() as conn:
+        assert maybe_run_sqlite_maintenance(conn) is True
+        assert maybe_run_sqlite_maintenance(conn) is False
+
+        monkeypatch.setattr(Config, 'SQLITE_MAINTENANCE_INTERVAL', 0)
+        monkeypatch.setattr(database, '_last_maintenance', 0.0)
+        assert maybe_run_sqlite_maintenance(conn) is False
+
+
+def test_db_connection_is_pooled(cleanup_test_db):
+    """db_connection() hands back the same connection to sequential callers"""
+    from database import db_connection
+
+    with db_connection() as first:
+        first.execute("SELECT 1")
+    with db_connection() as second:
+        second.execute("SELECT 1")
+
+    assert first is second
+
+
+def test_db_connection_pool_follows_replaced_file(cleanup_test_db):
+    """Deleting and recreating the SQLite file gives a fresh pool"""
+    from database import db_connection
+
+    init_database()
+    with db_connection() as conn:
+        conn.execute("INSERT INTO tasks (title, user_id) VALUES ('Old', 1)")
+        conn.commit()
+
+    # The pool is left open on purpose; the WAL files go with the database
+    for suffix in ('', '-wal', '-shm'):
+        os.remove(cleanup_test_db + suffix)
+    init_database()
+
+    with db_connection() as conn:
+        count = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    assert count == 0
+
+
+def _insert_tasks(rows):
+    from database import db_connection
+    with db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, description, priority, category, status, due_date, created_at, user_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+
+
+def test_query_tasks_filters_in_sql(cleanup_test_db):
+    """Search, category and status filters are applied by the query"""
+    from datetime import datetime
+    from database import query_tasks
+
+    init_database()
+    _insert_tasks([
+        ("Buy milk", "from the shop", "Low", "Shopping", "todo", None, "2024-01-01 10:00:00", 1),
+        ("Write report", "quarterly numbers", "High", "Work", "done", None, "2024-01-02 10:00:00", 1),
+        ("Late invoice", "", "Medium", "Work", "todo", "2024-01-03T09:00", "2024-01-03 10:00:00", 1),
+        ("Other user", "milk", "Low", "Shopping", "todo", None, "2024-01-04 10:00:00", 2),
+        ("Call dentist", "", "Low", "Health", "todo", "2024-01-05T18:00", "2024-01-04 10:00:00", 1),
+    ])
+    now = datetime(2024, 1, 5, 12, 0)
+
+    rows, _ = query_tasks(1, search='MILK', now=now)
+    assert [r['title'] for r in rows] == ["Buy milk"]
+
+    rows, _ = query_tasks(1, category='work', status_filter='pending', now=now)
+    assert [r['title'] for r in rows] == ["Late invoice"]
+
+    rows, _ = query_tasks(1, status_filter='overdue', now=now)
+    assert [r['title'] for r in rows] == ["Late invoice"]
+
+    rows, _ = query_tasks(1, status_filter='completed', now=now)
+    assert [r['title'] for r in rows] == ["Write report"]
+
+    rows, _ = query_tasks(1, status_filter='today', now=now)
+    assert [r['title'] for r in rows] == ["Call dentist"]
+
+
+def test_query_tasks_keyset_pagination(cleanup_test_db):
+    """Walking the cursor visits every task exactly once in sort order"""
+    from database import query_tasks, decode_task_cursor
+
+    init_database()
+    priorities = ['High', 'Medium', 'Low']
+    _insert_tasks([
+        (f"Task {i}", "", priorities[i % 3], "General", "todo", None, f"2024-01-01 10:00:{i % 4:02d}", 1)
+        for i in range(10)
+    ])
+
+    for sort in ('priority_desc', 'priority_asc', 'created_desc', 'created_asc'):
+        seen = []
+        after = None
+        while True:
+            rows, next_cursor = query_tasks(1, sort=sort, after=after, limit=3)
+            seen.extend(row['id'] for row in rows)
+            if not next_cursor:
+                break
+            after = decode_task_cursor(next_cursor, sort)
+
+        full, _ = query_tasks(1, sort=sort, limit=100)
+        assert seen == [row['id'] for row in full]
+        assert len(seen) == 10
+
+
+def test_search_uses_full_text_index(cleanup_test_db):
+    """Searches match word prefixes through tasks_fts, rank title hits first and follow edits"""
+    from database import query_tasks, decode_task_cursor, search_backend, build_task_query, explain_query, db_connection
+
+    init_database()
+    assert search_backend() == 'fts5'
+    _insert_tasks([
+        ("Quarterly report", "numbers for finance", "High", "Work", "todo", None, "2024-01-01 10:00:00", 1),
+        ("Call bank", "about the quarterly reporting fees", "Low", "Finance", "todo", None, "2024-01-02 10:00:00", 1),
+        ("Support ticket", "export broken", "Medium", "Work", "todo", None, "2024-01-03 10:00:00", 1),
+        ("Quarterly report", "someone else's", "Low", "Work", "todo", None, "2024-01-04 10:00:00", 2),
+    ])
+
+    rows, _ = query_tasks(1, search='quarter rep', sort='relevance')
+    assert [r['title'] for r in rows] == ["Quarterly report", "Call bank"]
+    assert rows[0]['search_rank'] < rows[1]['search_rank']
+
+    # Prefix matching is per word, not substring
+    rows, _ = query_tasks(1, search='port')
+    assert rows == []
+
+    rows, next_cursor = query_tasks(1, search='quarterly', sort='relevance', limit=1)
+    rest, _ = query_tasks(1, search='quarterly', sort='relevance',
+                          after=decode_task_cursor(next_cursor, 'relevance'), limit=5)
+    assert [r['title'] for r in rows + rest] == ["Quarterly report", "Call bank"]
+
+    with db_connection() as conn:
+        conn.execute("UPDATE tasks SET title = 'Annual summary' WHERE title = 'Quarterly report' AND user_id = 1")
+        conn.execute("DELETE FROM tasks WHERE title = 'Call bank'")
+        conn.commit()
+    assert query_tasks(1, search='quarterly')[0] == []
+    assert [r['title'] for r in query_tasks(1, search='annual')[0]] == ["Annual summary"]
+
+    sql, params = build_task_query(1, search='quarterly', sort='relevance', limit=10)
+    assert 'tasks_fts' in ' '.join(explain_query(sql, params))
+
+
+def test_search_falls_back_to_like_without_index(cleanup_test_db, monkeypatch):
+    """Without a full-text index every word must appear somewhere in the task"""
+    import database
+    from database import query_tasks
+
+    init_database()
+    monkeypatch.setattr(database, 'search_backend', lambda: 'like')
+    _insert_tasks([
+        ("Quarterly report", "numbers", "High", "Work", "todo", None, "2024-01-01 10:00:00", 1),
+        ("Call bank", "quarterly fees", "Low", "Finance", "todo", None, "2024-01-02 10:00:00", 1),
+    ])
+
+    rows, _ = query_tasks(1, search='QUARTER numb', sort='relevance')
+    assert [r['title'] for r in rows] == ["Quarterly report"]
+    rows, _ = query_tasks(1, search='quarterly', sort='relevance')
+    assert len(rows) == 2
+
+
+def test_login_lookups_use_one_query_and_cache(cleanup_test_db, monkeypatch):
+    """Usernames win over emails, and cached identifiers skip the users table"""
+    import database
+    from database import create_user, get_user_by_login, lookup_logins, verify_user
+
+    init_database()
+    led = create_user('led', 'led@example.com', 'secret123')
+    other = create_user('led@example.com.au', 'other@example.com', 'secret123')
+
+    assert get_user_by_login('led@example.com')['id'] == led
+    assert get_user_by_login('led@example.com.au')['id'] == other
+    assert verify_user('led@example.com', 'secret123')['id'] == led
+    assert verify_user('led', 'wrong') is None
+
+    assert lookup_logins('led', 'nobody@example.com') == {
+        'led': {'id': led, 'username': 'led', 'email': 'led@example.com'},
+        'nobody@example.com': None,
+    }
+
+    def no_queries(identifiers):
+        raise AssertionError(f"unexpected users query for {identifiers}")
+
+    monkeypatch.setattr(database, '_fetch_login_rows', no_queries)
+    assert lookup_logins('led')['led']['id'] == led
+    monkeypatch.undo()
+
+    create_user('nobody', 'nobody@example.com', 'secret123')
+    assert verify_user('nobody@example.com', 'secret123')['username'] == 'nobody'
+
+
+def test_login_after_signup_on_another_worker(cleanup_test_db, monkeypatch):
+    """A worker that cached a failed login still lets the account in once another worker created it"""
+    import database
+    from database import create_user, verify_user
+    from user_cache import UserCache
+
+    init_database()
+    worker_a, worker_b = UserCache(), UserCache()
+
+    monkeypatch.setattr(database, 'user_cache', worker_b)
+    assert verify_user('newbie', 'secret123') is None
+
+    monkeypatch.setattr(database, 'user_cache', worker_a)
+    create_user('newbie', 'newbie@example.com', 'secret123')
+
+    # Worker B never saw the signup's invalidation
+    monkeypatch.setattr(database, 'user_cache', worker_b)
+    assert verify_user('newbie', 'secret123')['username'] == 'newbie'
+
+
+def test_signup_check_sees_account_created_on_another_worker(cleanup_test_db, monkeypatch):
+    """A signup check on one worker does not leave a "no such account" that hides another worker's signup"""
+    import database
+    from database import create_user, lookup_logins
+    from user_cache import UserCache
+
+    init_database()
+    worker_a, worker_b = UserCache(), UserCache()
+
+    monkeypatch.setattr(database, 'user_cache', worker_b)
+    assert lookup_logins('newbie', 'newbie@example.com') == {'newbie': None, 'newbie@example.com': None}
+
+    monkeypatch.setattr(database, 'user_cache', worker_a)
+    user_id = create_user('newbie', 'newbie@example.com', 'secret123')
+
+    monkeypatch.setattr(database, 'user_cache', worker_b)
+    existing = lookup_logins('newbie', 'newbie@example.com')
+    assert existing['newbie']['id'] == user_id
+    assert existing['newbie@example.com']['id'] == user_id
+
+
+def test_task_schema_is_inspected_once(cleanup_test_db, monkeypatch):
+    """Queries reuse the cached capability map instead of probing the table"""
+    import database
+    from database import query_tasks, toggle_task, forget_task_schema
+
+    init_database()
+    forget_task_schema()
+    calls = []
+    inspect = database._inspect_task_schema
+    monkeypatch.setattr(database, '_inspect_task_schema', lambda: calls.append(1) or inspect())
+    _insert_tasks([("Pay rent", None, "High", "Finance", "todo", None, "2024-01-01 10:00:00", 1)])
+
+    rows, _ = query_tasks(1)
+    task, _ = toggle_task(1, rows[0]['id'])
+    query_tasks(1, search='rent', status_filter='completed')
+    assert task['status'] == 'done'
+    assert len(calls) == 1
+
+
+def test_toggle_task_keeps_completed_in_sync(cleanup_test_db):
+    """status is canonical and the legacy completed flag follows it"""
+    from database import db_connection, toggle_task
+
+    init_database()
+    _insert_tasks([("Pay rent", None, "High", "Finance", "todo", None, "2024-01-01 10:00:00", 1)])
+    with db_connection() as conn:
+        task_id = conn.execute("SELECT id FROM tasks").fetchone()[0]
+
+    assert toggle_task(2, task_id) == (None, None)
+    for expected in (('done', 1), ('todo', 0)):
+        toggle_task(1, task_id)
+        with db_connection() as conn:
+            assert tuple(conn.execute("SELECT status, completed FROM tasks").fetchone()) == expected
+
+
+@pytest.mark.parametrize('returning', [True, False])
+def test_toggle_task_is_atomic_under_concurrent_clicks(cleanup_test_db, monkeypatch, returning):
+    """Every toggle from many threads lands exactly once, in order"""
+    import threading
+    import database
+    from database import db_connection, toggle_task
+
+    monkeypatch.setattr(database, 'SQLITE_HAS_RETURNING', returning and database.SQLITE_HAS_RETURNING)
+    init_database()
+    _insert_tasks([("Pay rent", "x" * 10000, "High", "Finance", "todo", None, "2024-01-01 10:00:00", 1)])
+    with db_connection() as conn:
+        task_id = conn.execute("SELECT id FROM tasks").fetchone()[0]
+
+    threads_count, clicks = 8, 25
+    results, errors = [], []
+    start = threading.Barrier(threads_count)
+
+    def click():
+        start.wait()
+        try:
+            for _ in range(clicks):
+                results.append(toggle_task(1, task_id))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=click) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    total = threads_count * clicks
+    # Each toggle saw the previous one's result: revisions and versions are gap-free
+    assert sorted(task['revision'] for task, _ in results) == list(range(2, total + 2))
+    assert sorted(version for _, version in results) == list(range(1, total + 1))
+    for task, _ in results:
+        assert task['status'] == ('done' if task['revision'] % 2 == 0 else 'todo')
+    with db_connection() as conn:
+        assert tuple(conn.execute("SELECT status, completed FROM tasks").fetchone()) == ('todo', 0)
+    assert toggle_task(2, task_id) == (None, None)
+
+
+def test_toggle_task_on_legacy_table_without_status(cleanup_test_db):
+    """Older tables that only track completed are read and toggled through it"""
+    from database import db_connection, forget_task_schema, query_tasks, toggle_task
+
+    init_database()
+    with db_connection() as conn:
+        conn.execute("DROP INDEX idx_tasks_user_status")
+        conn.execute("DROP INDEX idx_tasks_user_open")
+        conn.execute("ALTER TABLE tasks DROP COLUMN status")
+        conn.execute("INSERT INTO tasks (title, completed, user_id) VALUES ('Pay rent', 0, 1)")
+        conn.commit()
+    forget_task_schema()
+
+    rows, _ = query_tasks(1, status_filter='pending')
+    assert [r['completed'] for r in rows] == [0]
+    task, _ = toggle_task(1, rows[0]['id'])
+    assert task['completed'] == 1
+    assert query_tasks(1, status_filter='pending')[0] == []
+
+
+def test_task_schema_without_user_id_is_rejected(cleanup_test_db):
+    """A tasks table that cannot be scoped per user is never queried unscoped"""
+    from database import db_connection, forget_task_schema, query_tasks, SchemaError
+
+    with db_connection() as conn:
+        conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, status TEXT)")
+        conn.commit()
+    forget_task_schema()
+
+    with pytest.raises(SchemaError):
+        query_tasks(1)
+
+
+def test_request_connection_is_shared_and_cleaned_up(cleanup_test_db):
+    """Within an app context helpers share a connection; failed work never leaks into later commits"""
+    from flask import g
+    from app import app
+    from database import db_connection, release_request_connection
+
+    init_database()
+    insert = "INSERT INTO tasks (title, status, user_id) VALUES (?, 'todo', 1)"
+    with app.app_context():
+        with db_connection() as outer:
+            outer.execute(insert, ('kept',))
+            # A nested helper reuses the connection without ending the outer transaction
+            with db_connection() as inner:
+                assert inner is outer
+                inner.execute("SELECT COUNT(*) FROM tasks").fetchone()
+            outer.commit()
+
+        with pytest.raises(RuntimeError):
+            with db_connection() as conn:
+                conn.execute(insert, ('failed',))
+                raise RuntimeError("helper failed")
+        with db_connection() as conn:
+            conn.execute(insert, ('later',))
+            conn.commit()
+        assert g.db_connections_opened == 1
+        assert release_request_connection() == 1
+
+    with db_connection() as conn:
+        titles = [row[0] for row in conn.execute("SELECT title FROM tasks ORDER BY id")]
+    assert titles == ['kept', 'later']
+
+
+def test_decode_task_cursor_rejects_mismatched_sort():
+    """A created_at cursor cannot be used with a priority sort"""
+    from database import decode_task_cursor
+
+    with pytest.raises(ValueError):
+        decode_task_cursor("2024-01-01 10:00:00,5", 'priority_desc')
+
+
+def test_keyset_cursor_bounds_the_leading_sort_key(cleanup_test_db):
+    """Later pages seek to the cursor in the index instead of walking the user's rows from the top"""
+    from datetime import datetime
+    from database import build_task_query, explain_query
+
+    init_database()
+    cursors = {
+        'priority_desc': ([2, datetime(2024, 1, 1, 10, 0), 500], '(priority_rank,created_at)<(?,?)'),
+        'created_desc': ([datetime(2024, 1, 1, 10, 0), 500], 'created_at<?'),
+        'created_asc': ([datetime(2024, 1, 1, 10, 0), 500], 'created_at>?'),
+        # Mixed directions cannot use a row value; the leading bound still narrows the range
+        'priority_asc': ([2, datetime(2024, 1, 1, 10, 0), 500], 'priority_rank>?'),
+    }
+    for sort, (after, bound) in cursors.items():
+        sql, params = build_task_query(1, sort=sort, after=after, limit=10)
+        plan = ' '.join(explain_query(sql, params))
+        assert bound in plan, (sort, plan)
+        assert 'TEMP B-TREE' not in plan, (sort, plan)
+
+
+def test_keyset_cursor_on_azure_sql_has_a_leading_bound(monkeypatch):
+    """T-SQL has no row-value comparison, so the OR chain is preceded by a sargable k1 <= v1"""
+    from datetime import datetime
+    import database
+
+    monkeypatch.setattr(Config, 'DB_TYPE', 'azure_sql')
+    monkeypatch.setattr(database, 'task_schema', lambda: {
+        'columns': frozenset(database.TASK_LIST_COLUMNS + ['user_id', 'priority_rank']),
+        'has_status': True, 'has_completed': False, 'has_user_id': True, 'search': 'fulltext',
+    })
+    after = [3, datetime(2024, 1, 1, 10, 0), 500]
+
+    sql, params = database.build_task_query(1, sort='priority_desc', after=after, limit=10)
+
+    assert ("WHERE user_id = ? AND priority_rank <= ? AND ((priority_rank < ?) OR "
+            "(priority_rank = ? AND created_at < ?) OR "
+            "(priority_rank = ? AND created_at = ? AND id < ?))") in sql
+    assert "ORDER BY priority_rank DESC, created_at DESC, id DESC" in sql
+    assert params[:3] == (1, 3, 3)
+
+
+def test_task_indexes_exist_and_are_used(cleanup_test_db):
+    """Per-user indexes are created and picked up by the board queries"""
+    from database import TASK_STATUS_FILTERS, build_task_query, explain_query
+
+    init_database()
+    conn = get_sqlite_connection()
+    indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert {'idx_tasks_user_created', 'idx_tasks_user_status', 'idx_tasks_user_priority',
+            'idx_tasks_user_due_day', 'idx_tasks_user_open'} <= indexes
+
+    sql, params = build_task_query(1, sort='created_desc', limit=10)
+    plan = ' '.join(explain_query(sql, params))
+    assert 'idx_tasks_user' in plan
+    assert 'SCAN tasks' not in plan
+
+    # The default board sort, with each filter, reads an index in order instead of sorting
+    for status_filter in TASK_STATUS_FILTERS:
+        sql, params = build_task_query(1, status_filter=status_filter, limit=10)
+        plan = ' '.join(explain_query(sql, params))
+        assert 'idx_tasks_user' in plan, (status_filter, plan)
+        assert 'SCAN tasks' not in plan, (status_filter, plan)
+        assert 'USE TEMP B-TREE' not in plan, (status_filter, plan)
+
+
+def test_get_task_stats_single_query(cleanup_test_db):
+    """Dashboard counters are aggregated by the database"""
+    from datetime import datetime
+    from database import get_task_stats
+
+    init_database()
+    _insert_tasks([
+        ("Overdue", "", "Medium", "Work", "todo", "2024-01-04T09:00", "2024-01-01 10:00:00", 1),
+        ("Overdue but done", "", "Medium", "Work", "done", "2024-01-04T09:00", "2024-01-01 10:00:00", 1),
+        ("Later today", "", "Medium", "Work", "in_progress", "2024-01-05 18:00:00", "2024-01-01 10:00:00", 1),
+        ("In three days", "", "Medium", "Work", "todo", "2024-01-08T12:00", "2024-01-01 10:00:00", 1),
+        ("Next month", "", "Medium", "Work", "todo", "2024-02-05T12:00", "2024-01-01 10:00:00", 1),
+        ("No due date", "", "Medium", "Work", "in_review", None, "2024-01-01 10:00:00", 1),
+        ("Someone else's", "", "Medium", "Work", "todo", "2024-01-04T09:00", "2024-01-01 10:00:00", 2),
+    ])
+
+    stats = get_task_stats(1, datetime(2024, 1, 5, 12, 0))
+    assert stats == {'overdue': 1, 'due_today': 1, 'due_week': 2, 'total': 5}
+
+
+def test_get_task_stats_empty_board(cleanup_test_db):
+    """A user without tasks gets zero counters"""
+    from datetime import datetime
+    from database import get_task_stats
+
+    init_database()
+    assert get_task_stats(42, datetime(2024, 1, 5)) == {'overdue': 0, 'due_today': 0, 'due_week': 0, 'total': 0}
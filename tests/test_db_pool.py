@@ -0,0 +1,91 @@
+import pytest
+import sys
+import os
+import sqlite3
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db_pool import ConnectionPool, PoolTimeout
+
+
+def make_pool(**kwargs):
+    return ConnectionPool(lambda: sqlite3.connect(':memory:', check_same_thread=False), **kwargs)
+
+
+def test_pool_reuses_released_connection():
+    """Released connections are handed out again instead of reconnecting"""
+    pool = make_pool(max_size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    stats = pool.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    pool.close()
+
+
+def test_pool_context_manager_returns_connection():
+    """Connections borrowed with a with-block go back to the pool"""
+    pool = make_pool(max_size=1)
+    with pool.connection() as conn:
+        conn.execute("SELECT 1")
+        assert pool.stats()['in_use'] == 1
+
+    assert pool.stats()['in_use'] == 0
+    assert pool.stats()['idle'] == 1
+    pool.close()
+
+
+def test_pool_times_out_when_exhausted():
+    """Checkout fails with PoolTimeout once max_size connections are in use"""
+    pool = make_pool(max_size=1, checkout_timeout=0.05)
+    conn = pool.acquire()
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    pool.release(conn)
+    assert pool.stats()['timeouts'] == 1
+    pool.close()
+
+
+def test_pool_discards_dead_connections():
+    """A connection failing the liveness check is replaced on checkout"""
+    pool = make_pool(max_size=1, ping_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    replacement.execute("SELECT 1")
+    pool.release(replacement)
+    pool.close()
+
+
+def test_pool_reaps_idle_connections_above_min_size():
+    """Idle connections past the timeout are closed down to min_size"""
+    pool = make_pool(min_size=1, max_size=3, idle_timeout=0)
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+    assert pool.size == 3
+
+    pool.release(pool.acquire())
+    assert pool.size == 1
+    pool.close()
+
+
+def test_pool_rolls_back_uncommitted_work():
+    """Uncommitted changes are discarded when the connection is returned"""
+    pool = make_pool(max_size=1)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT)")
+        conn.commit()
+        conn.execute("INSERT INTO items VALUES ('pending')")
+
+    with pool.connection() as conn:
+        count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    assert count == 0
+    pool.close()
@@ -0,0 +1,23 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fragment_cache import FragmentCache
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    """The cache holds at most max_entries and tracks its hit rate"""
+    cache = FragmentCache(max_entries=2)
+    cache.put(('card', 1, 1), '<div>1</div>')
+    cache.put(('card', 2, 1), '<div>2</div>')
+    assert cache.get(('card', 1, 1)) == '<div>1</div>'
+
+    cache.put(('card', 3, 1), '<div>3</div>')
+    assert cache.get(('card', 2, 1)) is None
+    assert cache.get(('card', 3, 1)) == '<div>3</div>'
+
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
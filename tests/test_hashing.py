@@ -0,0 +1,85 @@
+import sys
+import os
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import hashing
+from config import Config
+
+
+@pytest.fixture
+def cheap_hashing(monkeypatch):
+    """Low-cost hashing parameters; the pool is rebuilt for each test"""
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+    monkeypatch.setattr(Config, 'HASH_POOL_WORKERS', 0)
+    monkeypatch.setattr(Config, 'HASH_POOL_MAX_PENDING', 2)
+    hashing.shutdown()
+    yield
+    hashing.shutdown()
+
+
+def test_hash_and_verify_in_process_pool(cheap_hashing, monkeypatch):
+    """Hashes made in the pool verify, and the latency is reported"""
+    monkeypatch.setattr(Config, 'HASH_POOL_WORKERS', 1)
+    events = []
+    hashing.add_listener(lambda *event: events.append(event))
+    try:
+        pwhash = hashing.hash_password('secret123')
+        assert pwhash.startswith('pbkdf2:sha256:1000$')
+        assert hashing.verify_password(pwhash, 'secret123') == (True, None)
+        assert hashing.verify_password(pwhash, 'wrong') == (False, None)
+    finally:
+        hashing._listeners.pop()
+    assert [(operation, outcome) for operation, outcome, _ in events] == [
+        ('hash', 'ok'), ('verify', 'ok'), ('verify', 'ok')
+    ]
+
+
+def test_pool_processes_are_not_forked(cheap_hashing, monkeypatch):
+    """The pool is created from request threads, so it must not fork a threaded worker"""
+    monkeypatch.setattr(Config, 'HASH_POOL_WORKERS', 1)
+    executor, _ = hashing._pool_state()
+    assert executor._mp_context.get_start_method() in ('forkserver', 'spawn')
+    assert hashing.verify_password(hashing.hash_password('secret123'), 'secret123') == (True, None)
+
+
+def test_verify_upgrades_outdated_hashes(cheap_hashing, monkeypatch):
+    """A correct password checked against an old-parameter hash yields a new hash"""
+    old_hash = hashing.hash_password('secret123')
+    assert not hashing.needs_rehash(old_hash)
+
+    monkeypatch.setattr(Config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:2000')
+    assert hashing.needs_rehash(old_hash)
+    valid, new_hash = hashing.verify_password(old_hash, 'secret123')
+    assert valid and new_hash.startswith('pbkdf2:sha256:2000$')
+    assert hashing.verify_password(old_hash, 'wrong') == (False, None)
+
+    assert hashing.canonical_method('scrypt') == 'scrypt:32768:8:1'
+    assert hashing.canonical_method('pbkdf2') == 'pbkdf2:sha256:600000'
+
+
+def test_saturated_pool_rejects_with_hashing_busy(cheap_hashing):
+    """Beyond HASH_POOL_MAX_PENDING concurrent hashes, callers are refused immediately"""
+    started = threading.Barrier(3)
+    release = threading.Event()
+
+    def slow(_):
+        started.wait()
+        release.wait(5)
+        return 'done'
+
+    threads = [threading.Thread(target=hashing._run, args=('hash', slow, None)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    try:
+        with pytest.raises(hashing.HashingBusy):
+            hashing.hash_password('secret123')
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert hashing.hash_password('secret123')
@@ -18,11 +18,8 @@ def client():
     
     # Use separate test database
     test_db = 'test_integration.db'
-    if os.path.exists(test_db):
-        try:
-            os.remove(test_db)
-        except:
-            pass
+    from database import remove_sqlite_database
+    remove_sqlite_database(test_db)
     
     # Override database path for testing
     from config import Config
@@ -67,6 +64,10 @@ def client():
     cursor.execute('DELETE FROM tasks')
     conn.commit()
     conn.close()
+
+    # Bring the hand-built schema up to the latest migration (task_versions etc.)
+    from migrations import apply_migrations
+    apply_migrations()
     
     with app.test_client() as client:
         # Set user_id in session for testing
@@ -76,11 +77,7 @@ def client():
     
     # Cleanup
     Config.SQLITE_DATABASE = original_db
-    if os.path.exists(test_db):
-        try:
-            os.remove(test_db)
-        except:
-            pass
+    remove_sqlite_database(test_db)
 
 def test_complete_task_lifecycle(client):
     """Test creating, toggling, and deleting a task"""
@@ -0,0 +1,37 @@
+import json
+import logging
+import queue
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logging_setup import DroppingQueueHandler, JsonFormatter
+
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord('app', logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """Records beyond the queue size are counted and discarded"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(make_record("record %d", i))
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_json_formatter_includes_message_and_extras():
+    """Records are rendered as one JSON object with extra fields"""
+    line = JsonFormatter().format(make_record("Task %s deleted", 42, task_id=42))
+    payload = json.loads(line)
+
+    assert payload['message'] == 'Task 42 deleted'
+    assert payload['level'] == 'INFO'
+    assert payload['logger'] == 'app'
+    assert payload['task_id'] == 42
@@ -0,0 +1,123 @@
+import pytest
+import sys
+import os
+import sqlite3
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from database import remove_sqlite_database
+import migrations
+from migrations import LATEST_VERSION, apply_migrations, get_schema_version
+
+
+@pytest.fixture
+def migration_db():
+    """Point the app at an empty SQLite file for the duration of a test"""
+    test_db = 'test_migrations.db'
+    remove_sqlite_database(test_db)
+
+    original_db = Config.SQLITE_DATABASE
+    original_type = Config.DB_TYPE
+    Config.SQLITE_DATABASE = test_db
+    Config.DB_TYPE = 'sqlite'
+
+    yield test_db
+
+    Config.SQLITE_DATABASE = original_db
+    Config.DB_TYPE = original_type
+    remove_sqlite_database(test_db)
+
+
+def test_migrations_create_schema_on_empty_database(migration_db):
+    """All migrations apply in order on a fresh database"""
+    applied = apply_migrations()
+
+    assert applied == list(range(1, LATEST_VERSION + 1))
+    assert get_schema_version() == LATEST_VERSION
+
+    conn = sqlite3.connect(migration_db)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    conn.close()
+    assert {'users', 'tasks', 'schema_version'} <= tables
+
+
+def test_migrations_are_applied_only_once(migration_db):
+    """A second run finds nothing to do"""
+    apply_migrations()
+    assert apply_migrations() == []
+
+    conn = sqlite3.connect(migration_db)
+    count = conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0]
+    conn.close()
+    assert count == LATEST_VERSION
+
+
+def test_migrations_upgrade_legacy_tasks_table(migration_db):
+    """Databases created before status/priority/category existed get the columns added"""
+    conn = sqlite3.connect(migration_db)
+    conn.execute("""
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            completed INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            user_id INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT INTO tasks (title, user_id) VALUES ('Legacy', 1)")
+    conn.commit()
+    conn.close()
+
+    apply_migrations()
+
+    conn = sqlite3.connect(migration_db)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    row = conn.execute("SELECT status, priority, category FROM tasks WHERE title = 'Legacy'").fetchone()
+    conn.close()
+
+    assert {'due_date', 'priority', 'category', 'status'} <= columns
+    assert row == ('todo', 'Medium', 'General')
+
+
+def test_migrations_stop_at_target(migration_db):
+    """A target version leaves later migrations pending"""
+    assert apply_migrations(target=1) == [1]
+    assert get_schema_version() == 1
+
+
+class _FakeArbiter:
+    """Stands in for gunicorn's arbiter: on_starting only uses server.log"""
+
+    class log:
+        errors = []
+
+        @classmethod
+        def warning(cls, *args):
+            pass
+
+        @classmethod
+        def error(cls, message, *args):
+            cls.errors.append(message % args)
+
+
+def test_failed_migration_aborts_gunicorn_startup(migration_db, monkeypatch):
+    """on_starting re-raises a migration failure so no worker starts on a half-migrated schema"""
+    import gunicorn_config
+
+    def broken_step(conn, cursor):
+        raise RuntimeError("disk full")
+
+    broken = [(version, description, {db_type: broken_step for db_type in steps}) if version == 2
+              else (version, description, steps)
+              for version, description, steps in migrations.MIGRATIONS]
+    monkeypatch.setattr(migrations, 'MIGRATIONS', broken)
+    _FakeArbiter.log.errors = []
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        gunicorn_config.on_starting(_FakeArbiter())
+
+    assert _FakeArbiter.log.errors == ["Schema migration failed: disk full"]
+    monkeypatch.undo()
+    assert get_schema_version() == 1
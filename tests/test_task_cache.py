@@ -0,0 +1,104 @@
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from task_cache import TaskSnapshotCache, OVERSIZED, query_snapshot, snapshot_stats
+
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def make_task(task_id, title='Task', priority='Medium', status='todo', category='General',
+              due_date=None, created_at=None):
+    return {
+        'id': task_id,
+        'title': title,
+        'description': '',
+        'completed': status == 'done',
+        'created_at': created_at or NOW - timedelta(minutes=task_id),
+        'due_date': due_date,
+        'priority': priority,
+        'category': category,
+        'status': status,
+    }
+
+
+def test_cache_hit_requires_matching_version():
+    """A snapshot is only served for the version it was loaded at"""
+    cache = TaskSnapshotCache()
+    cache.put('db', 1, 3, [make_task(1)])
+
+    assert [t['id'] for t in cache.get('db', 1, 3)] == [1]
+    assert cache.get('db', 1, 4) is None
+    assert cache.get('other-db', 1, 3) is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_apply_patches_next_version_only():
+    """Writes patch the snapshot in place; a skipped version drops it"""
+    cache = TaskSnapshotCache()
+    cache.put('db', 1, 1, [make_task(1), make_task(2)])
+
+    cache.apply('db', 1, 2, upsert=make_task(3, title='New'))
+    cache.apply('db', 1, 3, delete_id=1)
+    assert sorted(t['id'] for t in cache.get('db', 1, 3)) == [2, 3]
+
+    # Version 4 was written by another worker
+    cache.apply('db', 1, 5, upsert=make_task(4))
+    assert cache.get('db', 1, 5) is None
+
+
+def test_oversized_boards_are_remembered():
+    """Boards over max_tasks are marked instead of cached"""
+    cache = TaskSnapshotCache(max_tasks=2)
+    assert cache.put('db', 1, 1, [make_task(i) for i in range(1, 4)]) is False
+    assert cache.get('db', 1, 1) is OVERSIZED
+
+
+def test_lru_eviction_respects_memory_cap():
+    """The least recently used user is evicted once the byte budget is exceeded"""
+    cache = TaskSnapshotCache(max_bytes=5000)
+    cache.put('db', 1, 1, [make_task(1), make_task(2)])
+    cache.put('db', 2, 1, [make_task(3), make_task(4)])
+    cache.put('db', 3, 1, [make_task(5), make_task(6)])
+
+    assert cache.get('db', 1, 1) is None
+    assert cache.get('db', 3, 1) is not None
+    assert cache.stats()['evictions'] >= 1
+
+
+def test_query_snapshot_filters_sorts_and_pages():
+    """Snapshot views match the SQL ordering and keyset pagination"""
+    tasks = [
+        make_task(1, 'Low one', priority='Low'),
+        make_task(2, 'High one', priority='High'),
+        make_task(3, 'Medium one', priority='Medium'),
+        make_task(4, 'High done', priority='High', status='done'),
+    ]
+
+    page, has_more = query_snapshot(tasks, sort='priority_desc', limit=2, now=NOW)
+    assert [t['id'] for t in page] == [2, 4]
+    assert has_more
+
+    last = page[-1]
+    after = (3, last['created_at'], last['id'])
+    page, has_more = query_snapshot(tasks, sort='priority_desc', after=after, limit=2, now=NOW)
+    assert [t['id'] for t in page] == [3, 1]
+    assert not has_more
+
+    page, _ = query_snapshot(tasks, status_filter='pending', limit=10, now=NOW)
+    assert sorted(t['id'] for t in page) == [1, 2, 3]
+
+
+def test_snapshot_stats_match_dashboard_counters():
+    """Counters cover pending tasks only"""
+    tasks = [
+        make_task(1, due_date=NOW - timedelta(hours=1)),
+        make_task(2, due_date=NOW + timedelta(hours=1)),
+        make_task(3, due_date=NOW + timedelta(days=3)),
+        make_task(4, due_date=NOW - timedelta(days=1), status='done'),
+        make_task(5),
+    ]
+    assert snapshot_stats(tasks, NOW) == {'overdue': 1, 'due_today': 1, 'due_week': 2, 'total': 4}
@@ -0,0 +1,39 @@
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from task_service import parse_datetime_value
+
+
+def test_parse_datetime_value_accepts_stored_formats():
+    """Every format the app writes parses to the same datetime"""
+    expected = datetime(2024, 5, 1, 9, 30)
+    assert parse_datetime_value('2024-05-01 09:30:00') == expected
+    assert parse_datetime_value('2024-05-01T09:30:00') == expected
+    assert parse_datetime_value('2024-05-01T09:30') == expected
+    assert parse_datetime_value('2024-05-01 09:30:00.250000') == expected.replace(microsecond=250000)
+    assert parse_datetime_value(expected) is expected
+
+
+def test_parse_datetime_value_fallbacks():
+    """Unpadded values still parse; garbage and NULL give None"""
+    assert parse_datetime_value('2024-5-1 9:30:00') == datetime(2024, 5, 1, 9, 30)
+    assert parse_datetime_value('not a date') is None
+    assert parse_datetime_value(None) is None
+
+
+def test_bucket_by_status_counts_and_limits_columns():
+    """Tasks land in their column in order; cards past the limit are counted as hidden"""
+    from task_service import bucket_by_status
+
+    tasks = [{'id': i, 'status': status} for i, status in enumerate(
+        ['todo', 'done', 'todo', 'todo', 'in_review', 'unknown'])]
+    columns = bucket_by_status(tasks, {'todo': 2})
+
+    assert [t['id'] for t in columns['todo']['tasks']] == [0, 2]
+    assert columns['todo']['count'] == 3
+    assert columns['todo']['hidden'] == 1
+    assert columns['done']['count'] == 1
+    assert columns['in_progress'] == {'tasks': [], 'count': 0, 'hidden': 0}
@@ -0,0 +1,67 @@
+import logging
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tracing
+
+
+def test_should_trace_honours_header_users_and_rate():
+    """Header, per-user list and sample rate each enable tracing"""
+    config = {'TRACE_ALLOW_HEADER': True, 'TRACE_USER_IDS': '7, 9', 'TRACE_SAMPLE_RATE': 0.0}
+
+    assert tracing.should_trace(1, 'true', config)
+    assert not tracing.should_trace(1, 'false', config)
+    assert tracing.should_trace(9, None, config)
+    assert not tracing.should_trace(8, None, config)
+    assert tracing.should_trace(8, None, dict(config, TRACE_SAMPLE_RATE=1.0))
+
+
+def test_header_ignored_when_not_allowed():
+    """Production can refuse client-requested traces"""
+    config = {'TRACE_ALLOW_HEADER': False, 'TRACE_USER_IDS': '', 'TRACE_SAMPLE_RATE': 0.0}
+    assert not tracing.should_trace(1, '1', config)
+
+
+def test_payload_not_built_outside_traced_requests():
+    """Untraced calls never evaluate the payload"""
+    def payload():
+        raise AssertionError("payload should not be built")
+
+    tracing.trace('noop', payload)
+
+
+def test_trace_header_emits_due_checks(tmp_path, monkeypatch, caplog):
+    """A traced request logs one JSON event per dated task and returns its trace id"""
+    from app import app
+    from config import Config
+    from migrations import apply_migrations
+    import database
+
+    monkeypatch.setattr(Config, 'SQLITE_DATABASE', str(tmp_path / 'trace.db'))
+    apply_migrations()
+    database.create_task(1, 'Dated', due_date=datetime(2000, 1, 1, 9, 0))
+    database.create_task(1, 'Undated')
+
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+
+        with caplog.at_level(logging.INFO, logger='tracing'):
+            response = client.get('/tasks')
+        assert tracing.TRACE_ID_HEADER not in response.headers
+        assert not [r for r in caplog.records if r.name == 'tracing']
+
+        with caplog.at_level(logging.INFO, logger='tracing'):
+            response = client.get('/tasks', headers={tracing.TRACE_HEADER: '1'})
+        trace_id = response.headers[tracing.TRACE_ID_HEADER]
+        messages = [r.getMessage() for r in caplog.records if r.name == 'tracing']
+
+    due_checks = [m for m in messages if '"task_due_check"' in m]
+    assert len(due_checks) == 1
+    assert trace_id in due_checks[0]
+    assert '"is_overdue": true' in due_checks[0]
+    database.close_pools()
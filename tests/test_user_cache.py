@@ -0,0 +1,60 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from user_cache import UserCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_user_cache_expires_and_never_stores_password_hash():
+    """Entries (positive and negative) live for ttl seconds and hold metadata only"""
+    clock = FakeClock()
+    cache = UserCache(ttl=30, clock=clock)
+    cache.put('led', {'id': 1, 'username': 'led', 'email': 'led@example.com', 'password_hash': 'secret'})
+    cache.put('nobody', None)
+
+    assert cache.get('led') == (True, {'id': 1, 'username': 'led', 'email': 'led@example.com'})
+    assert cache.get('nobody') == (True, None)
+    assert cache.get('other') == (False, None)
+
+    clock.now = 31
+    assert cache.get('led') == (False, None)
+    assert cache.stats()['entries'] == 1
+
+
+def test_user_cache_invalidate_and_disable():
+    """Invalidated keys are looked up again; ttl=0 caches nothing"""
+    cache = UserCache(ttl=30, max_entries=2)
+    cache.put('a', None)
+    cache.put('b', None)
+    cache.put('c', None)
+    assert cache.get('a') == (False, None)
+
+    cache.invalidate('b')
+    assert cache.get('b') == (False, None)
+    assert cache.get('c') == (True, None)
+
+    disabled = UserCache(ttl=0)
+    disabled.put('a', None)
+    assert disabled.get('a') == (False, None)
+
+
+def test_user_cache_drops_lookups_that_raced_an_invalidation():
+    """A result read before a concurrent signup/rename is not cached after it"""
+    cache = UserCache(ttl=30)
+    generation = cache.generation()
+    # Another thread creates 'newbie' and invalidates while this lookup is in flight
+    cache.invalidate('newbie')
+    cache.put('newbie', None, generation)
+    assert cache.get('newbie') == (False, None)
+
+    cache.put('newbie', {'id': 3, 'username': 'newbie', 'email': None}, cache.generation())
+    assert cache.get('newbie')[0] is True
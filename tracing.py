@@ -0,0 +1,94 @@
+"""
+Sampled, per-request debug tracing
+
+Trace events are off by default. A request is traced when:
+  - it sends the X-Debug-Trace header (if TRACE_ALLOW_HEADER is set),
+  - the logged-in user is listed in TRACE_USER_IDS, or
+  - it falls inside the random TRACE_SAMPLE_RATE.
+
+Events go to the 'tracing' logger as one JSON object per line. Payloads can
+be passed as a callable so nothing is built or formatted for untraced
+requests.
+"""
+import json
+import logging
+import random
+import uuid
+
+from flask import current_app, g, has_request_context
+
+logger = logging.getLogger('tracing')
+
+TRACE_HEADER = 'X-Debug-Trace'
+TRACE_ID_HEADER = 'X-Trace-Id'
+
+_TRUTHY = ('1', 'true', 'yes', 'on')
+
+
+class _LazyJSON:
+    """Defers building and serializing a trace payload until a handler formats it."""
+    __slots__ = ('_record', '_payload')
+
+    def __init__(self, record, payload):
+        self._record = record
+        self._payload = payload
+
+    def __str__(self):
+        record = dict(self._record)
+        payload = self._payload() if callable(self._payload) else self._payload
+        if payload:
+            record.update(payload)
+        return json.dumps(record, default=str)
+
+
+def _parse_user_ids(value):
+    if not value:
+        return frozenset()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(int(v) for v in value)
+    return frozenset(int(v) for v in str(value).split(',') if v.strip())
+
+
+def should_trace(user_id=None, header_value=None, config=None):
+    """Decide whether a request with this user and header should be traced."""
+    config = config if config is not None else current_app.config
+    if header_value and config.get('TRACE_ALLOW_HEADER', False):
+        if header_value.strip().lower() in _TRUTHY:
+            return True
+    if user_id is not None and int(user_id) in _parse_user_ids(config.get('TRACE_USER_IDS')):
+        return True
+    rate = config.get('TRACE_SAMPLE_RATE', 0.0) or 0.0
+    return rate > 0 and random.random() < rate
+
+
+def start_request(user_id=None, header_value=None):
+    """Make the sampling decision for the current request; returns the trace id or None."""
+    g.trace_id = uuid.uuid4().hex[:16] if should_trace(user_id, header_value) else None
+    g.trace_user_id = user_id
+    return g.trace_id
+
+
+def current_trace_id():
+    if not has_request_context():
+        return None
+    return g.get('trace_id')
+
+
+def enabled():
+    """True if the current request is being traced."""
+    return current_trace_id() is not None
+
+
+def trace(event, payload=None):
+    """
+    Emit a trace event for the current request
+
+    Args:
+        event: Short event name
+        payload: Dict of fields, or a callable returning one (only called when traced)
+    """
+    trace_id = current_trace_id()
+    if trace_id is None:
+        return
+    record = {'trace_id': trace_id, 'event': event, 'user_id': g.get('trace_user_id')}
+    logger.info("%s", _LazyJSON(record, payload))
@@ -0,0 +1,104 @@
+"""
+Short-lived per-worker cache of user lookups by login identifier
+
+Maps a username or email to the account's public metadata (id, username,
+email), so repeated signup checks for the same identifier skip the users
+table. Password hashes and verification results are never stored here.
+database.py only caches accounts that exist: invalidate() reaches this
+worker alone, so a cached "no such account" could outlive a signup handled
+by another worker.
+
+Lookups take a generation() token before querying and pass it to put(); any
+invalidation in between bumps the generation and the stale result is not
+stored, so a thread that read a user just before a rename cannot cache the
+old row after it.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+CACHED_FIELDS = ('id', 'username', 'email')
+
+
+class UserCache:
+    """
+    Thread-safe TTL + LRU mapping of key -> user metadata dict or None
+
+    Args:
+        ttl: Seconds an entry is served before it must be looked up again (0 disables)
+        max_entries: Entries kept before the least recently used is dropped
+        clock: Monotonic time source (tests pass a fake)
+    """
+
+    def __init__(self, ttl=30.0, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Look a key up
+
+        Returns:
+            (hit, user) where user is None for a cached "no such account"
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, dict(entry[1]) if entry[1] is not None else None
+
+    def generation(self):
+        """Token to take before a lookup and hand to put() with its result."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key, user, generation=None):
+        """
+        Cache a lookup result; anything beyond CACHED_FIELDS is dropped
+
+        Args:
+            generation: generation() taken before the lookup; the result is
+                discarded if entries were invalidated since
+        """
+        if self.ttl <= 0:
+            return
+        metadata = {field: user.get(field) for field in CACHED_FIELDS} if user else None
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, metadata)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }